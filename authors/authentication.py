@@ -0,0 +1,49 @@
+import copy
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from utils.lru import LRUCache
+
+from authors.tokens import TOKEN_REVOKED, is_revoked
+
+# Users of the API, by the user id claim of their tokens. DRF resolves the
+# user of every request, safe ones included (APIView.initial), and the
+# views read it (author-api-me, the replica pin), so it is always a User,
+# never one built from the token claims.
+# Saving or deleting a user drops it here (authors/signals.py), in this
+# process only: other processes see the change, a deactivation included,
+# after AUTH_USER_CACHE_TIMEOUT at most, as they do for queryset.update()
+# and for changes of groups/permissions.
+user_cache = LRUCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TIMEOUT,
+)
+
+
+def get_user_cache_key(user):
+    return getattr(user, api_settings.USER_ID_FIELD)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+
+        # No query, see authors/tokens.py
+        if is_revoked(validated_token):
+            raise InvalidToken(TOKEN_REVOKED)
+
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id)
+
+        if user is None:
+            version = user_cache.version
+            # Raises for unknown and inactive users, never cached
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user, version=version)
+
+        # Each request changes its own copy (e.g. permission caches)
+        return copy.copy(user)
@@ -7,3 +7,14 @@ User = get_user_model()
 class Profile(models.Model):
     author = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.TextField(default='', blank=True)
+
+
+# JWTs revoked before they expire, by their jti claim. Read through the
+# in-memory set of authors/tokens.py, not on each request.
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from authors.authentication import get_user_cache_key, user_cache
 from authors.models import Profile
 
 User = get_user_model()
@@ -12,3 +14,18 @@ def create_profile(sender, instance, created, *args, **kwargs):
     if created:
         profile = Profile.objects.create(author=instance)
         profile.save()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, *args, **kwargs):
+    update_fields = kwargs.get('update_fields')
+
+    # Logins only save last_login
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+
+    key = get_user_cache_key(instance)
+    user_cache.delete(key)
+    # Again after commit, a request could cache the old row in between
+    transaction.on_commit(lambda: user_cache.delete(key))
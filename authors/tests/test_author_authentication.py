@@ -0,0 +1,47 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipes.tests.test_recipe_api_v2 import RecipeAPIv2Mixin
+from rest_framework import test
+
+
+class AuthorAuthenticationTest(test.APITestCase, RecipeAPIv2Mixin):
+    def setUp(self):
+        self.auth_data = self.get_auth_data()
+        self.authorization = \
+            f"Bearer {self.auth_data['jwt_access_token']}"
+        return super().setUp()
+
+    def get_me(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('authors:author-api-me'),
+                HTTP_AUTHORIZATION=self.authorization,
+            )
+
+        return response, len(queries)
+
+    def test_author_api_reuses_the_user_of_the_token(self):
+        _, first = self.get_me()
+        response, second = self.get_me()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(second, first - 1)
+
+    def test_author_api_sees_saved_users_right_away(self):
+        self.get_me()
+        user = self.auth_data['user']
+        user.username = 'renamed'
+        user.save()
+
+        response, _ = self.get_me()
+        self.assertEqual(response.data['username'], 'renamed')
+
+    def test_author_api_rejects_deactivated_users_right_away(self):
+        self.get_me()
+        user = self.auth_data['user']
+        user.is_active = False
+        user.save()
+
+        response, _ = self.get_me()
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,89 @@
+from authors.tokens import revoked_tokens
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from parameterized import parameterized
+from recipes.tests.test_recipe_api_v2 import RecipeAPIv2Mixin
+from rest_framework import test
+from utils.queries import QueryBudgetTestMixin, get_route_names
+
+ROUTES = get_route_names('authors')
+
+
+# The table of revoked tokens is checked once every interval, not per
+# request: never within a request measured here, however slow the tests
+@override_settings(REVOKED_TOKENS_CHECK_INTERVAL=3600)
+class AuthorQueryBudgetTest(
+    test.APITestCase, RecipeAPIv2Mixin, QueryBudgetTestMixin
+):
+    def setUp(self):
+        self.auth_data = self.get_auth_data()
+        self.user = self.auth_data['user']
+        self.recipes = [
+            self.make_recipe(
+                create_author=False, author_data=self.user,
+                title=f'Recipe Title {i}', slug=f'r{i}',
+                category_data={'name': f'Category {i}'},
+                is_published=False,
+            )
+            for i in range(5)
+        ]
+
+        # Budgets are for a running process, with the revoked tokens loaded
+        revoked_tokens.get_data()
+        return super().setUp()
+
+    def request_route(self, route_name):
+        user, recipe = self.user, self.recipes[0]
+        token = self.auth_data['jwt_access_token']
+        jwt = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        requests = {
+            'authors:register': ('get', (), {}, {}),
+            'authors:register_create': ('post', (), {
+                'username': 'new_user', 'first_name': 'first',
+                'last_name': 'last', 'email': 'new@email.com',
+                'password': 'Str0ngP@ssword1', 'password2': 'Str0ngP@ssword1',
+            }, {}),
+            'authors:login': ('get', (), {}, {}),
+            'authors:login_create': ('post', (), {
+                'username': 'user', 'password': 'password',
+            }, {}),
+            'authors:logout': ('post', (), {'username': 'user'}, {}),
+            'authors:dashboard': ('get', (), {}, {}),
+            'authors:dashboard_recipe_new': ('get', (), {}, {}),
+            'authors:dashboard_recipe_delete': ('post', (), {
+                'id': recipe.pk,
+            }, {}),
+            'authors:dashboard_recipe_edit': ('get', (recipe.pk,), {}, {}),
+            'authors:profile': ('get', (user.profile.pk,), {}, {}),
+            'authors:author-api-list': ('get', (), {}, jwt),
+            'authors:author-api-detail': ('get', (user.pk,), {}, jwt),
+            'authors:author-api-me': ('get', (), {}, jwt),
+        }
+        method, args, data, headers = requests[route_name]
+        url = reverse(route_name, args=args)
+        return getattr(self.client, method)(url, data=data, **headers)
+
+    def test_every_author_route_has_a_query_budget(self):
+        self.assertIn('authors:author-api-me', ROUTES)
+        self.assertEqual([
+            route_name for route_name in ROUTES
+            if route_name not in settings.QUERY_BUDGETS
+        ], [])
+
+    @parameterized.expand(ROUTES)
+    def test_author_route_stays_in_its_query_budget(self, route_name):
+        budget = settings.QUERY_BUDGETS[route_name]
+        self.client.login(username='user', password='password')
+
+        with self.assertMaxQueries(budget, route_name):
+            response = self.request_route(route_name)
+
+        self.assertLess(response.status_code, 400)
+
+    @parameterized.expand(ROUTES)
+    def test_author_route_has_no_repeated_queries(self, route_name):
+        self.client.login(username='user', password='password')
+
+        with self.assertNoRepeatedQueries(route_name):
+            self.request_route(route_name)
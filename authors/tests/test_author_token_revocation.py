@@ -0,0 +1,112 @@
+from unittest import mock
+
+from authors.tokens import RevokedTokensCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipes.tests.test_recipe_api_v2 import RecipeAPIv2Mixin
+from rest_framework import test
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class AuthorTokenRevocationTest(test.APITestCase, RecipeAPIv2Mixin):
+    def setUp(self):
+        self.auth_data = self.get_auth_data()
+        return super().setUp()
+
+    def get_me(self, access_token):
+        return self.client.get(
+            reverse('authors:author-api-me'),
+            HTTP_AUTHORIZATION=f'Bearer {access_token}',
+        )
+
+    def revoke(self, access_token, **data):
+        return self.client.post(
+            reverse('recipes:token_revoke'),
+            data=data,
+            HTTP_AUTHORIZATION=f'Bearer {access_token}',
+        )
+
+    def get_new_tokens(self):
+        response = self.client.post(
+            reverse('recipes:token_obtain_pair'),
+            data={'username': 'user', 'password': 'password'},
+        )
+        return response.data['access'], response.data['refresh']
+
+    def test_revoked_access_token_is_rejected(self):
+        access_token = self.auth_data['jwt_access_token']
+        other_access_token, _ = self.get_new_tokens()
+
+        response = self.revoke(access_token)
+        self.assertEqual(response.status_code, 204)
+
+        self.assertEqual(self.get_me(access_token).status_code, 401)
+        self.assertEqual(self.get_me(other_access_token).status_code, 200)
+
+    def test_revoked_refresh_token_can_not_be_refreshed_nor_verified(self):
+        refresh_token = self.auth_data['jwt_refresh_token']
+        self.revoke(self.auth_data['jwt_access_token'], refresh=refresh_token)
+
+        response = self.client.post(
+            reverse('recipes:token_refresh'), data={'refresh': refresh_token},
+        )
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(
+            reverse('recipes:token_verify'), data={'token': refresh_token},
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_token_of_another_user_is_not_revoked(self):
+        other = self.get_auth_data(username='other', password='password')
+        response = self.revoke(
+            self.auth_data['jwt_access_token'],
+            refresh=other['jwt_refresh_token'],
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            reverse('recipes:token_refresh'),
+            data={'refresh': other['jwt_refresh_token']},
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_revocation_check_runs_no_query(self):
+        access_token = self.auth_data['jwt_access_token']
+        self.revoke(self.get_new_tokens()[0])
+        self.get_me(access_token)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_me(access_token).status_code, 200)
+
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'authors_revokedtoken' in query['sql']
+        ])
+
+    def test_revocation_reaches_processes_with_their_own_cache(self):
+        access_token = self.auth_data['jwt_access_token']
+        jti = AccessToken(access_token)['jti']
+        # Two processes, each with its in-process cache
+        this, other = RevokedTokensCache(), RevokedTokensCache()
+        other_cache = LocMemCache('other-process', {})
+        this.get_data()
+
+        with mock.patch('recipes.cache.cache', other_cache):
+            other.get_data()
+
+        self.revoke(access_token)
+        self.assertIn(jti, this.get_data())
+
+        with mock.patch('recipes.cache.cache', other_cache):
+            self.assertNotIn(jti, other.get_data())
+
+            with override_settings(REVOKED_TOKENS_CHECK_INTERVAL=0):
+                self.assertIn(jti, other.get_data())
+
+    def test_revoke_needs_an_access_token(self):
+        response = self.client.post(reverse('recipes:token_revoke'))
+        self.assertEqual(response.status_code, 401)
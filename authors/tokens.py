@@ -0,0 +1,127 @@
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from recipes.cache import bump_generations
+from recipes.metadata import MetadataCache
+from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+TOKEN_REVOKED = _('Token is revoked')
+
+# Generation (see recipes.cache) bumped by each revocation
+REVOKED_TOKENS = 'revoked-tokens'
+
+
+def load_revoked_tokens():
+    from authors.models import RevokedToken
+
+    # Expired tokens fail anyway, without being looked up here
+    return frozenset(RevokedToken.objects.filter(
+        expires_at__gt=timezone.now(),
+    ).values_list('jti', flat=True))
+
+
+class RevokedTokensCache(MetadataCache):
+    # The jti of every revoked token that has not expired, in each process.
+    # The generation is only seen by the processes sharing the cache (with
+    # the default in-process cache, the one that revoked), the others find
+    # revocations by the rows of the table, counted at most once every
+    # REVOKED_TOKENS_CHECK_INTERVAL seconds.
+    def __init__(self):
+        super().__init__(REVOKED_TOKENS, load_revoked_tokens)
+        self.table_version = None
+        self.checked_at = None
+
+    def get_table_version(self):
+        from authors.models import RevokedToken
+
+        now = time.monotonic()
+
+        if (
+            self.checked_at is None or
+            now - self.checked_at >= settings.REVOKED_TOKENS_CHECK_INTERVAL
+        ):
+            self.table_version = tuple(RevokedToken.objects.aggregate(
+                count=Count('pk'), last=Max('pk'),
+            ).values())
+            self.checked_at = now
+
+        return self.table_version
+
+    def get_version(self):
+        return super().get_version(), self.get_table_version()
+
+
+revoked_tokens = RevokedTokensCache()
+
+
+def is_revoked(token):
+    return token.get(api_settings.JTI_CLAIM) in revoked_tokens.get_data()
+
+
+def check_not_revoked(token):
+    if is_revoked(token):
+        raise TokenError(TOKEN_REVOKED)
+
+
+def revoke_tokens(tokens):
+    from authors.models import RevokedToken
+
+    RevokedToken.objects.bulk_create([
+        RevokedToken(
+            jti=token[api_settings.JTI_CLAIM],
+            expires_at=datetime_from_epoch(token['exp']),
+        )
+        for token in tokens
+    ], ignore_conflicts=True)
+    # Keeps the table (and the sets loaded from it) to the live tokens
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    bump_generations(REVOKED_TOKENS)
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        check_not_revoked(refresh)
+        data = super().validate(attrs)
+
+        # No blacklist app, revoked here instead
+        if api_settings.ROTATE_REFRESH_TOKENS and \
+                api_settings.BLACKLIST_AFTER_ROTATION:
+            revoke_tokens([refresh])
+
+        return data
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        check_not_revoked(jwt_serializers.UntypedToken(attrs['token']))
+        return data
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    # The access token of the request is always revoked, the refresh one
+    # of the same user too when it is sent
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(error.args[0])
+
+        user = self.context['request'].user
+        user_id = getattr(user, api_settings.USER_ID_FIELD)
+
+        if refresh.get(api_settings.USER_ID_CLAIM) != user_id:
+            raise serializers.ValidationError(_('Token of another user'))
+
+        return refresh
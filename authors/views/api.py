@@ -1,9 +1,12 @@
 from django.contrib.auth import get_user_model
+from rest_framework import status
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.views import APIView
 from ..serializers import AuthorSerializer
+from ..tokens import TokenRevokeSerializer, revoke_tokens
 
 
 class AuthorViewSet(ReadOnlyModelViewSet):
@@ -27,3 +30,17 @@ class AuthorViewSet(ReadOnlyModelViewSet):
 
         )
         return Response(serializer.data)
+
+
+class TokenRevokeView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        serializer = TokenRevokeSerializer(
+            data=request.data, context={'request': request},
+        )
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data.get('refresh')
+
+        revoke_tokens([request.auth] + ([refresh] if refresh else []))
+        return Response(status=status.HTTP_204_NO_CONTENT)
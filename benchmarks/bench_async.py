@@ -0,0 +1,142 @@
+"""
+Compares the sync v2 recipe API with its async twin under ASGI, with many
+concurrent clients. Requests go straight to the ASGI application, no
+server in between. --db-latency adds a delay to every query, like the
+round trip to a database on another host.
+
+    python -m benchmarks.bench_async --clients 1 10 50 --db-latency 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.bench_serializer import add_tags
+from benchmarks.utils import (make_recipes, print_row, setup_django,
+                              temporary_database)
+
+
+def add_db_latency(seconds):
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    # Every connection, of every thread, as it is opened
+    def add_delay(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(add_delay, weak=False)
+
+
+def make_scope(path):
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80),
+    }
+
+
+async def request(application, path):
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    start = time.perf_counter()
+    await application(make_scope(path), receive, send)
+    assert status == 200, f'{path} answered {status}'
+    return time.perf_counter() - start
+
+
+async def load(application, path, clients, requests_per_client):
+    # Each client sends its requests one after the other
+    async def client():
+        return [
+            await request(application, path)
+            for _ in range(requests_per_client)
+        ]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    timings = sorted(timing for result in results for timing in result)
+
+    return {
+        'rps': len(timings) / elapsed,
+        'p50': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def run(clients, requests_per_client, db_latency):
+    from django.core.asgi import get_asgi_application
+    from django.urls import reverse
+
+    make_recipes(100)
+    add_tags()
+
+    if db_latency:
+        add_db_latency(db_latency / 1000)
+
+    application = get_asgi_application()
+    paths = {
+        'sync list': reverse('recipes:recipes-api-list'),
+        'async list': reverse('recipes:recipes-api-async-list'),
+    }
+
+    print(
+        f'\n{requests_per_client} requests per client, '
+        f'{db_latency}ms per query'
+    )
+    print_row('clients', 'view', 'req/s', 'p50 ms', 'p95 ms')
+
+    for qty in clients:
+        for name, path in paths.items():
+            # Warm up (caches, connections)
+            asyncio.run(load(application, path, qty, 1))
+            result = asyncio.run(
+                load(application, path, qty, requests_per_client),
+            )
+            print_row(
+                qty, name, f'{result["rps"]:.0f}',
+                f'{result["p50"] * 1000:.1f}', f'{result["p95"] * 1000:.1f}',
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--db-latency', type=float, default=5)
+    args = parser.parse_args()
+
+    # The debug toolbar middleware is sync only, it would put every
+    # request in the thread of the sync code
+    os.environ['DEBUG'] = '0'
+    setup_django()
+
+    with temporary_database():
+        run(sorted(args.clients), args.requests, args.db_latency)
+
+
+if __name__ == '__main__':
+    main()
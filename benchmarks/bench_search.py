@@ -0,0 +1,83 @@
+"""
+Compares the old icontains search with the recipes.search index.
+
+    python -m benchmarks.bench_search --sizes 100000 1000000
+"""
+import argparse
+import random
+
+from benchmarks.utils import (make_recipes, make_vocabulary, print_row,
+                              setup_django, temporary_database, timeit)
+
+QUERIES = ('bolo', 'pao de acucar', 'frango grelhado', 'mineira', 'nordestina')
+
+
+def get_queries():
+    # Plus made up words of the vocabulary of make_recipes (same seed),
+    # rarer ones: a search is ranked when one of its words is rare
+    words, _ = make_vocabulary(random.Random(42))
+    return (*QUERIES, words[2000], f'bolo {words[15000]}')
+
+
+def icontains_search(queryset, search_term):
+    from django.db.models import Q
+
+    return queryset.filter(
+        Q(title__icontains=search_term) |
+        Q(description__icontains=search_term)
+    )
+
+
+def run(sizes, page_size, repeat):
+    from recipes.models import Recipe
+    from recipes.search import rebuild_index, search_recipes
+
+    for size in sizes:
+        make_recipes(size - Recipe.objects.count())
+        rebuild_index(Recipe.objects.all(), batch_size=20000)
+
+        # The icontains search read a page and counted its results. The
+        # indexed one reads a page and one more row (has next page): the
+        # search page and the API do not count searches.
+        print(f'\n{size} recipes (ms, median of {repeat})')
+        print_row(
+            'query', 'old page', 'old count', 'new page', 'ranked',
+            'matches',
+        )
+
+        for query in get_queries():
+            queryset = Recipe.objects.filter(is_published=True)
+            old = icontains_search(queryset, query).order_by('-id')
+            old_page = timeit(lambda: list(old[:page_size]), repeat)
+            old_count = timeit(old.count, repeat)
+            new_page = timeit(lambda: list(
+                search_recipes(queryset, query)[:page_size + 1]
+            ), repeat)
+            new = search_recipes(queryset, query)
+
+            print_row(
+                query,
+                *(f'{timing["median"] * 1000:.1f}' for timing in (
+                    old_page, old_count, new_page,
+                )),
+                'search_rank' in new.query.annotations, new.count(),
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[100_000, 1_000_000],
+    )
+    parser.add_argument('--page-size', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with temporary_database():
+        run(sorted(args.sizes), args.page_size, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
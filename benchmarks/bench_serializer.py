@@ -0,0 +1,88 @@
+"""
+Compares RecipeSerializer with RecipeValuesSerializer on v2 list pages.
+
+    python -m benchmarks.bench_serializer --page-sizes 6 100 1000
+"""
+import argparse
+import random
+
+from benchmarks.utils import (make_recipes, print_row, setup_django,
+                              temporary_database, timeit)
+
+
+def add_tags(qty_tags=20, tags_per_recipe=3, seed=42):
+    from recipes.models import Recipe
+    from tag.models import Tag
+
+    rand = random.Random(seed)
+    tags = Tag.objects.bulk_create([
+        Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(qty_tags)
+    ])
+    Through = Recipe.tags.through
+    Through.objects.bulk_create([
+        Through(recipe_id=recipe_id, tag_id=tag.pk)
+        for recipe_id in Recipe.objects.values_list('pk', flat=True)
+        for tag in rand.sample(tags, tags_per_recipe)
+    ])
+
+
+def run(page_sizes, repeat):
+    from django.test import RequestFactory
+    from recipes.models import Recipe
+    from recipes.serializers import RecipeSerializer, RecipeValuesSerializer
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+
+    make_recipes(max(page_sizes))
+    add_tags()
+
+    request = Request(RequestFactory().get('/recipes/api/v2/'))
+    context = {'request': request}
+    renderer = JSONRenderer()
+
+    print(f'\nus per recipe (median of {repeat}), queries and rendering')
+    print_row('page size', 'instances', 'values', 'speedup')
+
+    for page_size in page_sizes:
+        queryset = Recipe.objects.get_published()
+
+        def instances():
+            page = queryset[:page_size]
+            serializer = RecipeSerializer(page, many=True, context=context)
+            return renderer.render(serializer.data)
+
+        def values():
+            page = RecipeValuesSerializer.get_values(queryset)[:page_size]
+            serializer = RecipeValuesSerializer(
+                page, many=True, context=context,
+            )
+            return renderer.render(serializer.data)
+
+        old = timeit(instances, repeat)
+        new = timeit(values, repeat)
+        assert old['result'] == new['result'], 'outputs differ'
+
+        print_row(
+            page_size,
+            f'{old["median"] / page_size * 1e6:.1f}',
+            f'{new["median"] / page_size * 1e6:.1f}',
+            f'{old["median"] / new["median"]:.1f}x',
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--page-sizes', type=int, nargs='+', default=[6, 100, 1000],
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with temporary_database():
+        run(sorted(args.page_sizes), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares HyperlinkedRelatedField with PkHyperlinkedRelatedField, the
+tag_link field of RecipeSerializer.
+
+    python -m benchmarks.bench_tag_link --page-sizes 6 100 1000
+"""
+import argparse
+
+from benchmarks.bench_serializer import add_tags
+from benchmarks.utils import (make_recipes, print_row, setup_django,
+                              temporary_database, timeit)
+
+
+def run(page_sizes, repeat):
+    from django.test import RequestFactory
+    from recipes.models import Recipe
+    from recipes.serializers import RecipeSerializer
+    from rest_framework import serializers
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+
+    class OldRecipeSerializer(RecipeSerializer):
+        tag_link = serializers.HyperlinkedRelatedField(
+            many=True,
+            source='tags',
+            view_name='recipes:recipes-api-tags-detail',
+            read_only=True,
+        )
+
+    make_recipes(max(page_sizes))
+    add_tags()
+
+    request = Request(RequestFactory().get('/recipes/api/v2/'))
+    context = {'request': request}
+    renderer = JSONRenderer()
+
+    print(f'\nms per page (median of {repeat}), recipes with 3 tags each')
+    print_row(
+        'page size', 'old field', 'new field', 'old page', 'new page',
+    )
+
+    for page_size in page_sizes:
+        # Instances loaded once, only serialization is measured
+        page = list(Recipe.objects.get_published()[:page_size])
+
+        def serialize(serializer_class, only_links):
+            def serialize_page():
+                serializer = serializer_class(
+                    page, many=True, context=context,
+                )
+
+                if only_links:
+                    field = serializer.child.fields['tag_link']
+                    return [
+                        field.to_representation(recipe.tags.all())
+                        for recipe in page
+                    ]
+
+                return renderer.render(serializer.data)
+
+            return timeit(serialize_page, repeat)
+
+        old_field = serialize(OldRecipeSerializer, True)
+        new_field = serialize(RecipeSerializer, True)
+        old_page = serialize(OldRecipeSerializer, False)
+        new_page = serialize(RecipeSerializer, False)
+        assert old_page['result'] == new_page['result'], 'outputs differ'
+
+        print_row(
+            page_size,
+            *(f'{timing["median"] * 1000:.2f}' for timing in (
+                old_field, new_field, old_page, new_page,
+            )),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--page-sizes', type=int, nargs='+', default=[6, 100, 1000],
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with temporary_database():
+        run(sorted(args.page_sizes), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+import django
+
+WORDS = (
+    'bolo pão açúcar limão frango carne feijão arroz molho tomate '
+    'cebola alho queijo leite ovo farinha manteiga chocolate café '
+    'maçã banana laranja mandioca milho pimenta salsa azeite forno '
+    'panela assado cozido frito grelhado doce salgado rápido fácil '
+    'receita caseira tradicional mineira baiana gaúcha nordestina'
+).split()
+
+
+SYLLABLES = (
+    'ba be bi bo bu ca ce ci co cu da de di do du fa fe fi fo fu ga go '
+    'gu la le li lo lu ma me mi mo mu na ne ni no nu pa pe pi po pu ra '
+    're ri ro ru sa se si so su ta te ti to tu va ve vi vo vu ção são'
+).split()
+
+
+def make_vocabulary(rand, size=20000):
+    # Real recipe words first (most frequent), then a long tail of made up
+    # words, so term frequencies look like real text (Zipf-like).
+    words = list(WORDS)
+
+    while len(words) < size:
+        words.append(''.join(rand.choices(SYLLABLES, k=rand.randint(2, 4))))
+
+    # Cumulative, or choices() adds them up again on every call
+    weights = itertools.accumulate(
+        1 / rank for rank in range(1, len(words) + 1)
+    )
+    return words, list(weights)
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+    django.setup()
+
+
+@contextmanager
+def temporary_database():
+    # Benchmarks never touch the real database, they run on the test one
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+
+    # On disk, the test database of SQLite is in memory by default and
+    # the largest sizes do not fit there
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            tempfile.gettempdir(), 'benchmark.sqlite3',
+        )
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def make_sentence(rand, vocabulary, size):
+    words, cum_weights = vocabulary
+    return ' '.join(rand.choices(words, cum_weights=cum_weights, k=size))
+
+
+def make_recipes(qty, batch_size=5000, seed=42):
+    from recipes.models import Category, Recipe
+
+    rand = random.Random(seed)
+    vocabulary = make_vocabulary(rand)
+    category = Category.objects.create(name='Benchmark')
+    start = Recipe.objects.count()
+
+    for offset in range(0, qty, batch_size):
+        recipes = []
+
+        for i in range(offset, min(offset + batch_size, qty)):
+            recipes.append(Recipe(
+                title=make_sentence(rand, vocabulary, 4)[:65],
+                description=make_sentence(rand, vocabulary, 12)[:165],
+                slug=f'benchmark-{start + i}',
+                preparation_time=rand.randint(5, 120),
+                preparation_time_unit='Minutos',
+                servings=rand.randint(1, 10),
+                servings_unit='Porções',
+                preparation_steps=make_sentence(rand, vocabulary, 40),
+                is_published=True,
+                category=category,
+            ))
+
+        # bulk_create skips save() and its signals, indexes are built later
+        Recipe.objects.bulk_create(recipes)
+
+
+def timeit(function, repeat=5):
+    timings = []
+    result = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'result': result,
+    }
+
+
+def print_row(*columns, widths=None):
+    widths = widths or [28] + [14] * (len(columns) - 1)
+    print(''.join(
+        str(column).ljust(width) for column, width in zip(columns, widths)
+    ))
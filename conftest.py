@@ -0,0 +1,15 @@
+import pytest
+
+# --doctest-modules imports every module, the PostgreSQL backend needs
+# psycopg2, only installed where PostgreSQL is used
+try:
+    import psycopg2  # noqa: F401
+except ImportError:
+    collect_ignore = ['utils/db_pool/postgresql/base.py']
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    # Users of rolled back tests go without a signal, their ids are reused
+    from authors.authentication import user_cache
+    user_cache.clear()
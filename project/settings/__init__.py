@@ -5,10 +5,12 @@ from .installed_apps import *  # isort:skip
 from .middlewares import *  # isort:skip
 
 from .assets import *
+from .caches import *
 from .cors_headers import *
 from .databases import *
 from .i18n import *
 from .messages import *
+from .query_budget import *
 from .security import *
 from .templates import *
 
@@ -1,5 +1,6 @@
 from .environment import BASE_DIR, DEBUG
 import mimetypes
+import os
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
@@ -16,4 +17,9 @@ if not DEBUG:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Threads resizing recipe covers in background. 0 = resize right after commit
+RECIPE_COVER_WORKERS = int(os.environ.get('RECIPE_COVER_WORKERS', 2))
+# Widths of the derivatives (WebP and JPEG) generated for each recipe cover
+RECIPE_COVER_WIDTHS = (320, 640, 840)
+
 mimetypes.add_type("text/html", ".html", True)
@@ -0,0 +1,42 @@
+import os
+
+# Defaults to an in-process cache. Point CACHE_BACKEND/CACHE_LOCATION
+# to a shared cache (e.g. Redis or Memcached) in production
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Writes bump generations (recipes/cache.py) that reach other processes
+# only through a shared cache. With a cache of each process, the features
+# relying on them (page cache, ETags of the recipe lists) are off: they
+# would serve stale data in the others.
+# 0 = False - 1 = True, defaults to whether CACHE_BACKEND is shared
+CACHE_IS_SHARED = os.environ.get('CACHE_IS_SHARED', str(int(
+    CACHES['default']['BACKEND'] not in (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.dummy.DummyCache',
+    )
+))) == '1'
+
+# Full pages of the recipe lists served to anonymous visitors, in seconds.
+# 0 = disabled, also off unless CACHE_IS_SHARED. Writes invalidate them,
+# see recipes/cache.py
+RECIPE_PAGE_CACHE_TIMEOUT = int(
+    os.environ.get('RECIPE_PAGE_CACHE_TIMEOUT', 60 * 60)
+)
+
+# How long the approximate number of results of a search is kept, seconds
+RECIPE_SEARCH_COUNT_TIMEOUT = int(
+    os.environ.get('RECIPE_SEARCH_COUNT_TIMEOUT', 60 * 60)
+)
+
+# Categories and tags are kept in each process, see recipes/metadata.py.
+# Seconds a change made in another process takes to be seen in this one
+# when the cache is not shared
+METADATA_CACHE_TIMEOUT = int(os.environ.get('METADATA_CACHE_TIMEOUT', 60))
@@ -1,3 +1,9 @@
+from corsheaders.defaults import default_headers
+
 from .environment import env
 
 CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS")
+
+# Read your writes with replicas, see utils/replicas.py
+CORS_ALLOW_HEADERS = (*default_headers, 'x-replica-pin')
+CORS_EXPOSE_HEADERS = ['X-Replica-Pin']
@@ -1,5 +1,7 @@
 import os
 
+from .environment import env
+
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
@@ -11,5 +13,51 @@ DATABASES = {
         'PASSWORD': os.environ.get('DATABASE_PASSWORD'),
         'HOST': os.environ.get('DATABASE_HOST'),
         'PORT': os.environ.get('DATABASE_PORT'),
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 0)),
+        # Only read by the pooled engines, utils.db_pool.postgresql and
+        # utils.db_pool.sqlite3
+        'POOL': {
+            # shared: one pool per process, for threaded workers and ASGI
+            # worker: one connection per thread, checked before reuse
+            'MODE': os.environ.get('DATABASE_POOL_MODE', 'shared'),
+            'MAX_SIZE': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+            # Seconds a request waits for a free connection
+            'TIMEOUT': float(os.environ.get('DATABASE_POOL_TIMEOUT', 30)),
+            # Seconds before a connection is closed and opened again
+            'MAX_LIFETIME': float(
+                os.environ.get('DATABASE_POOL_MAX_LIFETIME', 60 * 30)
+            ),
+            'HEALTH_CHECKS':
+                os.environ.get('DATABASE_POOL_HEALTH_CHECKS', '1') == '1',
+        },
     }
 }
+
+# Read replicas, comma separated copies of the default database that only
+# differ by NAME for SQLite (files copied from the default one, handy to
+# try it locally) or by HOST for the other engines. GET requests of the
+# recipe lists, pages and API read from them, see utils/replicas.py
+DATABASE_REPLICAS = []
+
+for number, location in enumerate(
+    env.list('DATABASE_REPLICAS', default=[]), start=1,
+):
+    alias = f'replica_{number}'
+    location_key = 'NAME' \
+        if 'sqlite3' in (DATABASES['default']['ENGINE'] or '') else 'HOST'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        location_key: location,
+        'POOL': dict(DATABASES['default']['POOL']),
+        # Tests read the rows they write in the default one
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['utils.replicas.ReplicaRouter']
+
+# Seconds the user (and browser session) who wrote something keeps reading
+# from the primary, longer than the lag of the replicas
+DATABASE_REPLICA_PIN_SECONDS = int(
+    os.environ.get('DATABASE_REPLICA_PIN_SECONDS', 5)
+)
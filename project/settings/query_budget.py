@@ -0,0 +1,55 @@
+from .environment import DEBUG
+
+# utils.queries.QueryBudgetMiddleware
+QUERY_BUDGET_ENABLED = DEBUG
+
+# Same statement this many times in one request is reported as N+1
+QUERY_BUDGET_REPEAT_THRESHOLD = 3
+
+# Max number of queries per url name, for streaming responses also per
+# chunk of their body (utils.queries). The query budget tests
+# (recipes/tests/test_recipe_query_budget.py and
+# authors/tests/test_author_query_budget.py) go through every named url of
+# the recipes and authors namespaces, and fail when one has no budget here
+# or goes over it.
+QUERY_BUDGETS = {
+    'recipes:home': 4,
+    # 3, plus one per word searched (see recipes.search)
+    'recipes:search': 4,
+    'recipes:tag': 5,
+    'recipes:category': 4,
+    'recipes:recipe': 3,
+    'recipes:recipes_api_v1': 3,
+    'recipes:recipes_api_v1_detail': 4,
+    # Per chunk of EXPORT_CHUNK_SIZE recipes: recipes, tags, cover variants
+    'recipes:recipes_api_v2_export': 3,
+    'recipes:theory': 4,
+    'recipes:token_obtain_pair': 1,
+    'recipes:token_refresh': 0,
+    'recipes:token_verify': 0,
+    'recipes:token_revoke': 3,
+    'recipes:recipes-api-list': 4,
+    # The same for any number of items, see recipes.batch
+    'recipes:recipes-api-batch': 10,
+    'recipes:recipes-api-detail': 4,
+    'recipes:recipes-api-tags-list': 2,
+    'recipes:recipes-api-tags-detail': 1,
+    'recipes:recipes-api-async-list': 3,
+    'recipes:recipes-api-async-detail': 3,
+    'recipes:recipes-api-tags-async-list': 2,
+    'recipes:recipes-api-tags-async-detail': 1,
+
+    'authors:register': 2,
+    'authors:register_create': 9,
+    'authors:login': 2,
+    'authors:login_create': 6,
+    'authors:logout': 4,
+    'authors:dashboard': 3,
+    'authors:dashboard_recipe_new': 2,
+    'authors:dashboard_recipe_delete': 10,
+    'authors:dashboard_recipe_edit': 3,
+    'authors:profile': 3,
+    'authors:author-api-list': 3,
+    'authors:author-api-detail': 2,
+    'authors:author-api-me': 2,
+}
@@ -6,7 +6,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 100,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authors.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -22,4 +22,19 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": False,
     "SIGNING_KEY": os.environ.get('SECRET_KEY_JWT', 'INSECURE'),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Both reject revoked tokens, see authors/tokens.py
+    "TOKEN_REFRESH_SERIALIZER": "authors.tokens.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "authors.tokens.TokenVerifySerializer",
 }
+
+# Users of the API tokens kept in each process, see authors/authentication.py
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 1024))
+
+# Seconds, how long a change to a user made in another process (e.g. a
+# deactivation) takes to be seen, a save in this process is seen at once
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60))
+
+# Seconds a token revoked in another process can still be used in this one
+REVOKED_TOKENS_CHECK_INTERVAL = int(
+    os.environ.get('REVOKED_TOKENS_CHECK_INTERVAL', 5)
+)
@@ -19,12 +19,14 @@ from django.views.static import serve
 from django.contrib import admin
 from django.urls import include, path, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from utils.db_pool.views import pool_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('recipes.urls')),
     path('authors/', include('authors.urls')),
     path('__debug__/', include('debug_toolbar.urls')),
+    path('health/db-pool/', pool_stats, name='db_pool_stats'),
 
     path('api/schema/', SpectacularAPIView.as_view(), name="schema"),
     path('api/schema/docs', SpectacularSwaggerView.as_view(url_name='schema')),
@@ -0,0 +1,260 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+BATCH_MAX_ITEMS = 1000
+BATCH_CHUNK_SIZE = 100
+
+# Same message as PrimaryKeyRelatedField
+TAG_DOES_NOT_EXIST = 'Invalid pk "{}" - object does not exist.'
+
+
+def get_item_id(id_field, item):
+    # The id as the serializer reads it ("5" is 5). None for new recipes
+    # and for ids it rejects, is_valid() reports those.
+    if not isinstance(item, dict) or 'id' not in item:
+        return None
+
+    try:
+        return id_field.run_validation(item['id'])
+    except ValidationError:
+        return None
+
+
+def validate_chunk(items, offset, author, context=None):
+    # One query for the recipes to update, one for the tags and one for
+    # the titles, whatever the number of items
+    from recipes.models import TITLE_TAKEN, Recipe
+    from recipes.search import normalize_title
+    from recipes.serializers import RecipeBatchItemSerializer
+    from tag.models import Tag
+
+    id_field = RecipeBatchItemSerializer().fields['id']
+    item_ids = [get_item_id(id_field, item) for item in items]
+    instances = Recipe.objects.select_for_update().in_bulk(
+        {item_id for item_id in item_ids if item_id is not None}
+    )
+
+    results = []
+    valid = []
+
+    for index, (item, item_id) in enumerate(
+        zip(items, item_ids), start=offset,
+    ):
+        result = {'index': index}
+        results.append(result)
+
+        if not isinstance(item, dict):
+            result['errors'] = {'non_field_errors': ['Expected an object.']}
+            continue
+
+        instance = None
+
+        if item_id is not None:
+            instance = instances.get(item_id)
+
+            if instance is None:
+                result['errors'] = {'id': ['Not found.']}
+                continue
+
+            if instance.author_id != author.pk:
+                result['errors'] = {'id': [
+                    'You do not have permission to perform this action.'
+                ]}
+                continue
+
+        serializer = RecipeBatchItemSerializer(
+            instance, data=item, partial=instance is not None,
+            context=context or {},
+        )
+
+        if not serializer.is_valid():
+            result['errors'] = serializer.errors
+            continue
+
+        valid.append((result, serializer))
+
+    tag_ids = {
+        tag_id for _, serializer in valid
+        for tag_id in serializer.validated_data.get('tags', [])
+    }
+    existing_tag_ids = set(
+        Tag.objects.filter(pk__in=tag_ids).values_list('pk', flat=True)
+    )
+
+    for result, serializer in list(valid):
+        missing = [
+            tag_id for tag_id in serializer.validated_data.get('tags', [])
+            if tag_id not in existing_tag_ids
+        ]
+
+        if missing:
+            result['errors'] = {'tags': [
+                TAG_DOES_NOT_EXIST.format(tag_id) for tag_id in missing
+            ]}
+            valid.remove((result, serializer))
+
+    # Only new titles, an update sends the current one back
+    new_titles = {}
+
+    for result, serializer in valid:
+        title = serializer.validated_data['title']
+        instance = serializer.instance
+
+        if instance is None or not instance.keeps_title(title):
+            new_titles[result['index']] = normalize_title(title)
+
+    taken = set(Recipe.objects.filter(
+        normalized_title__in=new_titles.values(),
+    ).values_list('normalized_title', flat=True))
+
+    for result, serializer in list(valid):
+        normalized_title = new_titles.get(result['index'])
+
+        if normalized_title is None:
+            continue
+
+        # Also taken by an item before this one
+        if normalized_title in taken:
+            result['errors'] = {'title': [TITLE_TAKEN]}
+            valid.remove((result, serializer))
+
+        taken.add(normalized_title)
+
+    for result in results:
+        if 'errors' in result:
+            result['status'] = 'invalid'
+
+    return results, valid
+
+
+def write_chunk(valid, author):
+    # What save() and the signals do for one recipe, for all of them:
+    # bulk inserts/updates, tags, search index, counters and page cache
+    from recipes import counters
+    from recipes.cache import bump_generations
+    from recipes.models import Recipe
+    from recipes.search import normalize_title, rebuild_index
+
+    Through = Recipe.tags.through
+    now = timezone.now()
+    created = []
+    updated = []
+    update_fields = {'updated_at'}
+    tags = {}
+
+    for result, serializer in valid:
+        data = dict(serializer.validated_data)
+        data.pop('id', None)
+        recipe_tags = data.pop('tags', None)
+
+        if serializer.instance is None:
+            recipe = Recipe(author=author, **data)
+            recipe.slug = recipe.make_slug()
+            created.append((result, recipe))
+            recipe_tags = recipe_tags or []
+        else:
+            recipe = serializer.instance
+            recipe.updated_at = now
+            update_fields.update(data)
+
+            for field_name, value in data.items():
+                setattr(recipe, field_name, value)
+
+            updated.append((result, recipe))
+
+        if 'title' in data:
+            update_fields.add('normalized_title')
+
+        if recipe.title_changed():
+            recipe.normalized_title = normalize_title(recipe.title)
+
+        tags[id(recipe)] = recipe_tags
+
+    Recipe.objects.bulk_create([recipe for _, recipe in created])
+    Recipe.objects.bulk_update(
+        [recipe for _, recipe in updated], sorted(update_fields),
+    )
+
+    for status, recipes in (('created', created), ('updated', updated)):
+        for result, recipe in recipes:
+            result.update({'status': status, 'id': recipe.pk})
+
+    # Replaces the tags of the recipes that sent them, like tags.set()
+    retagged = [
+        recipe for _, recipe in created + updated
+        if tags[id(recipe)] is not None
+    ]
+    # New recipes have no rows yet
+    old_rows = Through.objects.filter(recipe_id__in=[
+        recipe.pk for _, recipe in updated if tags[id(recipe)] is not None
+    ])
+
+    # Tag counters only count published recipes
+    tag_deltas = Counter(
+        counters.tag_key(tag_id)
+        for recipe in retagged if recipe.is_published
+        for tag_id in dict.fromkeys(tags[id(recipe)])
+    )
+    tag_deltas.subtract(
+        counters.tag_key(tag_id)
+        for tag_id in old_rows.filter(
+            recipe__is_published=True,
+        ).values_list('tag_id', flat=True)
+    )
+
+    old_rows.delete()
+    Through.objects.bulk_create([
+        Through(recipe_id=recipe.pk, tag_id=tag_id)
+        for recipe in retagged
+        for tag_id in dict.fromkeys(tags[id(recipe)])
+    ])
+    counters.change_counts(tag_deltas)
+
+    rebuild_index(Recipe.objects.filter(
+        pk__in=[recipe.pk for _, recipe in created + updated],
+    ))
+
+    # New recipes are not published, only updated ones show in the pages
+    if any(recipe.is_published for _, recipe in updated):
+        bump_generations('all')
+
+
+def save_recipes_batch(
+    items, author, context=None, atomic=True, chunk_size=BATCH_CHUNK_SIZE,
+):
+    # atomic: all items or none, in one transaction. Otherwise one
+    # transaction per chunk, the valid items of each chunk are saved.
+    # Returns the result of each item and whether anything was saved.
+    if atomic:
+        with transaction.atomic():
+            results, valid = validate_chunk(items, 0, author, context)
+
+            if len(valid) < len(items):
+                for result, _ in valid:
+                    result['status'] = 'not_saved'
+
+                return results, False
+
+            write_chunk(valid, author)
+
+        return results, True
+
+    results = []
+    saved = False
+
+    for offset in range(0, len(items), chunk_size):
+        with transaction.atomic():
+            chunk_results, valid = validate_chunk(
+                items[offset:offset + chunk_size], offset, author, context,
+            )
+
+            if valid:
+                write_chunk(valid, author)
+                saved = True
+
+        results += chunk_results
+
+    return results, saved
@@ -0,0 +1,134 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from utils.replicas import replicas_may_lag
+
+GENERATION_KEY = 'recipes:generation:{}'
+PAGE_KEY = 'recipes:page:{}:{}:{}'
+SEARCH_COUNT_KEY = 'recipes:search-count:{}'
+
+# Namespaces of cached pages:
+#   all            every page, for changes shown everywhere (authors, ...)
+#   home           home page, any recipe change
+#   category:<id>  pages of one category
+#   tag:<slug>     pages of one tag
+
+
+def new_generation():
+    # Not a counter: a generation evicted from the cache never comes back
+    # with a value that matches pages cached before it was evicted
+    return time.time_ns()
+
+
+def get_generations(namespaces):
+    keys = [GENERATION_KEY.format(namespace) for namespace in namespaces]
+    generations = cache.get_many(keys)
+    missing = {key: new_generation() for key in keys if key not in generations}
+
+    if missing:
+        cache.set_many(missing, None)
+        generations.update(missing)
+
+    return [generations[key] for key in keys]
+
+
+def bump_generations(*namespaces):
+    keys = {GENERATION_KEY.format(namespace) for namespace in namespaces}
+
+    def bump():
+        cache.set_many({key: new_generation() for key in keys}, None)
+
+    # Again after commit, or a request running between the write and the
+    # commit could cache the old rows with the new generation
+    bump()
+    transaction.on_commit(bump)
+
+
+def recipe_namespaces(category_id=None, tag_slugs=()):
+    namespaces = ['home']
+
+    if category_id is not None:
+        namespaces.append(f'category:{category_id}')
+
+    namespaces += [f'tag:{slug}' for slug in tag_slugs]
+    return namespaces
+
+
+def make_page_key(path, page, language, namespaces):
+    # None while the last change may be missing from the replicas
+    generations = get_generations(namespaces)
+
+    if replicas_may_lag(max(generations) / 1e9):
+        return None
+
+    url_hash = hashlib.md5(
+        f'{path}?page={page}'.encode('utf-8')
+    ).hexdigest()
+    generations = '.'.join(str(gen) for gen in generations)
+    return PAGE_KEY.format(url_hash, language, generations)
+
+
+def get_validators(namespaces, *parts):
+    # ETag and Last-Modified of responses built from these namespaces,
+    # generations are the time of their last change. None without a
+    # shared cache, other processes would answer 304 with stale data.
+    if not settings.CACHE_IS_SHARED:
+        return None, None
+
+    generations = get_generations(namespaces)
+
+    if replicas_may_lag(max(generations) / 1e9):
+        return None, None
+
+    etag = hashlib.md5(
+        '.'.join(str(part) for part in [*generations, *parts]).encode('utf-8')
+    ).hexdigest()
+    last_modified = datetime.fromtimestamp(
+        max(generations) / 1e9, tz=timezone.utc,
+    )
+    return etag, last_modified
+
+
+def get_recipe_validators(recipe_id, *parts):
+    # Anything shown with a recipe that changes bumps its updated_at
+    from recipes.models import Recipe
+
+    if not str(recipe_id).isnumeric():
+        return None, None
+
+    updated_at = Recipe.objects.filter(
+        pk=recipe_id, is_published=True,
+    ).values_list('updated_at', flat=True).first()
+
+    # Read from the primary, the replica the body is read from may lag
+    if updated_at is None or replicas_may_lag(updated_at.timestamp()):
+        return None, None
+
+    etag = hashlib.md5(
+        '.'.join(
+            str(part) for part in [recipe_id, updated_at.isoformat(), *parts]
+        ).encode('utf-8')
+    ).hexdigest()
+    return etag, updated_at
+
+
+def make_search_count_key(tokens):
+    tokens_hash = hashlib.md5(' '.join(tokens).encode('utf-8')).hexdigest()
+    return SEARCH_COUNT_KEY.format(tokens_hash)
+
+
+# Number of results of a search, as found by the last visitor who reached
+# its last page. It is shown as an approximate total, it may be stale.
+def get_search_count(tokens):
+    return cache.get(make_search_count_key(tokens))
+
+
+def set_search_count(tokens, count):
+    cache.set(
+        make_search_count_key(tokens), count,
+        settings.RECIPE_SEARCH_COUNT_TIMEOUT,
+    )
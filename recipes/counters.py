@@ -0,0 +1,130 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+PUBLISHED = 'published'
+
+
+def category_key(category_id):
+    return f'category:{category_id}'
+
+
+def tag_key(tag_id):
+    return f'tag:{tag_id}'
+
+
+def author_key(author_id):
+    return f'author:{author_id}'
+
+
+def recipe_keys(is_published, category_id, author_id, tag_ids=()):
+    if not is_published:
+        return []
+
+    keys = [PUBLISHED]
+
+    if category_id is not None:
+        keys.append(category_key(category_id))
+
+    if author_id is not None:
+        keys.append(author_key(author_id))
+
+    return keys + [tag_key(tag_id) for tag_id in tag_ids]
+
+
+def get_count(key):
+    from recipes.models import RecipeCounter
+
+    # None: no counter yet, count the rows instead
+    return RecipeCounter.objects.filter(
+        key=key,
+    ).values_list('value', flat=True).first()
+
+
+def change_counts(deltas):
+    from recipes.models import RecipeCounter
+
+    deltas = {key: delta for key, delta in Counter(deltas).items() if delta}
+
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        RecipeCounter.objects.bulk_create(
+            [RecipeCounter(key=key) for key in deltas],
+            ignore_conflicts=True,
+        )
+
+        for key, delta in deltas.items():
+            RecipeCounter.objects.filter(key=key).update(
+                value=F('value') + delta,
+            )
+
+
+def increment(keys, amount=1):
+    change_counts(Counter({key: amount for key in keys}))
+
+
+def decrement(keys, amount=1):
+    change_counts(Counter({key: -amount for key in keys}))
+
+
+def delete_counter(key):
+    from recipes.models import RecipeCounter
+
+    RecipeCounter.objects.filter(key=key).delete()
+
+
+def count_all(RecipeModel=None):
+    if RecipeModel is None:
+        from recipes.models import Recipe as RecipeModel
+
+    published = RecipeModel.objects.filter(is_published=True).order_by()
+    counts = {PUBLISHED: published.count()}
+
+    groups = (
+        ('category_id', category_key),
+        ('author_id', author_key),
+        ('tags', tag_key),
+    )
+
+    for field, make_key in groups:
+        rows = published.exclude(**{f'{field}__isnull': True}).values(
+            field,
+        ).annotate(total=Count('pk', distinct=True))
+
+        for row in rows:
+            counts[make_key(row[field])] = row['total']
+
+    return counts
+
+
+def reconcile():
+    from recipes.models import RecipeCounter
+
+    # Returns {key: (stored, real)} of the counters that had drifted
+    real = count_all()
+
+    with transaction.atomic():
+        stored = dict(
+            RecipeCounter.objects.select_for_update().values_list(
+                'key', 'value',
+            )
+        )
+        drift = {
+            key: (stored.get(key), real.get(key, 0))
+            for key in stored.keys() | real.keys()
+            if stored.get(key) != real.get(key, 0)
+        }
+
+        RecipeCounter.objects.filter(
+            key__in=[key for key in drift if key not in real],
+        ).delete()
+
+        for key in drift.keys() & real.keys():
+            RecipeCounter.objects.update_or_create(
+                key=key, defaults={'value': real[key]},
+            )
+
+    return drift
@@ -0,0 +1,60 @@
+from itertools import islice
+
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from rest_framework.utils.encoders import JSONEncoder
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+def parse_updated_since(value):
+    # '2022-01-31' or '2022-01-31T10:00:00+00:00', naive is local time
+    updated_since = parse_datetime(value)
+
+    if updated_since is None:
+        date = parse_date(value)
+
+        if date is None:
+            raise ValueError(f'Invalid date: {value}')
+
+        updated_since = parse_datetime(f'{date.isoformat()}T00:00:00')
+
+    if is_naive(updated_since):
+        updated_since = make_aware(updated_since)
+
+    return updated_since
+
+
+def get_export_queryset(category_id=None, updated_since=None):
+    from recipes.models import Recipe
+
+    queryset = Recipe.objects.filter(is_published=True)
+
+    if category_id is not None:
+        queryset = queryset.filter(category_id=category_id)
+
+    if updated_since is not None:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+
+    return queryset.order_by('id')
+
+
+def export_recipes(queryset, request=None, chunk_size=EXPORT_CHUNK_SIZE):
+    # One JSON line per recipe, as the v2 API shows it. Rows are read with
+    # a server side cursor where the database has them, and the tags and
+    # cover variants of each chunk are fetched at once, so memory does
+    # not grow with the catalog.
+    from recipes.serializers import RecipeValuesSerializer
+
+    rows = RecipeValuesSerializer.get_values(queryset).iterator(
+        chunk_size=chunk_size,
+    )
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    while chunk := list(islice(rows, chunk_size)):
+        serializer = RecipeValuesSerializer(
+            chunk, many=True, context={'request': request},
+        )
+        yield ''.join(
+            encoder.encode(recipe) + '\n' for recipe in serializer.data
+        )
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image
+
+from recipes.cache import bump_generations, recipe_namespaces
+
+logger = logging.getLogger(__name__)
+
+VARIANT_UPLOAD_TO = 'recipes/covers/variants/'
+
+# Pillow format name, file extension and save() options of each derivative
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 60, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 60, 'optimize': True}),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RECIPE_COVER_WORKERS,
+                thread_name_prefix='recipe-cover',
+            )
+
+    return _executor
+
+
+def enqueue_cover_processing(recipe):
+    recipe_id, cover_name = recipe.pk, recipe.cover.name
+
+    def submit():
+        if settings.RECIPE_COVER_WORKERS <= 0:
+            process_cover(recipe_id, cover_name)
+            return
+
+        get_executor().submit(run_in_worker, recipe_id, cover_name)
+
+    # Nothing is queued if the transaction that saved the cover rolls back
+    transaction.on_commit(submit)
+
+
+def run_in_worker(recipe_id, cover_name):
+    # Worker threads open their own connections, never let them go stale
+    close_old_connections()
+
+    try:
+        process_cover(recipe_id, cover_name)
+    finally:
+        close_old_connections()
+
+
+def encode_variant(image, width, image_format):
+    pillow_format, extension, options = VARIANT_FORMATS[image_format]
+    height = round(width * image.height / image.width)
+    resized = image.resize((width, height), Image.LANCZOS)
+
+    content = BytesIO()
+    resized.save(content, pillow_format, **options)
+    content = content.getvalue()
+
+    # In a directory per hash prefix, so recipes.orphans can check them in
+    # parallel, a directory at a time
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    name = f'{VARIANT_UPLOAD_TO}{digest[:2]}/{digest}.{extension}'
+
+    # Same content, same name: nothing to write if it is already stored
+    if default_storage.exists(name) and touch(name):
+        return name, height
+
+    return default_storage.save(name, ContentFile(content)), height
+
+
+def touch(name):
+    # A file reused by a new variant gets a new modification time, or the
+    # orphans check could take it for an old orphan and delete it before
+    # the row pointing to it commits. False where the storage has no local
+    # files, the content is stored again under another name.
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        return False
+
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+
+    return True
+
+
+def make_cover_variants(recipe):
+    from recipes.models import RecipeCoverVariant
+
+    with recipe.cover.open('rb') as cover_file, \
+            Image.open(cover_file) as image:
+        image = image.convert('RGB')
+        widths = [
+            width for width in settings.RECIPE_COVER_WIDTHS
+            if width < image.width
+        ] or [image.width]
+
+        variants = []
+
+        for image_format in VARIANT_FORMATS:
+            for width in widths:
+                name, height = encode_variant(image, width, image_format)
+                variants.append(RecipeCoverVariant(
+                    recipe=recipe, format=image_format,
+                    width=width, height=height, file=name,
+                ))
+
+    return variants
+
+
+def delete_cover_variants(recipe_id, keep=()):
+    from recipes.models import RecipeCoverVariant
+
+    old_variants = RecipeCoverVariant.objects.filter(
+        recipe_id=recipe_id,
+    ).exclude(file__in=keep)
+    old_names = set(old_variants.values_list('file', flat=True))
+
+    if not old_names:
+        return
+
+    old_variants.delete()
+
+    def delete_files():
+        # Another recipe may share a file if both had the same cover
+        in_use = set(RecipeCoverVariant.objects.filter(
+            file__in=old_names,
+        ).values_list('file', flat=True))
+
+        for name in old_names - in_use:
+            default_storage.delete(name)
+
+    transaction.on_commit(delete_files)
+
+
+def process_cover(recipe_id, cover_name):
+    from recipes.models import Recipe, RecipeCoverVariant
+
+    # Filtering by cover too, in case it was replaced after being queued
+    recipes = Recipe.objects.filter(pk=recipe_id, cover=cover_name)
+
+    if not recipes.update(cover_status=Recipe.CoverStatus.PROCESSING):
+        return
+
+    try:
+        recipe = recipes.get()
+        variants = make_cover_variants(recipe)
+    except Exception:
+        logger.exception('Could not process cover %s', cover_name)
+        recipes.update(
+            cover_status=Recipe.CoverStatus.FAILED,
+            updated_at=timezone.now(),
+        )
+        return
+
+    with transaction.atomic():
+        delete_cover_variants(
+            recipe_id, keep=[variant.file.name for variant in variants],
+        )
+        RecipeCoverVariant.objects.bulk_create(
+            variants, ignore_conflicts=True,
+        )
+        recipes.update(
+            cover_status=Recipe.CoverStatus.READY,
+            updated_at=timezone.now(),
+        )
+        bump_generations(*recipe_namespaces(
+            recipe.category_id, recipe.tags.values_list('slug', flat=True),
+        ))
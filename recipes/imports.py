@@ -0,0 +1,366 @@
+import csv
+import json
+import logging
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils.text import slugify
+
+from recipes.images import run_in_worker
+from recipes.search import normalize_title
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ('jsonl', 'csv')
+
+# Columns read from each row, anything else (e.g. the id and urls of an
+# export) is ignored
+IMPORT_FIELDS = (
+    'title', 'description', 'preparation_time', 'preparation_time_unit',
+    'servings', 'servings_unit', 'preparation_steps',
+    'preparation_steps_is_html', 'is_published',
+)
+
+# CSV has no lists: "Cake|Sweet"
+CSV_TAGS_SEPARATOR = '|'
+CSV_BOOLEAN_FIELDS = ('is_published', 'preparation_steps_is_html')
+CSV_BOOLEANS = {'true': True, 'false': False}
+
+
+def get_format(path):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return 'jsonl' if extension in ('json', 'ndjson') else extension
+
+
+def read_rows(lines, file_format):
+    # Yields (line number, row), row is None for lines that can not be read
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+
+        for row in reader:
+            tags = row.get('tags') or ''
+            row['tags'] = [
+                tag for tag in tags.split(CSV_TAGS_SEPARATOR) if tag.strip()
+            ]
+
+            # Model fields only take "True" and "False" as text
+            for field_name in CSV_BOOLEAN_FIELDS:
+                value = (row.get(field_name) or '').strip().lower()
+                row[field_name] = CSV_BOOLEANS.get(value, row.get(field_name))
+
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None
+            continue
+
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def init_cover_worker():
+    # Spawned processes start without Django, not forked with the
+    # connections of the command
+    django.setup()
+
+
+class CoverPool:
+    # Resizes covers in other processes, one per core, the threads of
+    # recipes.images are enough for the uploads of the site but not for
+    # a whole import. workers=0 processes them in the command itself.
+    def __init__(self, workers=0):
+        self.executor = None
+        self.pending = {}
+        self.max_pending = workers * 100
+        self.failed = []
+
+        if workers > 0:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_cover_worker,
+            )
+
+    def submit(self, recipe_id, cover_name):
+        if self.executor is None:
+            run_in_worker(recipe_id, cover_name)
+            return
+
+        # Keeps the queue (and the memory it takes) bounded
+        if len(self.pending) >= self.max_pending:
+            done, _ = wait(self.pending, return_when=FIRST_COMPLETED)
+            self.check(done)
+
+        future = self.executor.submit(run_in_worker, recipe_id, cover_name)
+        self.pending[future] = recipe_id
+
+    def check(self, futures):
+        for future in futures:
+            recipe_id = self.pending.pop(future)
+            error = future.exception()
+
+            if error is not None:
+                logger.error(
+                    'Could not process the cover of recipe %s: %r',
+                    recipe_id, error,
+                )
+                self.failed.append(recipe_id)
+
+    def close(self):
+        from recipes.models import Recipe
+
+        if self.executor is None:
+            return
+
+        self.executor.shutdown(wait=True)
+        self.check(list(self.pending))
+
+        # Left for the process_covers command
+        Recipe.objects.filter(pk__in=self.failed).update(
+            cover_status=Recipe.CoverStatus.FAILED,
+        )
+
+
+class RecipeImporter:
+    def __init__(
+        self, author, covers_dir='', batch_size=IMPORT_BATCH_SIZE,
+        cover_pool=None,
+    ):
+        from recipes.models import Category
+        from tag.models import Tag
+
+        self.author = author
+        self.covers_dir = covers_dir
+        self.batch_size = batch_size
+        self.cover_pool = cover_pool or CoverPool()
+        self.imported = 0
+        self.published = 0
+
+        # Every category and tag is looked up here, not once per row
+        self.categories = dict(Category.objects.values_list('name', 'pk'))
+        self.tags = dict(Tag.objects.values_list('name', 'pk'))
+        self.tag_slugs = set(Tag.objects.values_list('slug', flat=True))
+
+    def import_rows(self, rows):
+        # Yields (line number, errors) of the rows that were skipped
+        batch = []
+
+        for line_number, row in rows:
+            if row is None:
+                yield line_number, {'non_field_errors': ['Invalid row.']}
+                continue
+
+            try:
+                batch.append((line_number, self.make_item(row)))
+            except ValidationError as error:
+                yield line_number, error.message_dict
+                continue
+
+            if len(batch) >= self.batch_size:
+                yield from self.write_batch(batch)
+                batch = []
+
+        if batch:
+            yield from self.write_batch(batch)
+
+        if self.published:
+            from recipes.cache import bump_generations
+            bump_generations('all')
+
+    def make_item(self, row):
+        from recipes.models import Recipe
+
+        recipe = Recipe(author=self.author, **{
+            field_name: row[field_name] for field_name in IMPORT_FIELDS
+            if row.get(field_name) not in (None, '')
+        })
+        # Converts the values read as text, e.g. "10" or "true"
+        recipe.clean_fields(exclude=['slug', 'cover', 'category', 'author'])
+        recipe.normalized_title = normalize_title(recipe.title)
+
+        tags = row.get('tags') or []
+
+        if not isinstance(tags, list):
+            raise ValidationError({'tags': ['Expected a list of names.']})
+
+        cover_path = row.get('cover') or ''
+
+        if cover_path:
+            cover_path = os.path.join(self.covers_dir, cover_path)
+
+            if not os.path.isfile(cover_path):
+                raise ValidationError({'cover': ['File not found.']})
+
+        tags = (str(tag).strip() for tag in tags)
+        return (
+            recipe, (row.get('category') or '').strip(),
+            list(dict.fromkeys(tag for tag in tags if tag)), cover_path,
+        )
+
+    def create_categories(self, names):
+        from recipes.models import Category
+
+        new = [
+            Category(name=name) for name in dict.fromkeys(names)
+            if name and name not in self.categories
+        ]
+        Category.objects.bulk_create(new)
+        self.categories.update(
+            (category.name, category.pk) for category in new
+        )
+
+        # What the Category signals do, bulk_create sends none
+        if new:
+            from recipes import metadata
+            from recipes.cache import bump_generations
+            bump_generations(metadata.CATEGORIES)
+
+    def create_tags(self, names):
+        from tag.models import Tag
+
+        new = []
+
+        for name in dict.fromkeys(names):
+            if not name or name in self.tags:
+                continue
+
+            tag = Tag(name=name, slug=slugify(name))
+
+            # The plain slug of the name while it is free, unlike Tag.save()
+            # that always adds random letters, so imported tags get readable
+            # urls. Taken ones fall back to the random letters of Tag.save().
+            while not tag.slug or tag.slug in self.tag_slugs:
+                tag.slug = tag.make_slug()
+
+            self.tag_slugs.add(tag.slug)
+            new.append(tag)
+
+        Tag.objects.bulk_create(new)
+        self.tags.update((tag.name, tag.pk) for tag in new)
+
+        if new:
+            from recipes import metadata
+            from recipes.cache import bump_generations
+            bump_generations(metadata.TAGS)
+
+    def check_titles(self, batch):
+        # One lookup on the normalized_title index for the whole batch,
+        # returns the items to write and the errors of the others
+        from recipes.models import TITLE_TAKEN, Recipe
+
+        taken = set(Recipe.objects.filter(normalized_title__in=[
+            recipe.normalized_title for _, (recipe, *_) in batch
+        ]).values_list('normalized_title', flat=True))
+        items = []
+        skipped = []
+
+        for line_number, item in batch:
+            normalized_title = item[0].normalized_title
+
+            # Also taken by a row before this one
+            if normalized_title in taken:
+                skipped.append((line_number, {'title': [TITLE_TAKEN]}))
+                continue
+
+            taken.add(normalized_title)
+            items.append(item)
+
+        return items, skipped
+
+    def set_slugs(self, recipes):
+        # One query per round for the whole batch, a second round only for
+        # the few random slugs that were already taken
+        from recipes.models import Recipe
+
+        used = set()
+
+        while recipes:
+            for recipe in recipes:
+                recipe.slug = recipe.make_slug()
+
+            used.update(Recipe.objects.filter(
+                slug__in=[recipe.slug for recipe in recipes],
+            ).values_list('slug', flat=True))
+            taken = []
+
+            for recipe in recipes:
+                if recipe.slug in used:
+                    taken.append(recipe)
+                else:
+                    used.add(recipe.slug)
+
+            recipes = taken
+
+    def store_cover(self, recipe, cover_path):
+        # Same name and status as an upload, the resizing happens after
+        # the batch is committed
+        cover_field = recipe._meta.get_field('cover')
+        name = cover_field.generate_filename(
+            recipe, os.path.basename(cover_path),
+        )
+
+        with open(cover_path, 'rb') as cover_file:
+            recipe.cover = cover_field.storage.save(name, File(cover_file))
+
+        recipe.cover_status = recipe.CoverStatus.PENDING
+
+    def write_batch(self, batch):
+        from recipes import counters
+        from recipes.models import Recipe, RecipeSearchTerm
+        from recipes.search import make_search_terms
+
+        Through = Recipe.tags.through
+
+        with transaction.atomic():
+            batch, skipped = self.check_titles(batch)
+            recipes = [recipe for recipe, _, _, _ in batch]
+            self.create_categories(name for _, name, _, _ in batch)
+            self.create_tags(
+                name for _, _, names, _ in batch for name in names
+            )
+            self.set_slugs(recipes)
+
+            for recipe, category_name, _, cover_path in batch:
+                recipe.category_id = self.categories.get(category_name)
+
+                if cover_path:
+                    self.store_cover(recipe, cover_path)
+
+            Recipe.objects.bulk_create(recipes, self.batch_size)
+            Through.objects.bulk_create([
+                Through(recipe_id=recipe.pk, tag_id=self.tags[name])
+                for recipe, _, names, _ in batch for name in names
+            ], self.batch_size)
+            RecipeSearchTerm.objects.bulk_create([
+                term
+                for recipe in recipes for term in make_search_terms(recipe)
+            ], self.batch_size)
+            counters.change_counts(Counter(
+                key for recipe, _, names, _ in batch
+                for key in counters.recipe_keys(
+                    recipe.is_published, recipe.category_id,
+                    recipe.author_id, [self.tags[name] for name in names],
+                )
+            ))
+
+        self.imported += len(recipes)
+        self.published += sum(recipe.is_published for recipe in recipes)
+
+        for recipe in recipes:
+            if recipe.cover:
+                self.cover_pool.submit(recipe.pk, recipe.cover.name)
+
+        return skipped
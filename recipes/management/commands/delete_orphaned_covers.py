@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from recipes.orphans import ORPHANS_BATCH_SIZE, ORPHANS_MIN_AGE, find_orphans
+
+
+class Command(BaseCommand):
+    help = (
+        'Lists the cover files no recipe points to, e.g. left by a failed '
+        'save, and deletes them with --delete'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true')
+        parser.add_argument(
+            '--min-age-hours', type=float,
+            default=ORPHANS_MIN_AGE.total_seconds() / 3600,
+            help='Newer files may belong to a save still running',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Directories checked in parallel, 0 to check them in turn',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=ORPHANS_BATCH_SIZE,
+            help='File names looked up in the database per query',
+        )
+
+    def handle(self, *args, **options):
+        results = find_orphans(
+            delete=options['delete'],
+            min_age=timedelta(hours=options['min_age_hours']),
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+        )
+        checked = orphaned = 0
+
+        for directory, files, orphans in results:
+            checked += files
+            orphaned += len(orphans)
+
+            for name in orphans:
+                self.stdout.write(name)
+
+        action = 'deleted' if options['delete'] else 'found'
+        self.stdout.write(self.style.SUCCESS(
+            f'{orphaned} orphaned files {action}, {checked} files checked'
+        ))
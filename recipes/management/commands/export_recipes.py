@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from recipes.export import (EXPORT_CHUNK_SIZE, export_recipes,
+                            get_export_queryset, parse_updated_since)
+
+
+class Command(BaseCommand):
+    help = (
+        'Exports the published recipes as NDJSON, one recipe per line, '
+        'as the v2 API shows them (urls are relative)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', '-o',
+            help='File to write to, defaults to stdout',
+        )
+        parser.add_argument('--category-id', type=int)
+        parser.add_argument(
+            '--updated-since',
+            help='YYYY-MM-DD or an ISO 8601 date',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        updated_since = options['updated_since']
+
+        if updated_since:
+            try:
+                updated_since = parse_updated_since(updated_since)
+            except ValueError as error:
+                raise CommandError(error)
+
+        queryset = get_export_queryset(
+            category_id=options['category_id'],
+            updated_since=updated_since,
+        )
+        lines = export_recipes(queryset, chunk_size=options['chunk_size'])
+
+        if not options['output']:
+            for chunk in lines:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            for chunk in lines:
+                output.write(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Recipes exported to {options["output"]}')
+        )
@@ -0,0 +1,82 @@
+import os
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from recipes.imports import (IMPORT_BATCH_SIZE, IMPORT_FORMATS, CoverPool,
+                             RecipeImporter, get_format, read_rows)
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports recipes from a JSONL or CSV file, in batches. Categories '
+        'and tags are found or created by name, covers are paths to image '
+        'files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to read, - for stdin')
+        parser.add_argument(
+            '--author', required=True, help='Username of the author',
+        )
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS,
+            help='Defaults to the extension of the file, else jsonl',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--covers-dir', default='',
+            help='Directory the cover paths are relative to',
+        )
+        parser.add_argument(
+            '--cover-workers', type=int, default=os.cpu_count() or 1,
+            help='Processes resizing covers, 0 to resize them in turn',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["author"]}" does not exist')
+
+        file_format = options['format'] or get_format(options['path'])
+
+        if file_format not in IMPORT_FORMATS:
+            file_format = 'jsonl'
+
+        cover_pool = CoverPool(options['cover_workers'])
+        importer = RecipeImporter(
+            author, covers_dir=options['covers_dir'],
+            batch_size=options['batch_size'], cover_pool=cover_pool,
+        )
+
+        if options['path'] == '-':
+            lines = sys.stdin
+        else:
+            lines = open(options['path'], encoding='utf-8', newline='')
+
+        skipped = 0
+
+        try:
+            rows = read_rows(lines, file_format)
+
+            for line_number, errors in importer.import_rows(rows):
+                skipped += 1
+                self.stderr.write(f'Line {line_number}: {errors}')
+        finally:
+            cover_pool.close()
+
+            if lines is not sys.stdin:
+                lines.close()
+
+        if cover_pool.failed:
+            self.stderr.write(
+                f'{len(cover_pool.failed)} covers could not be processed, '
+                f'run process_covers to retry them'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{importer.imported} recipes imported, {skipped} skipped'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from recipes.images import process_cover
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        'Processes recipe covers left pending or failed, e.g. the ones '
+        'queued when the server was restarted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status', nargs='+',
+            default=[Recipe.CoverStatus.PENDING, Recipe.CoverStatus.FAILED],
+            choices=Recipe.CoverStatus.values,
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.filter(
+            cover_status__in=options['status'],
+        ).exclude(cover='').values_list('pk', 'cover')
+
+        processed = 0
+
+        for recipe_id, cover_name in recipes.iterator():
+            process_cover(recipe_id, cover_name)
+            processed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{processed} covers processed')
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from recipes.models import Recipe
+from recipes.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the recipes search index from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(
+            Recipe.objects.all(),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'{indexed} recipes indexed')
+        )
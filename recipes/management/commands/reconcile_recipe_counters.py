@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from recipes.cache import bump_generations
+from recipes.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        'Recounts the published recipes and repairs the counters that '
+        'drifted, e.g. after bulk updates that send no signals'
+    )
+
+    def handle(self, *args, **options):
+        drift = reconcile()
+
+        # Counts are shown in the cached pages and API responses
+        if drift:
+            bump_generations('all')
+
+        for key, (stored, real) in sorted(drift.items()):
+            self.stdout.write(f'{key}: {stored} -> {real}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{len(drift)} counters repaired')
+        )
@@ -0,0 +1,119 @@
+import threading
+import time
+
+from django.conf import settings
+from recipes.cache import get_generations
+
+# Generations (see recipes.cache) bumped by the Category and Tag signals
+CATEGORIES = 'categories'
+TAGS = 'tags'
+
+
+class MetadataCache:
+    # Whole small tables kept in each process, reloaded when their
+    # generation changes. The generations of the default in-process cache
+    # only change with the writes of the same process, the tables are
+    # also reloaded after METADATA_CACHE_TIMEOUT seconds.
+    # The objects are shared, never change them.
+    def __init__(self, namespace, load):
+        self.namespace = namespace
+        self.load = load
+        self.version = None
+        self.data = None
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def is_expired(self):
+        if self.loaded_at is None:
+            return True
+
+        age = time.monotonic() - self.loaded_at
+        return age >= settings.METADATA_CACHE_TIMEOUT
+
+    def get_version(self):
+        return get_generations([self.namespace])[0]
+
+    def get_data(self):
+        version = self.get_version()
+
+        if version == self.version and not self.is_expired():
+            return self.data
+
+        with self.lock:
+            if version != self.version or self.is_expired():
+                # Rows changed after reading the version come with a
+                # newer one, they are loaded again on the next call
+                self.data = self.load()
+                self.version = version
+                self.loaded_at = time.monotonic()
+
+        return self.data
+
+
+def load_categories():
+    from recipes.models import Category
+
+    return {category.pk: category for category in Category.objects.all()}
+
+
+def load_tags():
+    from tag.models import Tag
+
+    tags = list(Tag.objects.all())
+    return {
+        'by_id': {tag.pk: tag for tag in tags},
+        'by_slug': {tag.slug: tag for tag in tags},
+    }
+
+
+categories = MetadataCache(CATEGORIES, load_categories)
+tags = MetadataCache(TAGS, load_tags)
+
+
+def to_pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Rows missing from the tables of the process may have been created by
+# another process since they were loaded, they are looked up one by one
+def get_category(category_id):
+    from recipes.models import Category
+
+    pk = to_pk(category_id)
+    category = categories.get_data().get(pk)
+
+    if category is None and pk is not None:
+        category = Category.objects.filter(pk=pk).first()
+
+    return category
+
+
+def get_category_name(category_id):
+    category = get_category(category_id)
+    return None if category is None else category.name
+
+
+def get_tag(tag_id):
+    from tag.models import Tag
+
+    pk = to_pk(tag_id)
+    tag = tags.get_data()['by_id'].get(pk)
+
+    if tag is None and pk is not None:
+        tag = Tag.objects.filter(pk=pk).first()
+
+    return tag
+
+
+def get_tag_by_slug(slug):
+    from tag.models import Tag
+
+    tag = tags.get_data()['by_slug'].get(slug)
+
+    if tag is None and slug:
+        tag = Tag.objects.filter(slug=slug).first()
+
+    return tag
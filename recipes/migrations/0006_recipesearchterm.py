@@ -0,0 +1,40 @@
+# Generated by Django 4.0 on 2026-10-18 08:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_search_index(apps, schema_editor):
+    from recipes.search import rebuild_index
+
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeSearchTerm = apps.get_model('recipes', 'RecipeSearchTerm')
+    rebuild_index(Recipe.objects.all(), SearchTermModel=RecipeSearchTerm)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_alter_recipe_options_alter_recipe_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=65)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('recipe', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='recipes.recipe')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='recipesearchterm',
+            index=models.Index(fields=['term', 'recipe', 'weight'], name='recipes_search_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipesearchterm',
+            index=models.Index(fields=['recipe', 'term', 'weight'], name='recipes_search_recipe_idx'),
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
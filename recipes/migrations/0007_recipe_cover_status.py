@@ -0,0 +1,27 @@
+# Generated by Django 4.0 on 2026-10-18 08:04
+
+from django.db import migrations, models
+
+
+def mark_existing_covers_as_ready(apps, schema_editor):
+    # Until now covers were resized synchronously on save
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.exclude(cover='').update(cover_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipesearchterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='cover_status',
+            field=models.CharField(choices=[('none', 'No cover'), ('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', editable=False, max_length=10),
+        ),
+        migrations.RunPython(
+            mark_existing_covers_as_ready, migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0 on 2026-10-18 08:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_cover_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeCoverVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=4)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('file', models.ImageField(upload_to='recipes/covers/variants/')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cover_variants', to='recipes.recipe')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='recipecovervariant',
+            constraint=models.UniqueConstraint(fields=('recipe', 'format', 'width'), name='recipes_cover_variant_unique'),
+        ),
+    ]
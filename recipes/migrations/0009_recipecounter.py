@@ -0,0 +1,33 @@
+# Generated by Django 4.0 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+def count_recipes(apps, schema_editor):
+    from recipes.counters import count_all
+
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeCounter = apps.get_model('recipes', 'RecipeCounter')
+    RecipeCounter.objects.bulk_create([
+        RecipeCounter(key=key, value=value)
+        for key, value in count_all(Recipe).items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipecovervariant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=65, unique=True)),
+                ('value', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_recipes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.0 on 2026-10-18 08:58
+
+from django.db import migrations, models
+
+
+def normalize_titles(apps, schema_editor):
+    from recipes.search import normalize_title
+
+    Recipe = apps.get_model('recipes', 'Recipe')
+    taken = set()
+    recipes = []
+
+    # The oldest recipe keeps a title saved more than once, the others
+    # stay null until their title changes
+    for recipe in Recipe.objects.order_by('pk').only('pk', 'title'):
+        normalized_title = normalize_title(recipe.title)
+
+        if normalized_title in taken:
+            continue
+
+        taken.add(normalized_title)
+        recipe.normalized_title = normalized_title
+        recipes.append(recipe)
+
+    Recipe.objects.bulk_update(recipes, ['normalized_title'], 1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipecounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='normalized_title',
+            field=models.CharField(editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(normalize_titles, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='recipe',
+            name='normalized_title',
+            field=models.CharField(editable=False, max_length=255, null=True, unique=True),
+        ),
+    ]
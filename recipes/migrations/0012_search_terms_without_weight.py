@@ -0,0 +1,33 @@
+# Generated by Django 4.0 on 2026-10-18 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recipesearchterm',
+            name='recipes_search_term_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recipesearchterm',
+            name='recipes_search_recipe_idx',
+        ),
+        migrations.RemoveField(
+            model_name='recipesearchterm',
+            name='weight',
+        ),
+        migrations.AddIndex(
+            model_name='recipesearchterm',
+            index=models.Index(fields=['term', 'recipe'], name='recipes_search_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipesearchterm',
+            index=models.Index(fields=['recipe', 'term'], name='recipes_search_recipe_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0 on 2026-10-18 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_search_terms_without_weight'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='cover',
+            field=models.ImageField(blank=True, db_index=True, default='', upload_to='recipes/covers/%Y/%m/%d/'),
+        ),
+        migrations.AlterField(
+            model_name='recipecovervariant',
+            name='file',
+            field=models.ImageField(db_index=True, upload_to='recipes/covers/variants/'),
+        ),
+    ]
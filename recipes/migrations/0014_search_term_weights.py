@@ -0,0 +1,44 @@
+# Generated by Django 4.0 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+def build_search_index(apps, schema_editor):
+    # The terms of 0012 have no weight, before the indexes are built
+    from recipes.search import rebuild_index
+
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeSearchTerm = apps.get_model('recipes', 'RecipeSearchTerm')
+    rebuild_index(Recipe.objects.all(), SearchTermModel=RecipeSearchTerm)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_cover_file_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recipesearchterm',
+            name='recipes_search_term_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recipesearchterm',
+            name='recipes_search_recipe_idx',
+        ),
+        migrations.AddField(
+            model_name='recipesearchterm',
+            name='weight',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipesearchterm',
+            index=models.Index(fields=['term', 'recipe', 'weight'], name='recipes_search_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipesearchterm',
+            index=models.Index(fields=['recipe', 'term', 'weight'], name='recipes_search_recipe_idx'),
+        ),
+    ]
@@ -1,20 +1,23 @@
-import os
 from collections import defaultdict
 import string
 
-from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
-from django.db.models import F, Value
+from django.db.models import F, Q, Value
 from django.db.models.functions import Concat
 from django.forms import ValidationError
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
-from PIL import Image
 from tag.models import Tag
 from random import SystemRandom
 
+from recipes import metadata
+from recipes.images import enqueue_cover_processing
+from recipes.search import INDEXED_FIELDS, normalize_title
+
+TITLE_TAKEN = 'Found recipes with the same title'
+
 
 class Category(models.Model):
     name = models.CharField(max_length=65)
@@ -33,12 +36,33 @@ class RecipeManager(models.Manager):
                 F('author__last_name'), Value(' ('),
                 F('author__username'), Value(')'),
             )
-        ).order_by('-id').select_related('category', 'author').prefetch_related('tags')
+        ).order_by('-id').select_related(
+            'author', 'category',
+        ).prefetch_related('tags', 'cover_variants')
+
+    def title_taken(self, title, exclude_pk=None):
+        # Lookup on the unique index of normalized_title
+        return self.filter(
+            normalized_title=normalize_title(title),
+        ).exclude(pk=exclude_pk).exists()
 
 
 class Recipe(models.Model):
+    class CoverStatus(models.TextChoices):
+        NONE = 'none', _('No cover')
+        PENDING = 'pending', _('Pending')
+        PROCESSING = 'processing', _('Processing')
+        READY = 'ready', _('Ready')
+        FAILED = 'failed', _('Failed')
+
     objects = RecipeManager()
     title = models.CharField(max_length=65, verbose_name=_('Title'))
+    # recipes.search.normalize_title(title), set when the title changes.
+    # Null only for recipes saved with a taken title before it existed,
+    # until they get another title.
+    normalized_title = models.CharField(
+        max_length=255, unique=True, null=True, editable=False,
+    )
     description = models.CharField(max_length=165)
     slug = models.SlugField(unique=True)
     preparation_time = models.IntegerField()
@@ -50,74 +74,202 @@ class Recipe(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_published = models.BooleanField(default=False)
+    # Indexed for recipes.orphans, which looks files up by name
     cover = models.ImageField(
-        upload_to='recipes/covers/%Y/%m/%d/', blank=True, default='')
+        upload_to='recipes/covers/%Y/%m/%d/', blank=True, default='',
+        db_index=True,
+    )
+    cover_status = models.CharField(
+        max_length=10, choices=CoverStatus.choices,
+        default=CoverStatus.NONE, editable=False,
+    )
     category = models.ForeignKey(
         Category, on_delete=models.SET_NULL, null=True, blank=True,
         default=None,
     )
+    # Indexed by recipes_author_published_idx
     author = models.ForeignKey(
-        User, on_delete=models.SET_NULL, null=True
+        User, on_delete=models.SET_NULL, null=True, db_index=False,
     )
     tags = models.ManyToManyField(Tag, blank=True, default='')
 
+    # Values as loaded from the database. The signals compare them with
+    # the new ones instead of querying the row again on every save
+    TRACKED_FIELDS = (
+        'cover', 'is_published', 'category_id', 'author_id', *INDEXED_FIELDS,
+    )
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_saved_state()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_saved_state(kwargs.get('fields'))
+
+    def get_tracked_value(self, field_name):
+        if field_name == 'cover':
+            return self.cover.name or ''
+
+        return getattr(self, field_name)
+
+    def remember_saved_state(self, field_names=None):
+        if field_names is None:
+            field_names = self.TRACKED_FIELDS
+
+        deferred = self.get_deferred_fields()
+        saved_state = getattr(self, '_saved_state', {})
+
+        for field_name in field_names:
+            if field_name == 'category':
+                field_name = 'category_id'
+            elif field_name == 'author':
+                field_name = 'author_id'
+
+            if field_name in self.TRACKED_FIELDS and \
+                    field_name not in deferred:
+                saved_state[field_name] = self.get_tracked_value(field_name)
+
+        self._saved_state = saved_state
+
+    def get_saved_state(self):
+        # None for a recipe that is not in the database yet
+        if self.pk is None:
+            return None
+
+        saved_state = getattr(self, '_saved_state', {})
+
+        if len(saved_state) == len(self.TRACKED_FIELDS):
+            return dict(saved_state)
+
+        # Not loaded from the database (e.g. Recipe(pk=1)) or deferred
+        return Recipe.objects.filter(pk=self.pk).values(
+            *self.TRACKED_FIELDS,
+        ).first()
+
+    def title_changed(self):
+        # Also true for a recipe that is not in the database yet
+        return not self.keeps_title(self.title, exact=True)
+
+    def keeps_title(self, title, exact=False):
+        # The saved title or, unless exact, another spelling of it (case,
+        # accents). normalized_title only changes on save.
+        saved_state = getattr(self, '_saved_state', {})
+
+        if 'title' in saved_state and title == saved_state['title']:
+            return True
+
+        return not exact and self.normalized_title is not None and \
+            normalize_title(title) == self.normalized_title
+
     def get_absolute_url(self):
         return reverse('recipes:recipe', args=(self.id,))
 
-    @staticmethod
-    def resize_image(image, new_width=800):
-        image_full_path = os.path.join(settings.MEDIA_ROOT, image.name)
-        image_pillow = Image.open(image_full_path)
-        original_width, original_height = image_pillow.size
+    def get_category(self):
+        # Lists select the category with the recipe: cards and ETags are
+        # keyed by updated_at, which a renamed category bumps before the
+        # per-process table of other processes is reloaded
+        if Recipe.category.is_cached(self):
+            return self.category
+
+        return metadata.get_category(self.category_id)
+
+    def get_cover_variants(self):
+        # {'webp': [variant, ...], 'jpeg': [...]}, smallest width first.
+        # Uses .all() so list views can prefetch_related('cover_variants')
+        variants = defaultdict(list)
+        all_variants = sorted(
+            self.cover_variants.all(), key=lambda variant: variant.width,
+        )
+
+        for variant in all_variants:
+            variants[variant.format].append(variant)
+
+        return {
+            image_format: variants[image_format]
+            for image_format in RecipeCoverVariant.Format.values
+            if variants[image_format]
+        }
 
-        if original_width <= new_width:
-            image_pillow.close()
-            return
+    @property
+    def cover_sources(self):
+        return [
+            {
+                'type': f'image/{image_format}',
+                'srcset': ', '.join(
+                    f'{variant.file.url} {variant.width}w'
+                    for variant in variants
+                ),
+            }
+            for image_format, variants in self.get_cover_variants().items()
+        ]
 
-        new_height = round((new_width * original_height) / original_width)
+    @property
+    def cover_src(self):
+        # Largest JPEG derivative, or the original while it is processed
+        jpeg_variants = self.get_cover_variants().get(
+            RecipeCoverVariant.Format.JPEG
+        )
+
+        if jpeg_variants:
+            return jpeg_variants[-1].file.url
+
+        return self.cover.url if self.cover else ''
 
-        new_image = image_pillow.resize((new_width, new_height), Image.LANCZOS)
-        new_image.save(
-            image_full_path,
-            optimize=True,
-            quality=50,
+    def make_slug(self):
+        rand_letters = ''.join(
+            SystemRandom().choices(
+                string.ascii_letters + string.digits,
+                k=5,
+            )
         )
+        return slugify(f'{self.title}-{rand_letters}')
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            rand_letters = ''.join(
-                SystemRandom().choices(
-                    string.ascii_letters + string.digits,
-                    k=5,
-                )
-            )
-            self.slug = slugify(f'{self.title}-{rand_letters}')
+            self.slug = self.make_slug()
+
+        if self.title_changed():
+            self.normalized_title = normalize_title(self.title)
+
+        # A cover that was just uploaded is stored as is, resizing happens
+        # in the background after the transaction commits (recipes.images)
+        has_new_cover = bool(self.cover) and not self.cover._committed
+
+        if has_new_cover:
+            self.cover_status = self.CoverStatus.PENDING
+        elif not self.cover:
+            self.cover_status = self.CoverStatus.NONE
+
+        update_fields = kwargs.get('update_fields')
+
+        if update_fields is not None and 'cover' in update_fields:
+            update_fields = kwargs['update_fields'] = {
+                *update_fields, 'cover_status',
+            }
+
+        if update_fields is not None and 'title' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_title'}
 
         saved = super().save(*args, **kwargs)
+        self.remember_saved_state(kwargs.get('update_fields'))
 
-        if self.cover:
-            try:
-                self.resize_image(self.cover, 840)
-            except FileNotFoundError:
-                ...
+        if has_new_cover:
+            enqueue_cover_processing(self)
 
         return saved
 
     def clean(self, *args, **kwargs):
         error_messages = defaultdict(list)
 
-        recipe_from_db = Recipe.objects.filter(
-            title__iexact=self.title
-        ).first()
-
-        if recipe_from_db:
-            if recipe_from_db.pk != self.pk:
-                error_messages['title'].append(
-                    'Found recipes with the same title'
-                )
+        if not self.keeps_title(self.title) and \
+                Recipe.objects.title_taken(self.title, exclude_pk=self.pk):
+            error_messages['title'].append(TITLE_TAKEN)
 
         if error_messages:
             raise ValidationError(error_messages)
@@ -125,3 +277,89 @@ class Recipe(models.Model):
     class Meta:
         verbose_name = _('Recipe')
         verbose_name_plural = _('Recipes')
+        # The shapes of the list queries: published recipes, newest first,
+        # optionally of one category. Partial, the WHERE is_published Django
+        # generates can not use is_published as an index column on SQLite.
+        # Authors list their own recipes, published or not (dashboard).
+        # See test_recipe_query_plans.
+        indexes = [
+            models.Index(
+                fields=['-id'], condition=Q(is_published=True),
+                name='recipes_published_idx',
+            ),
+            models.Index(
+                fields=['category', '-id'], condition=Q(is_published=True),
+                name='recipes_category_published_idx',
+            ),
+            models.Index(
+                fields=['author', 'is_published', '-id'],
+                name='recipes_author_published_idx',
+            ),
+        ]
+
+
+class RecipeCoverVariant(models.Model):
+    # Resized copies of Recipe.cover, generated by recipes.images.
+    # File names are the hash of their content, so they can be cached forever
+    class Format(models.TextChoices):
+        WEBP = 'webp', 'WebP'
+        JPEG = 'jpeg', 'JPEG'
+
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name='cover_variants',
+    )
+    format = models.CharField(max_length=4, choices=Format.choices)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.ImageField(
+        upload_to='recipes/covers/variants/', db_index=True,
+    )
+
+    def __str__(self):
+        return self.file.name
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'format', 'width'],
+                name='recipes_cover_variant_unique',
+            ),
+        ]
+
+
+class RecipeSearchTerm(models.Model):
+    # Inverted index used by recipes.search. Kept in sync by recipes.signals
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name='search_terms',
+        db_index=False,
+    )
+    term = models.CharField(max_length=65)
+    weight = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return self.term
+
+    class Meta:
+        # Both are covering indexes: the first finds the recipes of a term
+        # prefix, the second whether one recipe has it and its rank
+        indexes = [
+            models.Index(
+                fields=['term', 'recipe', 'weight'],
+                name='recipes_search_term_idx',
+            ),
+            models.Index(
+                fields=['recipe', 'term', 'weight'],
+                name='recipes_search_recipe_idx',
+            ),
+        ]
+
+
+class RecipeCounter(models.Model):
+    # Number of published recipes, kept by recipes.counters so listings
+    # don't need a COUNT(*). Keys: 'published', 'category:<id>',
+    # 'tag:<id>' and 'author:<id>'
+    key = models.CharField(max_length=65, unique=True)
+    value = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.key}: {self.value}'
@@ -0,0 +1,150 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from recipes.images import VARIANT_UPLOAD_TO
+
+COVER_UPLOAD_TO = 'recipes/covers/'
+# Names looked up per query, under the 999 parameters of older SQLite
+ORPHANS_BATCH_SIZE = 500
+
+# Files younger than this may belong to a save that has not committed yet
+ORPHANS_MIN_AGE = timedelta(days=1)
+
+
+def get_storage():
+    from recipes.models import Recipe
+    return Recipe._meta.get_field('cover').storage
+
+
+def get_directories(storage):
+    # recipes/covers/%Y/%m/%d/ of Recipe.cover and the variants directory,
+    # each one is checked on its own, in parallel with the others
+    from recipes.models import Recipe, RecipeCoverVariant
+
+    directories = []
+
+    # A directory per hash prefix, and the variants stored directly in it
+    # before the prefixes
+    if storage.exists(VARIANT_UPLOAD_TO):
+        directories.append((VARIANT_UPLOAD_TO, RecipeCoverVariant, 'file'))
+        directories += [
+            (f'{VARIANT_UPLOAD_TO}{name}/', RecipeCoverVariant, 'file')
+            for name in sorted(storage.listdir(VARIANT_UPLOAD_TO)[0])
+        ]
+
+    if not storage.exists(COVER_UPLOAD_TO):
+        return directories
+
+    prefixes = [COVER_UPLOAD_TO]
+
+    for depth in range(3):
+        prefixes = [
+            f'{prefix}{name}/'
+            for prefix in prefixes
+            for name in sorted(storage.listdir(prefix)[0])
+            if f'{prefix}{name}/' != VARIANT_UPLOAD_TO
+        ]
+
+    directories += [(prefix, Recipe, 'cover') for prefix in prefixes]
+    return directories
+
+
+def iter_files(storage, directory):
+    # Names of the files of a directory. Read as they come where the
+    # storage has local files, a listing holds all of them at once.
+    try:
+        path = storage.path(directory)
+    except NotImplementedError:
+        yield from storage.listdir(directory)[1]
+        return
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                yield entry.name
+
+
+def get_referenced(Model, field_name, names):
+    # The names of one batch found in the database, looked up on the index
+    # of the column: memory and queries are bounded by the batch, whatever
+    # the size of the table
+    return set(Model.objects.filter(**{
+        f'{field_name}__in': names,
+    }).order_by().values_list(field_name, flat=True))
+
+
+def find_directory_orphans(
+    storage, directory, Model, field_name, delete=False,
+    min_age=ORPHANS_MIN_AGE, batch_size=ORPHANS_BATCH_SIZE,
+):
+    files = iter_files(storage, directory)
+    created_before = timezone.now() - min_age
+    checked = 0
+    orphans = []
+
+    while batch := list(islice(files, batch_size)):
+        names = [f'{directory}{name}' for name in sorted(batch)]
+        referenced = get_referenced(Model, field_name, names)
+        checked += len(names)
+
+        for name in names:
+            if name in referenced:
+                continue
+
+            if storage.get_modified_time(name) > created_before:
+                continue
+
+            if delete:
+                storage.delete(name)
+
+            orphans.append(name)
+
+    return checked, orphans
+
+
+def run_in_worker(*args, **kwargs):
+    # Worker threads open their own connections, never let them go stale
+    close_old_connections()
+
+    try:
+        return find_directory_orphans(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def find_orphans(
+    delete=False, min_age=ORPHANS_MIN_AGE, batch_size=ORPHANS_BATCH_SIZE,
+    workers=4,
+):
+    # Yields (directory, files checked, orphaned names) for each directory
+    storage = get_storage()
+    directories = get_directories(storage)
+    options = {
+        'delete': delete, 'min_age': min_age, 'batch_size': batch_size,
+    }
+
+    if workers <= 0:
+        for directory, Model, field_name in directories:
+            yield (directory, *find_directory_orphans(
+                storage, directory, Model, field_name, **options,
+            ))
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix='recipe-orphans',
+    ) as executor:
+        results = {
+            executor.submit(
+                run_in_worker, storage, directory, Model, field_name,
+                **options,
+            ): directory
+            for directory, Model, field_name in directories
+        }
+
+        for future, directory in results.items():
+            yield (directory, *future.result())
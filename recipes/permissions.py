@@ -3,7 +3,9 @@ from rest_framework import permissions
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.author == request.user
+        # Comparing ids does not load obj.author from the database
+        return request.user.is_authenticated and \
+            obj.author_id == request.user.pk
 
     def has_permission(self, request, view):
         return super().has_permission(request, view)
@@ -0,0 +1,166 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.db.models import (Exists, IntegerField, OuterRef, Q, Subquery,
+                              Sum)
+
+TERM_MAX_LENGTH = 65
+TOKEN_REGEX = re.compile(r'\w+')
+
+# How much a term found in each field is worth when ranking results. A
+# save that changes none of these fields keeps the index.
+FIELD_WEIGHTS = {
+    'title': 5,
+    'description': 3,
+    'preparation_steps': 1,
+}
+INDEXED_FIELDS = tuple(FIELD_WEIGHTS)
+
+# A word that starts this many indexed terms is common. A search with a
+# rarer word ranks the few recipes having it. A search of common words
+# only has too many recipes to rank, the newest ones come first: each one
+# is checked by the index until a page is full.
+COMMON_TERM_ROWS = 5000
+
+
+def fold_text(text):
+    # "Pão de Açúcar" -> "pao de acucar"
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.casefold()
+
+
+def normalize_title(title):
+    # "  Pão  de Açúcar " -> "pao de acucar", titles that only differ in
+    # case, accents or spacing are the same recipe
+    return ' '.join(fold_text(title).split())
+
+
+def tokenize(text):
+    return [
+        token[:TERM_MAX_LENGTH]
+        for token in TOKEN_REGEX.findall(fold_text(text))
+    ]
+
+
+def build_terms(title='', description='', preparation_steps=''):
+    fields = {
+        'title': title,
+        'description': description,
+        'preparation_steps': preparation_steps,
+    }
+    terms = defaultdict(int)
+
+    for field_name, text in fields.items():
+        for token in tokenize(text):
+            terms[token] += FIELD_WEIGHTS[field_name]
+
+    return terms
+
+
+def make_search_terms(recipe, SearchTermModel=None):
+    if SearchTermModel is None:
+        from recipes.models import RecipeSearchTerm as SearchTermModel
+
+    terms = build_terms(
+        recipe.title, recipe.description, recipe.preparation_steps,
+    )
+
+    return [
+        SearchTermModel(recipe_id=recipe.pk, term=term, weight=weight)
+        for term, weight in terms.items()
+    ]
+
+
+def index_recipe(recipe):
+    from recipes.models import RecipeSearchTerm
+
+    RecipeSearchTerm.objects.filter(recipe_id=recipe.pk).delete()
+    RecipeSearchTerm.objects.bulk_create(make_search_terms(recipe))
+
+
+def rebuild_index(
+    queryset, SearchTermModel=None, batch_size=1000, delete_existing=True
+):
+    if SearchTermModel is None:
+        from recipes.models import RecipeSearchTerm as SearchTermModel
+
+    if delete_existing:
+        SearchTermModel.objects.filter(
+            recipe_id__in=queryset.values('pk')
+        ).delete()
+
+    recipes = queryset.only(
+        'pk', 'title', 'description', 'preparation_steps',
+    ).order_by().iterator(chunk_size=batch_size)
+
+    indexed = 0
+    search_terms = []
+
+    for recipe in recipes:
+        search_terms += make_search_terms(recipe, SearchTermModel)
+        indexed += 1
+
+        if len(search_terms) >= batch_size:
+            SearchTermModel.objects.bulk_create(search_terms, batch_size)
+            search_terms = []
+
+    SearchTermModel.objects.bulk_create(search_terms, batch_size)
+    return indexed
+
+
+def prefix_filter(token):
+    # term >= 'bolo' AND term < 'bolp' is an index range scan on every
+    # backend, unlike LIKE 'bolo%' which SQLite can not run on an index.
+    upper_bound = token[:-1] + chr(ord(token[-1]) + 1)
+    return Q(term__gte=token, term__lt=upper_bound)
+
+
+def is_common(terms):
+    return terms[COMMON_TERM_ROWS - 1:COMMON_TERM_ROWS].exists()
+
+
+def search_recipes(queryset, search_term):
+    # Every word typed must be the start of an indexed term (AND search).
+    # Runs a query per word to tell the common ones.
+    from recipes.models import RecipeSearchTerm
+
+    tokens = list(dict.fromkeys(tokenize(search_term)))
+
+    if not tokens:
+        return queryset.none()
+
+    matches_any_token = Q()
+    has_rare_token = False
+
+    for token in tokens:
+        terms = RecipeSearchTerm.objects.filter(prefix_filter(token))
+        matches_any_token |= prefix_filter(token)
+
+        if is_common(terms):
+            # Found within a few recipes, by the (recipe, term) index
+            queryset = queryset.filter(
+                Exists(terms.filter(recipe_id=OuterRef('pk'))),
+            )
+        else:
+            # At most COMMON_TERM_ROWS rows of the (term, recipe) index
+            has_rare_token = True
+            queryset = queryset.filter(pk__in=terms.values('recipe_id'))
+
+    if not has_rare_token:
+        return queryset.order_by('-id')
+
+    # Correlated subquery instead of a join + GROUP BY, so the recipe
+    # columns (and the select_related ones) do not end in the GROUP BY.
+    # It is answered by the (recipe, term, weight) covering index.
+    search_rank = RecipeSearchTerm.objects.filter(
+        matches_any_token,
+        recipe_id=OuterRef('pk'),
+    ).order_by().values('recipe_id').annotate(
+        rank=Sum('weight'),
+    ).values('rank')
+
+    return queryset.annotate(
+        search_rank=Subquery(search_rank, output_field=IntegerField()),
+    ).order_by('-search_rank', '-id')
@@ -1,9 +1,70 @@
+from collections import defaultdict
+from functools import lru_cache
+
+from django.urls import get_script_prefix, get_urlconf
+from django.urls import reverse as django_reverse
 from rest_framework import serializers
 from tag.models import Tag
-from .models import Recipe
+from .models import TITLE_TAKEN, Recipe, RecipeCoverVariant
 from authors.validators import AuthorRecipeValidator
 
 
+URL_PK_PLACEHOLDER = '__pk__'
+
+
+@lru_cache(maxsize=None)
+def compile_url_template(view_name, script_prefix, urlconf=None):
+    # Resolved once per process (and script prefix), then only formatted:
+    # ('/recipes/api/v2/tags/', '/')
+    url = django_reverse(
+        view_name, kwargs={'pk': URL_PK_PLACEHOLDER}, urlconf=urlconf,
+    )
+    prefix, suffix = url.split(URL_PK_PLACEHOLDER)
+    return prefix, suffix
+
+
+def get_url_template(view_name, request=None):
+    prefix, suffix = compile_url_template(
+        view_name, get_script_prefix(), get_urlconf(),
+    )
+
+    if request is not None:
+        prefix = request.build_absolute_uri(prefix)
+
+    return prefix, suffix
+
+
+class PkHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
+    # Same urls as HyperlinkedRelatedField, without a reverse() and a
+    # build_absolute_uri() per object
+    def get_url(self, obj, view_name, request, format):
+        uses_reverse = (
+            format or self.lookup_field != 'pk' or
+            getattr(request, 'versioning_scheme', None) is not None
+        )
+
+        if uses_reverse:
+            return super().get_url(obj, view_name, request, format)
+
+        if obj.pk in (None, ''):
+            return None
+
+        prefix, suffix = self.get_url_template(view_name, request)
+        return f'{prefix}{obj.pk}{suffix}'
+
+    def get_url_template(self, view_name, request):
+        # Once per request, this field serializes every object of a list
+        cached_request, url_template = getattr(
+            self, '_url_template', (None, None),
+        )
+
+        if url_template is None or cached_request is not request:
+            url_template = get_url_template(view_name, request)
+            self._url_template = (request, url_template)
+
+        return url_template
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
@@ -18,17 +79,18 @@ class RecipeSerializer(serializers.ModelSerializer):
             'category_id', 'category', "author_id", "author", "created_at",
             "tags", "tag_objects", "tag_link",
             'preparation_time', 'preparation_time_unit', 'servings',
-            'servings_unit', 'preparation_steps', 'cover'
+            'servings_unit', 'preparation_steps', 'cover', 'cover_status',
+            'cover_variants',
         )
 
-    category = serializers.StringRelatedField(read_only=True,)
+    category = serializers.SerializerMethodField(read_only=True,)
     author = serializers.StringRelatedField(read_only=True,)
     tag_objects = TagSerializer(
         many=True,
         source='tags',
         read_only=True
     )
-    tag_link = serializers.HyperlinkedRelatedField(
+    tag_link = PkHyperlinkedRelatedField(
         many=True,
         source="tags",
         view_name='recipes:recipes-api-tags-detail',
@@ -39,6 +101,10 @@ class RecipeSerializer(serializers.ModelSerializer):
     # we need to defined it on def get_NAME()
     preparation = serializers.SerializerMethodField(read_only=True,)
 
+    def get_category(self, recipe):
+        category = recipe.get_category()
+        return None if category is None else category.name
+
     def get_preparation(self, recipe):
         return f'{recipe.preparation_time} {recipe.preparation_time_unit}'
 
@@ -48,6 +114,33 @@ class RecipeSerializer(serializers.ModelSerializer):
         created_at_formatted = recipe.created_at.strftime("%d/%m/%Y")
         return f'{created_at_formatted}'
 
+    cover_variants = serializers.SerializerMethodField(read_only=True,)
+
+    def get_cover_variants(self, recipe):
+        # {"webp": {"srcset": "url 320w, ...", "320": "url", ...}, ...}
+        request = self.context.get('request')
+        variants_map = {}
+
+        for image_format, variants in recipe.get_cover_variants().items():
+            urls = {}
+
+            for variant in variants:
+                url = variant.file.url
+
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+
+                urls[str(variant.width)] = url
+
+            variants_map[image_format] = {
+                'srcset': ', '.join(
+                    f'{url} {width}w' for width, url in urls.items()
+                ),
+                **urls,
+            }
+
+        return variants_map
+
     def validate(self, attrs):
         super_validate = super().validate(attrs)
 
@@ -58,5 +151,171 @@ class RecipeSerializer(serializers.ModelSerializer):
         if self.instance is not None and attrs.get('preparation_time') is None:
             attrs['preparation_time'] = self.instance.preparation_time
 
-        AuthorRecipeValidator(attrs, ErrorClass=serializers.ValidationError)
+        errors = defaultdict(list)
+        self.validate_title_taken(attrs, errors)
+        AuthorRecipeValidator(
+            attrs, errors=errors, ErrorClass=serializers.ValidationError,
+        )
         return super_validate
+
+    def validate_title_taken(self, attrs, errors):
+        if 'title' not in attrs:
+            return
+
+        instance = self.instance
+
+        # A partial update sends the current title back, nothing to check
+        if instance is not None and instance.keeps_title(attrs['title']):
+            return
+
+        if Recipe.objects.title_taken(
+            attrs['title'], exclude_pk=getattr(instance, 'pk', None),
+        ):
+            errors['title'].append(TITLE_TAKEN)
+
+
+# One item of a batch (see recipes.batch): an id updates that recipe,
+# no id creates one. Tags are plain ids, checked for the whole batch at
+# once instead of one query per tag.
+class RecipeBatchItemSerializer(RecipeSerializer):
+    id = serializers.IntegerField(required=False, min_value=1)
+    tags = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False,
+    )
+
+    def validate_title_taken(self, attrs, errors):
+        # Checked for the whole batch at once, see recipes.batch
+        pass
+
+    class Meta(RecipeSerializer.Meta):
+        fields = (
+            'id', 'title', 'description', 'tags', 'preparation_time',
+            'preparation_time_unit', 'servings', 'servings_unit',
+            'preparation_steps',
+        )
+
+
+class RecipeValuesListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        rows = list(data)
+        self.child.load_related(rows)
+        return [self.child.to_representation(row) for row in rows]
+
+
+# Read only twin of RecipeSerializer for lists: works from .values() rows
+# (see get_values) and fetches the tags and cover variants of all rows at
+# once, instead of building model instances and serializing them field by
+# field. Its output must stay identical to RecipeSerializer's.
+class RecipeValuesSerializer(serializers.BaseSerializer):
+    VALUES = (
+        'id', 'title', 'description', 'preparation_time',
+        'preparation_time_unit', 'category_id', 'category__name',
+        'author_id', 'author__username', 'created_at', 'servings',
+        'servings_unit', 'preparation_steps', 'cover', 'cover_status',
+    )
+    TAG_VIEW_NAME = 'recipes:recipes-api-tags-detail'
+
+    class Meta:
+        list_serializer_class = RecipeValuesListSerializer
+
+    @classmethod
+    def get_values(cls, queryset):
+        return queryset.prefetch_related(None).values(*cls.VALUES)
+
+    def load_related(self, rows):
+        recipe_ids = [row['id'] for row in rows]
+        self.tag_link = PkHyperlinkedRelatedField(
+            view_name=self.TAG_VIEW_NAME, read_only=True,
+        )
+        self.tag_link.bind('tag_link', self)
+        self.tags = defaultdict(list)
+        self.cover_variants = defaultdict(list)
+
+        # The same query prefetch_related('tags') runs, same order
+        tags = Tag.objects.filter(recipe__id__in=recipe_ids).values_list(
+            'recipe__id', 'id', 'name', 'slug',
+        )
+
+        for recipe_id, *tag in tags:
+            self.tags[recipe_id].append(tag)
+
+        variants = RecipeCoverVariant.objects.filter(
+            recipe_id__in=recipe_ids,
+        ).values_list('recipe_id', 'format', 'width', 'file')
+
+        for recipe_id, *variant in variants:
+            self.cover_variants[recipe_id].append(variant)
+
+    def get_url(self, url):
+        request = self.context.get('request')
+
+        if request is not None:
+            return request.build_absolute_uri(url)
+
+        return url
+
+    def get_tag_url(self, tag_id):
+        return self.tag_link.to_representation(Tag(pk=tag_id))
+
+    def get_cover_variants(self, variants):
+        storage = RecipeCoverVariant._meta.get_field('file').storage
+        urls_by_format = defaultdict(dict)
+
+        for image_format, width, name in sorted(
+            variants, key=lambda variant: variant[1],
+        ):
+            urls_by_format[image_format][str(width)] = self.get_url(
+                storage.url(name),
+            )
+
+        return {
+            image_format: {
+                'srcset': ', '.join(
+                    f'{url} {width}w'
+                    for width, url in urls_by_format[image_format].items()
+                ),
+                **urls_by_format[image_format],
+            }
+            for image_format in RecipeCoverVariant.Format.values
+            if urls_by_format[image_format]
+        }
+
+    def to_representation(self, row):
+        tags = self.tags.get(row['id'], [])
+        cover = None
+
+        if row['cover']:
+            storage = Recipe._meta.get_field('cover').storage
+            cover = self.get_url(storage.url(row['cover']))
+
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'preparation': (
+                f'{row["preparation_time"]} {row["preparation_time_unit"]}'
+            ),
+            'category_id': row['category_id'],
+            'category': row['category__name'],
+            'author_id': row['author_id'],
+            'author': row['author__username'],
+            'created_at': row['created_at'].strftime('%d/%m/%Y'),
+            'tags': [tag_id for tag_id, name, slug in tags],
+            'tag_objects': [
+                {'id': tag_id, 'name': name, 'slug': slug}
+                for tag_id, name, slug in tags
+            ],
+            'tag_link': [
+                self.get_tag_url(tag_id) for tag_id, name, slug in tags
+            ],
+            'preparation_time': row['preparation_time'],
+            'preparation_time_unit': row['preparation_time_unit'],
+            'servings': row['servings'],
+            'servings_unit': row['servings_unit'],
+            'preparation_steps': row['preparation_steps'],
+            'cover': cover,
+            'cover_status': row['cover_status'],
+            'cover_variants': self.get_cover_variants(
+                self.cover_variants.get(row['id'], []),
+            ),
+        }
@@ -1,34 +1,252 @@
-import os
+from collections import Counter
 
-from django.db.models.signals import pre_delete, pre_save
+from authors.models import Profile
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
 from django.dispatch import receiver
+from django.utils import timezone
+from tag.models import Tag
 
-from recipes.models import Recipe
+from recipes import counters, metadata
+from recipes.cache import bump_generations, recipe_namespaces
+from recipes.images import delete_cover_variants
+from recipes.models import Category, Recipe
+from recipes.search import INDEXED_FIELDS, index_recipe
 
+User = get_user_model()
 
-def delete_cover(instance):
-    try:
-        os.remove(instance.cover.path)
-    except (ValueError, FileNotFoundError):
-        ...
+# User fields shown on recipe cards and in the API
+USER_RECIPE_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+def touch_recipes(**filters):
+    # Rendered recipe cards are cached by Recipe.updated_at, bumping it
+    # invalidates the cards of recipes showing a changed related object
+    Recipe.objects.filter(**filters).update(updated_at=timezone.now())
+
+
+def bump_recipe_pages(recipe, category_id=None):
+    tag_slugs = recipe.tags.values_list('slug', flat=True)
+
+    if category_id is None:
+        category_id = recipe.category_id
+
+    bump_generations(*recipe_namespaces(category_id, tag_slugs))
+
+
+def delete_cover_files(recipe_id, cover_name):
+    # Rows go now, files only once the transaction commits: a rollback
+    # must not leave a recipe pointing to a deleted image
+    delete_cover_variants(recipe_id)
+
+    if cover_name:
+        storage = Recipe._meta.get_field('cover').storage
+        transaction.on_commit(lambda: storage.delete(cover_name))
+
+
+@receiver(pre_save, sender=Recipe)
+def recipe_old_state(sender, instance, *args, **kwargs):
+    # The saved values the other receivers compare the new ones with.
+    # No query for recipes loaded from the database.
+    instance._old_state = instance.get_saved_state()
 
 
 @receiver(pre_delete, sender=Recipe)
 def recipe_cover_delete(sender, instance, *args, **kwargs):
-    old_instance = Recipe.objects.filter(pk=instance.pk).first()
+    saved_state = instance.get_saved_state()
 
-    if old_instance:
-        delete_cover(old_instance)
+    if saved_state:
+        delete_cover_files(instance.pk, saved_state['cover'])
 
 
 @receiver(pre_save, sender=Recipe)
 def recipe_cover_update(sender, instance, *args, **kwargs):
-    old_instance = Recipe.objects.filter(pk=instance.pk).first()
+    old_state = instance._old_state
 
-    if not old_instance:
+    if not old_state:
         return
 
-    is_new_cover = old_instance.cover != instance.cover
+    is_new_cover = not instance.cover._committed or \
+        old_state['cover'] != instance.get_tracked_value('cover')
 
     if is_new_cover:
-        delete_cover(old_instance)
+        delete_cover_files(instance.pk, old_state['cover'])
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_search_index_update(sender, instance, *args, **kwargs):
+    # Not on the saves of covers, publishing and the like
+    update_fields = kwargs.get('update_fields')
+
+    if update_fields and not set(INDEXED_FIELDS).intersection(update_fields):
+        return
+
+    old_state = instance._old_state
+
+    if old_state and all(
+        old_state[field_name] == instance.get_tracked_value(field_name)
+        for field_name in INDEXED_FIELDS
+    ):
+        return
+
+    index_recipe(instance)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(pre_delete, sender=Recipe)
+def recipe_pages_update(sender, instance, *args, **kwargs):
+    old_state = getattr(instance, '_old_state', None) or {}
+    old_category_id = old_state.get('category_id')
+
+    if old_category_id is not None and \
+            old_category_id != instance.category_id:
+        bump_generations(f'category:{old_category_id}')
+
+    bump_recipe_pages(instance)
+
+
+def get_recipe_counter_keys(state, tag_ids=()):
+    return counters.recipe_keys(
+        state['is_published'], state['category_id'], state['author_id'],
+        tag_ids,
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_counters_update(sender, instance, created, *args, **kwargs):
+    new_state = {
+        'is_published': instance.is_published,
+        'category_id': instance.category_id,
+        'author_id': instance.author_id,
+    }
+    old_state = getattr(instance, '_old_state', None)
+
+    if created or old_state is None:
+        old_state = dict(new_state, is_published=False)
+    else:
+        old_state = {key: old_state[key] for key in new_state}
+
+    if old_state == new_state:
+        return
+
+    # Tags only move in or out of the counts when the recipe is
+    # (un)published, a new recipe gets its tags after being saved
+    tag_ids = []
+
+    if not created and old_state['is_published'] != instance.is_published:
+        tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+    deltas = Counter(get_recipe_counter_keys(new_state, tag_ids))
+    deltas.subtract(get_recipe_counter_keys(old_state, tag_ids))
+    counters.change_counts(deltas)
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_counters_delete(sender, instance, *args, **kwargs):
+    if not instance.is_published:
+        return
+
+    counters.decrement(counters.recipe_keys(
+        True, instance.category_id, instance.author_id,
+        instance.tags.values_list('pk', flat=True),
+    ))
+
+
+def change_tag_counts(instance, action, reverse, pk_set):
+    if reverse and action == 'pre_clear':
+        counters.delete_counter(counters.tag_key(instance.pk))
+        return
+
+    if action == 'pre_clear':
+        pk_set = set(instance.tags.values_list('pk', flat=True))
+
+    amount = 1 if action == 'post_add' else -1
+
+    if reverse:
+        # instance is the tag, pk_set the recipes
+        amount *= Recipe.objects.filter(
+            pk__in=pk_set, is_published=True,
+        ).count()
+        counters.change_counts({counters.tag_key(instance.pk): amount})
+    elif instance.is_published:
+        counters.change_counts({
+            counters.tag_key(tag_id): amount for tag_id in pk_set
+        })
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'pre_clear'):
+        change_tag_counts(instance, action, reverse, pk_set)
+
+    # reverse: tag.recipe_set was changed, instance is the tag
+    if reverse and action == 'pre_clear':
+        touch_recipes(tags=instance)
+        bump_generations('home', f'tag:{instance.slug}')
+    elif reverse and action in ('post_add', 'post_remove'):
+        touch_recipes(pk__in=pk_set)
+        bump_generations('home', f'tag:{instance.slug}')
+    elif not reverse and action == 'pre_clear':
+        bump_recipe_pages(instance)
+    elif not reverse and action in ('post_add', 'post_remove'):
+        touch_recipes(pk=instance.pk)
+        tag_slugs = Tag.objects.filter(
+            pk__in=pk_set,
+        ).values_list('slug', flat=True)
+        bump_generations(*recipe_namespaces(tag_slugs=tag_slugs))
+    elif not reverse and action == 'post_clear':
+        touch_recipes(pk=instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def recipe_category_changed(sender, instance, *args, **kwargs):
+    touch_recipes(category=instance)
+    bump_generations('all', metadata.CATEGORIES)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def recipe_tag_changed(sender, instance, *args, **kwargs):
+    touch_recipes(tags=instance)
+    bump_generations('all', metadata.TAGS)
+
+
+@receiver(post_delete, sender=Category)
+def recipe_category_counter_delete(sender, instance, *args, **kwargs):
+    counters.delete_counter(counters.category_key(instance.pk))
+
+
+@receiver(post_delete, sender=Tag)
+def recipe_tag_counter_delete(sender, instance, *args, **kwargs):
+    counters.delete_counter(counters.tag_key(instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def recipe_author_counter_delete(sender, instance, *args, **kwargs):
+    counters.delete_counter(counters.author_key(instance.pk))
+
+
+@receiver(post_save, sender=User)
+@receiver(pre_delete, sender=User)
+def recipe_author_changed(sender, instance, *args, **kwargs):
+    update_fields = kwargs.get('update_fields')
+
+    # e.g. login only saves last_login
+    if update_fields and not USER_RECIPE_FIELDS.intersection(update_fields):
+        return
+
+    if kwargs.get('created'):
+        return
+
+    touch_recipes(author=instance)
+    bump_generations('all')
+
+
+# Cards only link to the profile id, so only a deleted profile matters
+@receiver(post_delete, sender=Profile)
+def recipe_author_profile_deleted(sender, instance, *args, **kwargs):
+    touch_recipes(author_id=instance.author_id)
+    bump_generations('all')
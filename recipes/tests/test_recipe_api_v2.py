@@ -1,5 +1,8 @@
+from django.core.cache.backends.locmem import LocMemCache
 from django.urls import reverse
 from rest_framework import test
+from recipes import metadata
+from recipes.models import Recipe
 from recipes.tests.test_recipe_base import RecipeMixin
 from unittest.mock import patch
 
@@ -41,6 +44,25 @@ class RecipeAPIv2Test(test.APITestCase, RecipeAPIv2Mixin):
         response = self.get_recipe_api_list()
         self.assertEqual(response.status_code, 200)
 
+    def test_recipe_api_shows_a_category_renamed_by_another_process(self):
+        recipe = self.make_recipe()
+        metadata.get_category(recipe.category_id)
+
+        # Bumps the generation of the categories in another process only
+        with patch('recipes.cache.cache', LocMemCache('other', {})):
+            recipe.category.name = 'Renamed Elsewhere'
+            recipe.category.save()
+
+        response = self.get_recipe_api_list()
+        self.assertEqual(
+            response.data['results'][0]['category'], 'Renamed Elsewhere',
+        )
+
+        response = self.client.get(
+            self.get_recipe_api_reverse_url_detail(recipe.pk),
+        )
+        self.assertEqual(response.data['category'], 'Renamed Elsewhere')
+
     @patch("recipes.views.api.RecipeAPIv2Pagination.page_size", new=7)
     def test_recipe_api_list_loads_correct_number_of_recipes(self):
         wanted_number_recipes = 7
@@ -86,6 +108,43 @@ class RecipeAPIv2Test(test.APITestCase, RecipeAPIv2Mixin):
         # We should only see recipes in wanted category
         self.assertEqual(len(response.data.get('results')), 9)
 
+    @patch("recipes.views.api.RecipeAPIv2CursorPagination.page_size", new=3)
+    def test_recipe_api_list_cursor_pagination_walks_all_recipes(self):
+        recipes = self.make_recipe_in_batch(qtd=7)
+        wanted_ids = sorted([recipe.id for recipe in recipes], reverse=True)
+
+        response = self.get_recipe_api_list(query_string='?pagination=cursor')
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data.get('previous'))
+
+        loaded_ids = []
+        while True:
+            loaded_ids += [item['id'] for item in response.data['results']]
+            next_url = response.data.get('next')
+
+            if next_url is None:
+                break
+
+            response = self.client.get(next_url)
+
+        self.assertEqual(wanted_ids, loaded_ids)
+        self.assertIsNotNone(response.data.get('previous'))
+
+    @patch("recipes.views.api.RecipeAPIv2CursorPagination.page_size", new=10)
+    def test_recipe_api_list_cursor_pagination_filters_by_category_id(self):
+        category_wanted = self.make_category(name='WANTED_CATEGORY')
+        recipes = self.make_recipe_in_batch(qtd=4)
+
+        for recipe in recipes[:3]:
+            recipe.category = category_wanted
+            recipe.save()
+
+        response = self.get_recipe_api_list(
+            query_string=f'?pagination=cursor&category_id={category_wanted.id}'
+        )
+
+        self.assertEqual(len(response.data.get('results')), 3)
+
     def test_recipe_api_list_user_must_send_jwt_token_to_create_recipe(self):
         api_url = self.get_recipe_api_reverse_url_list()
         response = self.client.post(api_url)
@@ -104,6 +163,21 @@ class RecipeAPIv2Test(test.APITestCase, RecipeAPIv2Mixin):
 
         self.assertEqual(response.status_code, 201)
 
+    def test_recipe_api_create_with_a_taken_title_returns_400(self):
+        self.make_recipe(title='This Is The Títle')
+        auth_data = self.get_auth_data()
+
+        response = self.client.post(
+            self.get_recipe_api_reverse_url_list(),
+            data=self.get_recipe_raw_data(),
+            HTTP_AUTHORIZATION=f"Bearer {auth_data['jwt_access_token']}",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['title'], ['Found recipes with the same title'],
+        )
+
     def test_recipe_api_list_logged_user_can_delete_a_recipe(self):
         # Create new user
         new_user = self.get_auth_data(
@@ -189,6 +263,33 @@ class RecipeAPIv2Test(test.APITestCase, RecipeAPIv2Mixin):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get('title'), wanted_new_title)
 
+    def test_recipe_api_updates_a_recipe_saved_with_a_taken_title(self):
+        # Saved before normalized_title existed, it is left null
+        self.make_recipe(author_data={'username': 'first_author'})
+        auth_data = self.get_auth_data(username='legacy_author')
+        recipe = self.make_recipe(
+            create_author=False, author_data=auth_data['user'],
+            slug='legacy-duplicate', title='Other title',
+        )
+        Recipe.objects.filter(pk=recipe.pk).update(
+            title='Recipe Title', normalized_title=None,
+        )
+        recipe_detail_url = self.get_recipe_api_reverse_url_detail(
+            pk=recipe.id)
+
+        for data in ({'description': 'New'}, {'title': 'Recipe Title'}):
+            response = self.client.patch(
+                recipe_detail_url, data=data,
+                HTTP_AUTHORIZATION=f"Bearer {auth_data['jwt_access_token']}",
+            )
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.patch(
+            recipe_detail_url, data={'title': 'RECIPE TITLE'},
+            HTTP_AUTHORIZATION=f"Bearer {auth_data['jwt_access_token']}",
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_recipe_api_list_logged_user_cannot_update_a_recipe_owned_by_another_user(self):
         # Make a recipe with one user
         recipe = self.make_recipe(
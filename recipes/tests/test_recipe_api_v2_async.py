@@ -0,0 +1,113 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from recipes.tests.test_recipe_base import RecipeMixin
+from tag.models import Tag
+
+
+# Transactions that commit: the async views query from other threads,
+# with connections of their own that would not see the rows of a
+# TestCase transaction
+class RecipeAPIv2AsyncTest(TransactionTestCase, RecipeMixin):
+    def setUp(self):
+        cache.clear()
+        return super().setUp()
+
+    def make_recipes(self):
+        recipes = self.make_recipe_in_batch(3)
+        tag = Tag.objects.create(name='Sweet')
+        recipes[0].tags.add(tag)
+        return recipes, tag
+
+    def assertSameResponse(self, sync_url, async_url):
+        sync_response = self.client.get(sync_url)
+        async_response = self.client.get(async_url)
+
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual(
+            async_response.get('ETag'), sync_response.get('ETag'),
+        )
+        return async_response
+
+    def test_recipe_api_v2_async_list_is_the_same_as_the_sync_one(self):
+        recipes, _ = self.make_recipes()
+        category_id = recipes[1].category_id
+        query_strings = [
+            '', '?page=2', f'?category_id={category_id}',
+            '?q=title', '?pagination=cursor',
+        ]
+
+        for query_string in query_strings:
+            with self.subTest(query_string=query_string):
+                self.assertSameResponse(
+                    reverse('recipes:recipes-api-list') + query_string,
+                    reverse('recipes:recipes-api-async-list') +
+                    query_string,
+                )
+
+    def test_recipe_api_v2_async_detail_is_the_same_as_the_sync_one(self):
+        recipes, _ = self.make_recipes()
+
+        for pk in (recipes[0].pk, 1000):
+            with self.subTest(pk=pk):
+                self.assertSameResponse(
+                    reverse('recipes:recipes-api-detail', args=(pk,)),
+                    reverse('recipes:recipes-api-async-detail', args=(pk,)),
+                )
+
+    def test_recipe_api_v2_async_tags_are_the_same_as_the_sync_ones(self):
+        _, tag = self.make_recipes()
+
+        self.assertSameResponse(
+            reverse('recipes:recipes-api-tags-list'),
+            reverse('recipes:recipes-api-tags-async-list'),
+        )
+        self.assertSameResponse(
+            reverse('recipes:recipes-api-tags-detail', args=(tag.pk,)),
+            reverse('recipes:recipes-api-tags-async-detail', args=(tag.pk,)),
+        )
+
+    async def test_recipe_api_v2_async_list_runs_under_asgi(self):
+        await sync_to_async(self.make_recipes)()
+        response = await self.async_client.get(
+            reverse('recipes:recipes-api-async-list'),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 3)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_recipe_api_v2_async_list_answers_not_modified(self):
+        self.make_recipes()
+        url = reverse('recipes:recipes-api-async-list')
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True)
+    def test_recipe_api_v2_async_views_stay_in_their_query_budget(self):
+        recipes, tag = self.make_recipes()
+        recipe = recipes[0]
+        routes = {
+            'recipes:recipes-api-async-list': (),
+            'recipes:recipes-api-async-detail': (recipe.pk,),
+            'recipes:recipes-api-tags-async-list': (),
+            'recipes:recipes-api-tags-async-detail': (tag.pk,),
+        }
+
+        for route_name, args in routes.items():
+            with self.subTest(route_name=route_name):
+                response = self.client.get(reverse(route_name, args=args))
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(
+                    int(response['X-Query-Count']),
+                    settings.QUERY_BUDGETS[route_name],
+                )
+
+    def test_recipe_api_v2_async_views_are_read_only(self):
+        response = self.client.post(reverse('recipes:recipes-api-async-list'))
+        self.assertEqual(response.status_code, 405)
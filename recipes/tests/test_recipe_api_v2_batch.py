@@ -0,0 +1,203 @@
+from django.urls import reverse
+from recipes import counters
+from recipes.models import Recipe, RecipeSearchTerm
+from rest_framework import test
+from tag.models import Tag
+
+from .test_recipe_base import RecipeMixin
+
+
+class RecipeAPIv2BatchTest(test.APITestCase, RecipeMixin):
+    def setUp(self):
+        self.user = self.make_author(username='integration')
+        self.url = reverse('recipes:recipes-api-batch')
+        self.tag = Tag.objects.create(name='Tag', slug='tag')
+
+    def make_item(self, title, **kwargs):
+        item = self.get_recipe_raw_data()
+        item.update(title=title, description=f'{title} description')
+        item.update(kwargs)
+        return item
+
+    def post(self, items, query_string=''):
+        self.client.force_authenticate(self.user)
+        return self.client.post(self.url + query_string, items, format='json')
+
+    def test_batch_requires_authentication(self):
+        response = self.client.post(self.url, [], format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_batch_rejects_anything_but_a_list(self):
+        response = self.post({'title': 'Recipe title'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_creates_recipes_with_tags(self):
+        items = [
+            self.make_item(f'Batch recipe {i}', tags=[self.tag.pk])
+            for i in range(3)
+        ]
+        response = self.post(items)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual(
+            [result['status'] for result in results], ['created'] * 3,
+        )
+
+        recipes = Recipe.objects.filter(pk__in=[r['id'] for r in results])
+        self.assertEqual(recipes.count(), 3)
+
+        for recipe in recipes:
+            self.assertEqual(recipe.author, self.user)
+            self.assertTrue(recipe.slug)
+            self.assertEqual(list(recipe.tags.all()), [self.tag])
+
+        # Indexed for search like recipes saved one by one
+        self.assertTrue(RecipeSearchTerm.objects.filter(
+            recipe__in=recipes, term='batch',
+        ).exists())
+
+    def test_batch_query_count_does_not_grow_with_items(self):
+        with self.assertNumQueries(9):
+            self.post([self.make_item('Batch recipe 0', tags=[self.tag.pk])])
+
+        items = [
+            self.make_item(f'Batch recipe {i}', tags=[self.tag.pk])
+            for i in range(1, 11)
+        ]
+
+        with self.assertNumQueries(9):
+            self.post(items)
+
+    def test_batch_updates_own_recipes(self):
+        recipe = self.make_recipe(create_author=False, author_data=self.user)
+        recipe.tags.add(self.tag)
+        other_tag = Tag.objects.create(name='Other', slug='other')
+
+        response = self.post([{
+            'id': recipe.pk, 'title': 'Updated title', 'tags': [other_tag.pk],
+        }])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['status'], 'updated')
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, 'Updated title')
+        self.assertEqual(list(recipe.tags.all()), [other_tag])
+        self.assertEqual(
+            counters.get_count(counters.tag_key(other_tag.pk)), 1,
+        )
+        self.assertEqual(counters.get_count(counters.tag_key(self.tag.pk)), 0)
+
+    def test_batch_updates_recipes_saved_with_a_taken_title(self):
+        # Saved before normalized_title existed, it is left null
+        self.make_recipe(title='Bolo de Cenoura')
+        recipe = self.make_recipe(
+            create_author=False, author_data=self.user, slug='legacy',
+        )
+        Recipe.objects.filter(pk=recipe.pk).update(
+            title='Bolo de Cenoura', normalized_title=None,
+        )
+
+        response = self.post([{
+            'id': recipe.pk, 'title': 'Bolo de Cenoura', 'description': 'New',
+        }])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['status'], 'updated')
+
+    def test_batch_cannot_update_recipes_of_other_authors(self):
+        recipe = self.make_recipe()
+        response = self.post([{'id': recipe.pk, 'title': 'Updated title'}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.data['results'][0]['errors'])
+
+    def test_batch_reads_string_ids_as_numbers(self):
+        recipe = self.make_recipe()
+        own_recipe = self.make_recipe(
+            category_data={'name': 'Other'}, create_author=False,
+            author_data=self.user, slug='own-recipe', title='Own recipe',
+        )
+
+        response = self.post([{'id': str(recipe.pk), 'title': 'Hijacked'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.data['results'][0]['errors'])
+
+        response = self.post([{'id': str(own_recipe.pk), 'title': 'Renamed'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0], {
+            'index': 0, 'status': 'updated', 'id': own_recipe.pk,
+        })
+        self.assertEqual(Recipe.objects.count(), 2)
+
+    def test_batch_rejects_invalid_ids(self):
+        response = self.post([self.make_item('Recipe title', id='abc')])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.data['results'][0]['errors'])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_atomic_batch_saves_nothing_if_an_item_is_invalid(self):
+        response = self.post([
+            self.make_item('Valid recipe'),
+            self.make_item('Bad'),
+            self.make_item('Unknown tag', tags=[999]),
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        results = response.data['results']
+        self.assertEqual(
+            [result['status'] for result in results],
+            ['not_saved', 'invalid', 'invalid'],
+        )
+        self.assertIn('title', results[1]['errors'])
+        self.assertEqual(
+            results[2]['errors'],
+            {'tags': ['Invalid pk "999" - object does not exist.']},
+        )
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_chunked_batch_saves_the_valid_items(self):
+        response = self.post([
+            self.make_item('Valid recipe'),
+            self.make_item('Bad'),
+            self.make_item('Another valid recipe'),
+        ], '?atomic=false&chunk_size=2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['created', 'invalid', 'created'],
+        )
+        self.assertEqual(Recipe.objects.count(), 2)
+
+    def test_chunked_batch_without_valid_items_returns_400(self):
+        response = self.post([
+            self.make_item('Bad'), self.make_item('Unknown tag', tags=[999]),
+        ], '?atomic=false&chunk_size=1')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['invalid', 'invalid'],
+        )
+
+    def test_batch_rejects_taken_titles(self):
+        self.make_recipe(title='Bolo de Cenoura')
+
+        response = self.post([
+            self.make_item('bolo de cenoura'),
+            self.make_item('Pão de Açúcar'),
+            self.make_item('PAO DE ACUCAR'),
+        ], '?atomic=false')
+
+        results = response.data['results']
+        self.assertEqual(
+            [result['status'] for result in results],
+            ['invalid', 'created', 'invalid'],
+        )
+        self.assertEqual(
+            results[0]['errors'],
+            {'title': ['Found recipes with the same title']},
+        )
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase
 from recipes.models import Category, Recipe, User
 
@@ -92,4 +93,6 @@ class RecipeMixin:
 
 class RecipeTestBase(TestCase, RecipeMixin):
     def setUp(self) -> None:
+        # Cached pages would outlive the rows rolled back after each test
+        cache.clear()
         return super().setUp()
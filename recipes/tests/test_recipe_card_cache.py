@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.urls import reverse
+from recipes import metadata
+from recipes.models import Recipe
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeCardCacheTest(RecipeTestBase):
+    def setUp(self):
+        cache.clear()
+        self.recipe = self.make_recipe(title='Cached Title')
+        return super().setUp()
+
+    def get_home_content(self, **headers):
+        response = self.client.get(reverse('recipes:home'), **headers)
+        return response.content.decode('utf-8')
+
+    def change_title_without_signals(self, title):
+        # update() does not touch updated_at, so the card is not invalidated
+        Recipe.objects.filter(pk=self.recipe.pk).update(title=title)
+
+    def test_recipe_card_is_served_from_cache(self):
+        self.get_home_content()
+        self.change_title_without_signals('Not Rendered')
+        self.assertIn('Cached Title', self.get_home_content())
+
+    def test_recipe_card_is_rendered_again_when_recipe_is_saved(self):
+        self.get_home_content()
+        self.recipe.title = 'New Title'
+        self.recipe.save()
+        self.assertIn('New Title', self.get_home_content())
+
+    def test_recipe_card_is_cached_per_language(self):
+        self.get_home_content(HTTP_ACCEPT_LANGUAGE='pt-br')
+        self.change_title_without_signals('Other Language')
+
+        content = self.get_home_content(HTTP_ACCEPT_LANGUAGE='en')
+        self.assertIn('Other Language', content)
+
+        content = self.get_home_content(HTTP_ACCEPT_LANGUAGE='pt-br')
+        self.assertIn('Cached Title', content)
+
+    def test_recipe_card_is_invalidated_when_category_changes(self):
+        self.get_home_content()
+        self.change_title_without_signals('After Category Change')
+
+        category = self.recipe.category
+        category.name = 'Renamed Category'
+        category.save()
+
+        content = self.get_home_content()
+        self.assertIn('Renamed Category', content)
+        self.assertIn('After Category Change', content)
+
+    def test_recipe_card_shows_a_category_renamed_by_another_process(self):
+        metadata.get_category(self.recipe.category_id)
+        self.get_home_content()
+
+        # The generation of the categories is bumped in the cache of the
+        # other process, this one keeps its table of categories
+        with mock.patch('recipes.cache.cache', LocMemCache('other', {})):
+            category = self.recipe.category
+            category.name = 'Renamed Elsewhere'
+            category.save()
+
+        self.assertIn('Renamed Elsewhere', self.get_home_content())
+
+    def test_recipe_card_is_invalidated_when_author_changes(self):
+        self.get_home_content()
+
+        author = self.recipe.author
+        author.first_name = 'Renamed'
+        author.save()
+
+        self.assertIn('Renamed', self.get_home_content())
+
+    def test_recipe_card_is_invalidated_when_tags_change(self):
+        tag = Tag.objects.create(name='Tag', slug='tag')
+        self.get_home_content()
+        self.change_title_without_signals('After Tag Change')
+
+        self.recipe.tags.add(tag)
+        self.assertIn('After Tag Change', self.get_home_content())
+
+        self.change_title_without_signals('After Tag Rename')
+        tag.name = 'Renamed Tag'
+        tag.save()
+        self.assertIn('After Tag Rename', self.get_home_content())
@@ -0,0 +1,94 @@
+from django.test import override_settings
+from django.urls import reverse
+from parameterized import parameterized
+from recipes.models import Recipe
+
+from .test_recipe_base import RecipeTestBase
+
+
+# The tests run in one process, its cache is shared by all the requests
+@override_settings(CACHE_IS_SHARED=True)
+class RecipeConditionalGetTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe()
+
+    def get_urls(self):
+        return {
+            'v2_list': reverse('recipes:recipes-api-list'),
+            'v2_category': reverse('recipes:recipes-api-list') +
+            f'?category_id={self.recipe.category_id}',
+            'v2_detail': reverse(
+                'recipes:recipes-api-detail', args=(self.recipe.pk,),
+            ),
+            'v1_list': reverse('recipes:recipes_api_v1'),
+            'v1_detail': reverse(
+                'recipes:recipes_api_v1_detail', args=(self.recipe.pk,),
+            ),
+        }
+
+    @parameterized.expand([
+        ('v2_list', 0), ('v2_category', 0), ('v2_detail', 1),
+        ('v1_list', 0), ('v1_detail', 1),
+    ])
+    def test_unchanged_response_is_not_modified(self, url_name, queries):
+        url = self.get_urls()[url_name]
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        # Nothing is serialized for a 304, details only read updated_at
+        with self.assertNumQueries(queries):
+            not_modified = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+
+        self.assertEqual(not_modified.status_code, 304)
+
+        not_modified = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    @parameterized.expand([
+        ('v2_list',), ('v2_category',), ('v2_detail',),
+        ('v1_list',), ('v1_detail',),
+    ])
+    def test_changed_recipe_changes_the_etag(self, url_name):
+        url = self.get_urls()[url_name]
+        etag = self.client.get(url)['ETag']
+
+        self.recipe.title = 'Changed title'
+        self.recipe.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_v2_etag_depends_on_accept_header(self):
+        url = self.get_urls()['v2_list']
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT='text/html',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_unpublished_recipe_has_no_validators(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(is_published=False)
+        response = self.client.get(self.get_urls()['v2_detail'])
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_lists_have_no_etag_without_a_shared_cache(self):
+        urls = self.get_urls()
+
+        for url_name in ('v2_list', 'v2_category', 'v1_list'):
+            with self.subTest(url_name=url_name):
+                response = self.client.get(urls[url_name])
+                self.assertFalse(response.has_header('ETag'))
+
+        # Read from the database
+        response = self.client.get(urls['v2_detail'])
+        self.assertTrue(response.has_header('ETag'))
@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from recipes import counters
+from recipes.models import Recipe, RecipeCounter
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeCountersTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe(
+            author_data={'username': 'a'}, category_data={'name': 'A'},
+        )
+        self.tag = Tag.objects.create(name='Tag', slug='tag')
+        self.recipe.tags.add(self.tag)
+
+    def counts(self):
+        return dict(RecipeCounter.objects.exclude(
+            value=0,
+        ).values_list('key', 'value'))
+
+    def test_counters_match_the_published_recipes(self):
+        self.make_recipe(
+            title='Recipe B', slug='b', author_data={'username': 'b'},
+            category_data={'name': 'B'}, is_published=False,
+        )
+        self.assertEqual(self.counts(), counters.count_all())
+        self.assertEqual(counters.get_count(counters.PUBLISHED), 1)
+        self.assertEqual(
+            counters.get_count(counters.tag_key(self.tag.pk)), 1,
+        )
+
+    def test_unpublishing_a_recipe_decrements_its_counters(self):
+        self.recipe.is_published = False
+        self.recipe.save()
+
+        self.assertEqual(self.counts(), {})
+
+        self.recipe.is_published = True
+        self.recipe.save()
+
+        self.assertEqual(self.counts(), counters.count_all())
+
+    def test_moving_a_recipe_to_another_category_moves_its_count(self):
+        old_key = counters.category_key(self.recipe.category_id)
+        self.recipe.category = self.make_category(name='Other')
+        self.recipe.save()
+
+        self.assertEqual(counters.get_count(old_key), 0)
+        self.assertEqual(self.counts(), counters.count_all())
+
+    def test_tag_changes_update_tag_counters(self):
+        other_tag = Tag.objects.create(name='Other', slug='other')
+        self.recipe.tags.add(other_tag)
+        self.recipe.tags.remove(self.tag)
+        self.assertEqual(self.counts(), counters.count_all())
+
+        other_tag.recipe_set.clear()
+        self.assertEqual(self.counts(), counters.count_all())
+
+        self.tag.recipe_set.add(self.recipe)
+        self.assertEqual(self.counts(), counters.count_all())
+
+    def test_deleting_a_recipe_decrements_its_counters(self):
+        self.recipe.delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_reconcile_command_repairs_drift(self):
+        # Bulk updates send no signals
+        Recipe.objects.update(is_published=False)
+        RecipeCounter.objects.create(key='tag:999', value=3)
+        out = StringIO()
+
+        call_command('reconcile_recipe_counters', stdout=out)
+
+        self.assertEqual(self.counts(), {})
+        self.assertIn('5 counters repaired', out.getvalue())
+
+    def test_listings_use_the_counter_instead_of_counting(self):
+        RecipeCounter.objects.filter(key=counters.PUBLISHED).update(value=7)
+
+        response = self.client.get(reverse('recipes:home'))
+        self.assertEqual(response.context['recipes'].paginator.count, 7)
+
+        response = self.client.get(reverse('recipes:recipes-api-list'))
+        self.assertEqual(response.data['count'], 7)
+
+        response = self.client.get(reverse('recipes:theory'))
+        self.assertEqual(response.context['number_of_recipes'], 7)
+
+    def test_category_without_published_recipes_is_not_found(self):
+        self.recipe.is_published = False
+        self.recipe.save()
+
+        response = self.client.get(
+            reverse('recipes:category', args=(self.recipe.category_id,)),
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,190 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from recipes.models import Recipe, RecipeCoverVariant
+
+from .test_recipe_base import RecipeTestBase
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RECIPE_COVER_WORKERS=0)
+class RecipeCoverProcessingTest(RecipeTestBase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        return super().tearDownClass()
+
+    def make_cover(self, width=1200, height=600, name='cover.jpg'):
+        image_file = BytesIO()
+        Image.new('RGB', (width, height), 'orange').save(image_file, 'JPEG')
+        return SimpleUploadedFile(
+            name, image_file.getvalue(), content_type='image/jpeg',
+        )
+
+    def get_image_size(self, image_file):
+        with Image.open(image_file.path) as image:
+            return image.size
+
+    def make_recipe_with_cover(self, **kwargs):
+        recipe = self.make_recipe(**kwargs)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.cover = self.make_cover()
+            recipe.save()
+
+        recipe.refresh_from_db()
+        return recipe
+
+    def test_recipe_without_cover_has_no_cover_status(self):
+        recipe = self.make_recipe()
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.NONE)
+
+    def test_cover_is_resized_only_after_commit(self):
+        recipe = self.make_recipe()
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            recipe.cover = self.make_cover()
+            recipe.save()
+
+        # The original file is stored and the request can return
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.PENDING)
+        self.assertFalse(recipe.cover_variants.exists())
+
+        for callback in callbacks:
+            callback()
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.READY)
+        self.assertEqual(self.get_image_size(recipe.cover), (1200, 600))
+
+    def test_cover_variants_are_generated_in_each_width_and_format(self):
+        recipe = self.make_recipe_with_cover()
+        variants = recipe.get_cover_variants()
+
+        self.assertEqual(list(variants), ['webp', 'jpeg'])
+
+        for image_format, format_variants in variants.items():
+            self.assertEqual(
+                [variant.width for variant in format_variants],
+                [320, 640, 840],
+            )
+
+            for variant in format_variants:
+                self.assertEqual(
+                    self.get_image_size(variant.file),
+                    (variant.width, variant.width // 2),
+                )
+
+    def test_cover_variants_are_named_by_their_content(self):
+        first = self.make_recipe_with_cover()
+        second = self.make_recipe_with_cover(
+            title='Second', slug='second', author_data={'username': 'second'},
+        )
+
+        def file_names(recipe):
+            return set(recipe.cover_variants.values_list('file', flat=True))
+
+        self.assertEqual(file_names(first), file_names(second))
+
+    def test_replacing_the_cover_removes_old_variants(self):
+        recipe = self.make_recipe_with_cover()
+        old_file = recipe.cover_variants.first().file
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.cover = self.make_cover(width=900, height=900)
+            recipe.save()
+
+        self.assertFalse(old_file.storage.exists(old_file.name))
+        self.assertEqual(
+            RecipeCoverVariant.objects.filter(recipe=recipe).count(), 6,
+        )
+
+    def test_recipe_card_and_api_expose_cover_srcset(self):
+        recipe = self.make_recipe_with_cover()
+        srcset = recipe.cover_sources[0]['srcset']
+
+        response = self.client.get(reverse('recipes:home'))
+        self.assertIn(srcset, response.content.decode('utf-8'))
+
+        response = self.client.get(reverse('recipes:recipes-api-list'))
+        cover_variants = response.data['results'][0]['cover_variants']
+        self.assertEqual(list(cover_variants), ['webp', 'jpeg'])
+        self.assertIn(' 320w, ', cover_variants['webp']['srcset'])
+        self.assertTrue(
+            cover_variants['jpeg']['840'].startswith('http://testserver/'),
+        )
+
+    def test_saving_without_new_cover_does_not_queue_processing(self):
+        recipe = self.make_recipe()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.cover = self.make_cover()
+            recipe.save()
+
+        recipe.refresh_from_db()
+
+        with patch('recipes.models.enqueue_cover_processing') as enqueue:
+            recipe.title = 'Another title'
+            recipe.save()
+
+        enqueue.assert_not_called()
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.READY)
+
+    def test_broken_cover_is_marked_as_failed(self):
+        recipe = self.make_recipe()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.cover = SimpleUploadedFile('cover.jpg', b'not an image')
+            recipe.save()
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.FAILED)
+
+    def test_replaced_cover_file_is_deleted_only_after_commit(self):
+        recipe = self.make_recipe_with_cover()
+        old_cover = recipe.cover
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            recipe.cover = self.make_cover(width=900, height=900)
+            recipe.save()
+
+        # A rollback here would still find the old image
+        self.assertTrue(old_cover.storage.exists(old_cover.name))
+
+        for callback in callbacks:
+            callback()
+
+        self.assertFalse(old_cover.storage.exists(old_cover.name))
+
+    def test_deleted_recipe_cover_is_deleted_after_commit(self):
+        recipe = self.make_recipe_with_cover()
+        cover = recipe.cover
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe.objects.get(pk=recipe.pk).delete()
+
+        self.assertFalse(cover.storage.exists(cover.name))
+
+    def test_saving_a_loaded_recipe_does_not_select_it_again(self):
+        recipe = Recipe.objects.get(pk=self.make_recipe_with_cover().pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            recipe.title = 'Another title'
+            recipe.save()
+
+        recipe_selects = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and
+            'FROM "recipes_recipe" WHERE' in query['sql']
+        ]
+        self.assertEqual(recipe_selects, [])
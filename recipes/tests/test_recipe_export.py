@@ -0,0 +1,90 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from recipes.export import export_recipes, get_export_queryset
+from recipes.models import Recipe
+from rest_framework import test
+from tag.models import Tag
+
+from .test_recipe_base import RecipeMixin
+
+
+class RecipeExportTest(test.APITestCase, RecipeMixin):
+    def setUp(self):
+        self.recipes = self.make_recipe_in_batch(qtd=5)
+        self.recipes[0].tags.add(Tag.objects.create(name='Tag', slug='tag'))
+        self.user = self.make_author(username='partner')
+        self.url = reverse('recipes:recipes_api_v2_export')
+
+    def get_export(self, query_string=''):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url + query_string)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_export_requires_authentication(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_export_streams_every_published_recipe_as_ndjson(self):
+        Recipe.objects.filter(pk=self.recipes[1].pk).update(
+            is_published=False,
+        )
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        recipes = self.get_export()
+        self.assertEqual(
+            [recipe['id'] for recipe in recipes],
+            [recipe.pk for recipe in self.recipes if recipe.pk !=
+             self.recipes[1].pk],
+        )
+        self.assertEqual(recipes[0]['tag_objects'][0]['slug'], 'tag')
+        self.assertTrue(recipes[0]['tag_link'][0].startswith('http://'))
+
+    def test_export_filters_by_category_and_updated_since(self):
+        other = self.make_recipe(
+            slug='other', author_data={'username': 'other'},
+            category_data={'name': 'Other'},
+        )
+        recipes = self.get_export(f'?category_id={other.category_id}')
+        self.assertEqual([recipe['id'] for recipe in recipes], [other.pk])
+
+        old = timezone.now() - timedelta(days=10)
+        Recipe.objects.exclude(pk=other.pk).update(updated_at=old)
+        since = (old + timedelta(days=1)).date().isoformat()
+
+        recipes = self.get_export(f'?updated_since={since}')
+        self.assertEqual([recipe['id'] for recipe in recipes], [other.pk])
+
+    def test_export_rejects_invalid_filters(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url + '?category_id=abc')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(self.url + '?updated_since=yesterday')
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_fetches_related_objects_once_per_chunk(self):
+        lines = export_recipes(get_export_queryset(), chunk_size=2)
+
+        # recipes (iterator chunk, with their category names), tags and
+        # cover variants per chunk
+        with self.assertNumQueries(3):
+            self.assertEqual(next(lines).count('\n'), 2)
+
+        self.assertEqual(sum(chunk.count('\n') for chunk in lines), 3)
+
+    def test_export_command_writes_ndjson(self):
+        out = StringIO()
+        call_command('export_recipes', stdout=out, chunk_size=2)
+        recipes = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(recipes), 5)
@@ -0,0 +1,249 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from django.urls import reverse
+from recipes import counters, metadata
+from recipes.models import Category, Recipe, RecipeSearchTerm
+from recipes.search import search_recipes
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RECIPE_COVER_WORKERS=0)
+class RecipeImportTest(RecipeTestBase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        return super().tearDownClass()
+
+    def setUp(self):
+        self.author = self.make_author(username='importer')
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir, ignore_errors=True)
+        return super().setUp()
+
+    def make_row(self, **kwargs):
+        row = {
+            'title': 'Bolo de cenoura',
+            'description': 'Description',
+            'preparation_time': 10,
+            'preparation_time_unit': 'Minutos',
+            'servings': 5,
+            'servings_unit': 'Porções',
+            'preparation_steps': 'Steps',
+            'is_published': True,
+        }
+        row.update(kwargs)
+        return row
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tempdir, name)
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+        return path
+
+    def write_jsonl(self, rows, name='recipes.jsonl'):
+        return self.write_file(
+            name, ''.join(json.dumps(row) + '\n' for row in rows),
+        )
+
+    def import_recipes(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_recipes', path, '--author=importer', '--cover-workers=0',
+            *args, stdout=out, stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_new_categories_and_tags_are_shown_right_away(self):
+        metadata.get_category(1)
+        metadata.get_tag_by_slug('bolo')
+        path = self.write_jsonl([
+            self.make_row(category='Doces', tags=['Bolo']),
+        ])
+        self.import_recipes(path)
+
+        category = Category.objects.get(name='Doces')
+        self.assertEqual(metadata.get_category_name(category.pk), 'Doces')
+        response = self.client.get(reverse(
+            'recipes:category', kwargs={'category_id': category.pk},
+        ))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            reverse('recipes:tag', kwargs={'slug': 'bolo'}),
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_imports_jsonl_creating_missing_categories_and_tags(self):
+        Category.objects.create(name='Doces')
+        path = self.write_jsonl([
+            self.make_row(category='Doces', tags=['Bolo', 'Cenoura']),
+            self.make_row(
+                title='Pão', category='Pães', tags=['Bolo'],
+                is_published=False,
+            ),
+        ])
+
+        out, err = self.import_recipes(path)
+
+        self.assertIn('2 recipes imported, 0 skipped', out)
+        self.assertEqual(Category.objects.filter(name='Doces').count(), 1)
+        self.assertTrue(Category.objects.filter(name='Pães').exists())
+        self.assertEqual(Tag.objects.filter(name='Bolo').count(), 1)
+
+        recipe = Recipe.objects.get(title='Bolo de cenoura')
+        self.assertEqual(recipe.author, self.author)
+        self.assertEqual(recipe.category.name, 'Doces')
+        self.assertEqual(
+            sorted(recipe.tags.values_list('name', flat=True)),
+            ['Bolo', 'Cenoura'],
+        )
+
+    def test_imported_recipes_get_unique_slugs(self):
+        path = self.write_jsonl([
+            self.make_row(title=f'Bolo {i}') for i in range(5)
+        ])
+
+        self.import_recipes(path, '--batch-size=2')
+
+        slugs = set(Recipe.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), 5)
+        self.assertTrue(all(slug.startswith('bolo-') for slug in slugs))
+
+    def test_imported_tags_get_the_plain_slug_while_it_is_free(self):
+        # Tag 'bolo' with another name, 'Bolo' falls back to random letters
+        Tag.objects.create(name='Bolos', slug='bolo')
+        path = self.write_jsonl([
+            self.make_row(tags=['Bolo', 'Cenoura']),
+        ])
+
+        self.import_recipes(path)
+
+        self.assertEqual(Tag.objects.get(name='Cenoura').slug, 'cenoura')
+        slug = Tag.objects.get(name='Bolo').slug
+        self.assertRegex(slug, r'^bolo-[a-z0-9]{5}$')
+
+    def test_rows_with_a_taken_title_are_skipped(self):
+        self.make_recipe(title='Bolo de Cenoura')
+        path = self.write_jsonl([
+            self.make_row(title='BOLO DE CENOURA'),
+            self.make_row(title='Pão de Açúcar'),
+            self.make_row(title='pao de  acucar'),
+        ])
+
+        out, err = self.import_recipes(path)
+
+        self.assertIn('1 recipes imported, 2 skipped', out)
+        self.assertIn('Line 1:', err)
+        self.assertIn('Line 3:', err)
+        self.assertTrue(Recipe.objects.filter(title='Pão de Açúcar').exists())
+
+    def test_imports_csv_converting_text_values(self):
+        path = self.write_file('recipes.csv', (
+            'title,description,preparation_time,preparation_time_unit,'
+            'servings,servings_unit,preparation_steps,is_published,'
+            'category,tags\n'
+            'Bolo,Description,10,Minutos,5,Porções,Steps,true,Doces,'
+            'Bolo|Sweet\n'
+        ))
+
+        out, err = self.import_recipes(path)
+
+        self.assertIn('1 recipes imported', out, err)
+        recipe = Recipe.objects.get(title='Bolo')
+        self.assertEqual(recipe.preparation_time, 10)
+        self.assertTrue(recipe.is_published)
+        self.assertEqual(recipe.tags.count(), 2)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        path = self.write_file('recipes.jsonl', (
+            json.dumps(self.make_row()) + '\n'
+            'not json\n' +
+            json.dumps(self.make_row(servings='many')) + '\n' +
+            json.dumps(self.make_row(description='')) + '\n'
+        ))
+
+        out, err = self.import_recipes(path)
+
+        self.assertIn('1 recipes imported, 3 skipped', out)
+        self.assertIn('Line 2:', err)
+        self.assertIn('Line 3:', err)
+        self.assertIn('servings', err)
+        self.assertIn('Line 4:', err)
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_imported_recipes_are_indexed_and_counted(self):
+        Category.objects.create(name='Doces')
+        path = self.write_jsonl([
+            self.make_row(category='Doces', tags=['Bolo']),
+            self.make_row(title='Rascunho', is_published=False),
+        ])
+
+        self.import_recipes(path)
+
+        recipe = Recipe.objects.get(is_published=True)
+        self.assertTrue(RecipeSearchTerm.objects.filter(
+            recipe=recipe,
+        ).exists())
+        self.assertIn(
+            recipe, search_recipes(Recipe.objects.all(), 'cenoura'),
+        )
+        self.assertEqual(counters.get_count(counters.PUBLISHED), 1)
+        self.assertEqual(
+            counters.get_count(counters.category_key(recipe.category_id)), 1,
+        )
+        self.assertEqual(
+            counters.get_count(counters.tag_key(recipe.tags.get().pk)), 1,
+        )
+        self.assertEqual(
+            counters.get_count(counters.author_key(self.author.pk)), 1,
+        )
+
+    def test_queries_do_not_grow_with_the_rows_of_a_batch(self):
+        Tag.objects.create(name='Bolo')
+        Tag.objects.create(name='Doce')
+
+        def count_queries(total):
+            path = self.write_jsonl([
+                self.make_row(title=f'Recipe {i}', tags=['Bolo', 'Doce'])
+                for i in range(total)
+            ], name=f'{total}.jsonl')
+
+            with CaptureQueriesContext(connection) as queries:
+                self.import_recipes(path)
+
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(20))
+
+    def test_covers_are_stored_and_processed(self):
+        Image.new('RGB', (900, 600), 'orange').save(
+            os.path.join(self.tempdir, 'cover.jpg'), 'JPEG',
+        )
+        path = self.write_jsonl([
+            self.make_row(cover='cover.jpg'),
+            self.make_row(title='Missing', cover='missing.jpg'),
+        ])
+
+        out, err = self.import_recipes(path, f'--covers-dir={self.tempdir}')
+
+        self.assertIn('1 recipes imported, 1 skipped', out)
+        self.assertIn('cover', err)
+        recipe = Recipe.objects.get()
+        self.assertTrue(recipe.cover.name.startswith('recipes/covers/'))
+        self.assertTrue(recipe.cover.storage.exists(recipe.cover.name))
+        self.assertEqual(recipe.cover_status, Recipe.CoverStatus.READY)
+        self.assertTrue(recipe.cover_variants.exists())
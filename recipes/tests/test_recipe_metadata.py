@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+from django.urls import reverse
+from recipes import metadata
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeMetadataTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.category = self.make_category(name='Doces')
+        self.tag = Tag.objects.create(name='Bolo', slug='bolo')
+
+    def test_lookups_are_served_from_the_process_cache(self):
+        metadata.get_category(self.category.pk)
+        metadata.get_tag(self.tag.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                metadata.get_category_name(str(self.category.pk)), 'Doces',
+            )
+            self.assertEqual(metadata.get_tag_by_slug('bolo'), self.tag)
+            self.assertIsNone(metadata.get_category('not-an-id'))
+
+    def test_saving_a_category_reloads_the_categories(self):
+        metadata.get_category(self.category.pk)
+
+        self.category.name = 'Salgados'
+        self.category.save()
+
+        self.assertEqual(
+            metadata.get_category_name(self.category.pk), 'Salgados',
+        )
+
+    def test_deleting_a_tag_reloads_the_tags(self):
+        metadata.get_tag_by_slug('bolo')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.delete()
+
+        self.assertIsNone(metadata.get_tag_by_slug('bolo'))
+
+    def test_changes_made_in_another_process_are_seen(self):
+        metadata.get_category(self.category.pk)
+        metadata.get_tag(self.tag.pk)
+
+        # Their generations are bumped in the cache of the other process
+        with mock.patch('recipes.cache.cache', LocMemCache('other', {})):
+            category = self.make_recipe(
+                category_data={'name': 'Salgados'},
+            ).category
+            tag = Tag.objects.create(name='Torta', slug='torta')
+            self.category.name = 'Bolos'
+            self.category.save()
+
+        self.assertEqual(metadata.get_category(category.pk), category)
+        self.assertEqual(metadata.get_tag(tag.pk), tag)
+        self.assertEqual(metadata.get_tag_by_slug('torta'), tag)
+        response = self.client.get(
+            reverse('recipes:category', args=(category.pk,)),
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # Renames after the tables expire
+        self.assertEqual(metadata.get_category_name(self.category.pk), 'Doces')
+
+        with override_settings(METADATA_CACHE_TIMEOUT=0):
+            self.assertEqual(
+                metadata.get_category_name(self.category.pk), 'Bolos',
+            )
+
+    def test_category_page_of_an_unknown_category_runs_no_recipe_query(self):
+        metadata.get_category(self.category.pk)
+
+        # Only the lookup of the category
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('recipes:category', args=(self.category.pk + 1,)),
+            )
+
+        self.assertEqual(response.status_code, 404)
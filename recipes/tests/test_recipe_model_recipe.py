@@ -61,3 +61,48 @@ class RecipeModelTest(RecipeTestBase):
             msg=f'Recipe string representation must be '
                 f'"{needed}" but "{str(self.recipe)}" was received.'
         )
+
+    def test_recipe_title_must_be_unique_ignoring_case_and_accents(self):
+        self.recipe.title = 'Pão de Açúcar'
+        self.recipe.save()
+        recipe = self.make_recipe_no_defaults()
+        recipe.title = '  PAO  de acucar '
+
+        with self.assertRaises(ValidationError) as context:
+            recipe.full_clean()
+
+        self.assertIn('title', context.exception.message_dict)
+
+    def test_recipe_normalized_title_follows_the_title(self):
+        self.recipe.title = 'Pão de Açúcar'
+        self.recipe.save(update_fields=['title'])
+        self.recipe.refresh_from_db()
+
+        self.assertEqual(self.recipe.normalized_title, 'pao de acucar')
+
+    def make_legacy_duplicate(self):
+        # Saved with a taken title before normalized_title existed
+        recipe = self.make_recipe(
+            title='Other Title', slug='legacy-duplicate',
+            author_data={'username': 'legacy'},
+        )
+        Recipe.objects.filter(pk=recipe.pk).update(
+            title=self.recipe.title, normalized_title=None,
+        )
+        recipe.refresh_from_db()
+        return recipe
+
+    def test_recipe_with_a_legacy_duplicate_title_can_be_saved(self):
+        recipe = self.make_legacy_duplicate()
+        recipe.is_published = False
+        recipe.full_clean()
+        recipe.save()
+        recipe.refresh_from_db()
+
+        self.assertIsNone(recipe.normalized_title)
+
+        recipe.title = 'Another Title'
+        recipe.save()
+        recipe.refresh_from_db()
+
+        self.assertEqual(recipe.normalized_title, 'another title')
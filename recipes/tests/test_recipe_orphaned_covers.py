@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from recipes.images import encode_variant
+from recipes.models import Recipe, RecipeCoverVariant
+
+from .test_recipe_base import RecipeTestBase
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RECIPE_COVER_WORKERS=0)
+class RecipeOrphanedCoversTest(RecipeTestBase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        return super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        self.recipe = self.make_recipe()
+        return super().setUp()
+
+    def make_file(self, name, age_hours=48):
+        name = default_storage.save(name, ContentFile(b'image'))
+        modified = time.time() - age_hours * 3600
+        os.utime(default_storage.path(name), (modified, modified))
+        return name
+
+    def delete_orphaned_covers(self, *args):
+        out = StringIO()
+        call_command(
+            'delete_orphaned_covers', '--workers=0', *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_lists_only_files_no_recipe_points_to(self):
+        cover = self.make_file('recipes/covers/2024/01/02/cover.jpg')
+        orphan = self.make_file('recipes/covers/2024/01/02/orphan.jpg')
+        other_day = self.make_file('recipes/covers/2024/02/03/other.jpg')
+        Recipe.objects.filter(pk=self.recipe.pk).update(cover=cover)
+
+        output = self.delete_orphaned_covers()
+
+        self.assertNotIn(cover, output)
+        self.assertIn(orphan, output)
+        self.assertIn(other_day, output)
+        self.assertIn('2 orphaned files found, 3 files checked', output)
+        # Only listed without --delete
+        self.assertTrue(default_storage.exists(orphan))
+
+    def test_delete_removes_orphans_and_keeps_referenced_files(self):
+        cover = self.make_file('recipes/covers/2024/01/02/cover.jpg')
+        orphan = self.make_file('recipes/covers/2024/01/02/orphan.jpg')
+        variant = self.make_file('recipes/covers/variants/variant.webp')
+        orphan_variant = self.make_file('recipes/covers/variants/old.webp')
+        Recipe.objects.filter(pk=self.recipe.pk).update(cover=cover)
+        RecipeCoverVariant.objects.create(
+            recipe=self.recipe, format='webp', width=320, height=160,
+            file=variant,
+        )
+
+        output = self.delete_orphaned_covers('--delete')
+
+        self.assertIn('2 orphaned files deleted', output)
+        self.assertTrue(default_storage.exists(cover))
+        self.assertTrue(default_storage.exists(variant))
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(default_storage.exists(orphan_variant))
+
+    def test_files_are_looked_up_in_batches(self):
+        names = [
+            self.make_file(f'recipes/covers/variants/{i}.webp')
+            for i in range(5)
+        ]
+        RecipeCoverVariant.objects.create(
+            recipe=self.recipe, format='webp', width=320, height=160,
+            file=names[3],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            output = self.delete_orphaned_covers('--batch-size=2')
+
+        self.assertIn('4 orphaned files found, 5 files checked', output)
+        self.assertNotIn(names[3], output)
+        lookups = [
+            query['sql'] for query in queries.captured_queries
+            if 'recipes_recipecovervariant' in query['sql']
+        ]
+        self.assertEqual(len(lookups), 3)
+        self.assertFalse([sql for sql in lookups if 'LIKE' in sql])
+
+    def test_recent_files_are_kept(self):
+        # May belong to a recipe whose transaction has not committed yet
+        recent = self.make_file(
+            'recipes/covers/2024/01/02/recent.jpg', age_hours=1,
+        )
+
+        output = self.delete_orphaned_covers('--delete')
+
+        self.assertIn('0 orphaned files deleted', output)
+        self.assertTrue(default_storage.exists(recent))
+
+    def test_variants_are_checked_in_their_hash_prefix_directories(self):
+        legacy = self.make_file('recipes/covers/variants/legacy.webp')
+        names = [
+            self.make_file(f'recipes/covers/variants/{prefix}/{prefix}.webp')
+            for prefix in ('0a', '0b')
+        ]
+        RecipeCoverVariant.objects.create(
+            recipe=self.recipe, format='webp', width=320, height=160,
+            file=names[0],
+        )
+
+        output = self.delete_orphaned_covers('--delete')
+
+        self.assertIn('2 orphaned files deleted, 3 files checked', output)
+        self.assertTrue(default_storage.exists(names[0]))
+        self.assertFalse(default_storage.exists(names[1]))
+        self.assertFalse(default_storage.exists(legacy))
+
+    def test_variant_files_reused_by_a_new_cover_are_not_deleted(self):
+        image = Image.new('RGB', (640, 320), 'orange')
+        name, _ = encode_variant(image, 320, 'webp')
+        modified = time.time() - 48 * 3600
+        os.utime(default_storage.path(name), (modified, modified))
+
+        # Same content again, its row is not committed yet
+        self.assertEqual(encode_variant(image, 320, 'webp')[0], name)
+        output = self.delete_orphaned_covers('--delete')
+
+        self.assertIn('0 orphaned files deleted', output)
+        self.assertTrue(default_storage.exists(name))
@@ -0,0 +1,106 @@
+from django.test import override_settings
+from django.urls import reverse
+from recipes.models import Recipe
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+# The tests run in one process, its cache is shared by all the requests
+@override_settings(CACHE_IS_SHARED=True)
+class RecipePageCacheTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe_a = self.make_recipe(
+            title='Recipe A', slug='a', author_data={'username': 'a'},
+            category_data={'name': 'Category A'},
+        )
+        self.recipe_b = self.make_recipe(
+            title='Recipe B', slug='b', author_data={'username': 'b'},
+            category_data={'name': 'Category B'},
+        )
+        self.tag = Tag.objects.create(name='Tag', slug='tag')
+        self.recipe_a.tags.add(self.tag)
+
+    def get_content(self, url, **headers):
+        return self.client.get(url, **headers).content.decode('utf-8')
+
+    def category_url(self, recipe):
+        return reverse('recipes:category', args=(recipe.category_id,))
+
+    def change_title_without_signals(self, recipe, title):
+        Recipe.objects.filter(pk=recipe.pk).update(title=title)
+
+    def test_anonymous_home_page_is_served_from_cache(self):
+        self.client.get(reverse('recipes:home'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('recipes:home'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Recipe A', response.content.decode('utf-8'))
+
+    def test_pages_are_cached_per_page_number(self):
+        self.client.get(reverse('recipes:home'))
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('recipes:home') + '?page=1&other=1')
+
+        response = self.client.get(reverse('recipes:home') + '?page=2')
+        self.assertIsNotNone(response.context)
+
+    def test_logged_in_users_do_not_get_cached_pages(self):
+        self.client.get(reverse('recipes:home'))
+        self.change_title_without_signals(self.recipe_a, 'Not Cached')
+        self.recipe_a.author.set_password('password')
+        self.recipe_a.author.save()
+
+        self.client.login(username='a', password='password')
+        self.assertIn('Not Cached', self.get_content(reverse('recipes:home')))
+
+    def test_recipe_change_keeps_other_category_pages(self):
+        url_a = self.category_url(self.recipe_a)
+        url_b = self.category_url(self.recipe_b)
+        self.get_content(url_a)
+        self.get_content(url_b)
+
+        self.change_title_without_signals(self.recipe_b, 'B Not Rendered')
+        self.recipe_a.title = 'Recipe A Edited'
+        self.recipe_a.save()
+
+        self.assertIn('Recipe A Edited', self.get_content(url_a))
+        self.assertIn('Recipe A Edited', self.get_content(
+            reverse('recipes:home')
+        ))
+        self.assertIn('Recipe B', self.get_content(url_b))
+        self.assertNotIn('B Not Rendered', self.get_content(url_b))
+
+    def test_tag_page_is_invalidated_when_recipe_tags_change(self):
+        url = reverse('recipes:tag', args=(self.tag.slug,))
+        self.assertNotIn('Recipe B', self.get_content(url))
+
+        self.recipe_b.tags.add(self.tag)
+        self.assertIn('Recipe B', self.get_content(url))
+
+    def test_category_rename_invalidates_all_pages(self):
+        self.get_content(reverse('recipes:home'))
+
+        category = self.recipe_b.category
+        category.name = 'Renamed Category'
+        category.save()
+
+        self.assertIn(
+            'Renamed Category', self.get_content(reverse('recipes:home'))
+        )
+
+    @override_settings(RECIPE_PAGE_CACHE_TIMEOUT=0)
+    def test_page_cache_can_be_disabled(self):
+        self.client.get(reverse('recipes:home'))
+        response = self.client.get(reverse('recipes:home'))
+        self.assertIsNotNone(response.context)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_page_cache_is_off_without_a_shared_cache(self):
+        self.client.get(reverse('recipes:home'))
+        response = self.client.get(reverse('recipes:home'))
+        self.assertIsNotNone(response.context)
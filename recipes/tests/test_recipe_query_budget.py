@@ -0,0 +1,157 @@
+from functools import partial
+from unittest.mock import patch
+
+from authors.tokens import revoked_tokens
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from parameterized import parameterized
+from recipes import metadata
+from recipes.export import export_recipes
+from recipes.tests.test_recipe_api_v2 import RecipeAPIv2Mixin
+from rest_framework import test
+from tag.models import Tag
+from utils.queries import QueryBudgetTestMixin, get_route_names
+
+# Their queries run in threads of their own, out of reach of
+# assertMaxQueries: test_recipe_api_v2_async.py checks their budgets
+ASYNC_ROUTES = [
+    'recipes:recipes-api-async-list',
+    'recipes:recipes-api-async-detail',
+    'recipes:recipes-api-tags-async-list',
+    'recipes:recipes-api-tags-async-detail',
+]
+ROUTES = [
+    route_name for route_name in get_route_names('recipes')
+    if route_name not in ASYNC_ROUTES
+]
+
+
+# The table of revoked tokens is checked once every interval, not per
+# request: never within a request measured here, however slow the tests
+@override_settings(REVOKED_TOKENS_CHECK_INTERVAL=3600)
+class RecipeQueryBudgetTest(
+    test.APITestCase, RecipeAPIv2Mixin, QueryBudgetTestMixin
+):
+    def setUp(self):
+        self.tags = [
+            Tag.objects.create(name=f'Tag {i}', slug=f'tag-{i}')
+            for i in range(3)
+        ]
+        self.recipes = self.make_recipe_in_batch(qtd=5)
+
+        for recipe in self.recipes:
+            recipe.tags.set(self.tags)
+
+        self.recipe = self.recipes[0]
+        self.auth_data = self.get_auth_data()
+
+        # Budgets are for a running process, with the metadata cached
+        metadata.categories.get_data()
+        metadata.tags.get_data()
+        revoked_tokens.get_data()
+        return super().setUp()
+
+    def request_route(self, route_name):
+        recipe, tag = self.recipe, self.tags[0]
+        token = self.auth_data['jwt_access_token']
+        jwt = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        requests = {
+            'recipes:home': ('get', (), {}, {}),
+            'recipes:search': ('get', (), {'q': 'Recipe'}, {}),
+            'recipes:tag': ('get', (tag.slug,), {}, {}),
+            'recipes:category': ('get', (recipe.category_id,), {}, {}),
+            'recipes:recipe': ('get', (recipe.pk,), {}, {}),
+            'recipes:recipes_api_v1': ('get', (), {}, {}),
+            'recipes:recipes_api_v1_detail': ('get', (recipe.pk,), {}, {}),
+            'recipes:recipes_api_v2_export': ('get', (), {}, jwt),
+            'recipes:theory': ('get', (), {}, {}),
+            'recipes:token_obtain_pair': ('post', (), {
+                'username': 'user', 'password': 'password',
+            }, {}),
+            'recipes:token_refresh': ('post', (), {
+                'refresh': self.auth_data['jwt_refresh_token'],
+            }, {}),
+            'recipes:token_verify': ('post', (), {'token': token}, {}),
+            'recipes:token_revoke': ('post', (), {
+                'refresh': self.auth_data['jwt_refresh_token'],
+            }, jwt),
+            'recipes:recipes-api-list': ('get', (), {}, {}),
+            'recipes:recipes-api-batch': ('post', (), [{
+                **self.get_recipe_raw_data(), 'title': f'Batch recipe {i}',
+                'tags': [tag.pk for tag in self.tags],
+            } for i in range(2)], {'format': 'json', **jwt}),
+            'recipes:recipes-api-detail': ('get', (recipe.pk,), {}, {}),
+            'recipes:recipes-api-tags-list': ('get', (), {}, {}),
+            'recipes:recipes-api-tags-detail': ('get', (tag.pk,), {}, {}),
+        }
+        method, args, data, extra = requests[route_name]
+        url = reverse(route_name, args=args)
+        return getattr(self.client, method)(url, data=data, **extra)
+
+    def test_every_recipe_route_has_a_query_budget(self):
+        route_names = get_route_names('recipes')
+
+        self.assertIn('recipes:recipes-api-batch', route_names)
+        self.assertEqual([
+            route_name for route_name in route_names
+            if route_name not in settings.QUERY_BUDGETS
+        ], [])
+
+    @parameterized.expand(ROUTES)
+    def test_recipe_route_stays_in_its_query_budget(self, route_name):
+        budget = settings.QUERY_BUDGETS[route_name]
+
+        with self.assertMaxQueries(budget, route_name):
+            response = self.request_route(route_name)
+
+        self.assertLess(response.status_code, 400)
+
+        if response.streaming:
+            self.assertStreamingMaxQueries(response, budget, route_name)
+
+    @patch(
+        'recipes.views.api.export_recipes',
+        partial(export_recipes, chunk_size=2),
+    )
+    def test_export_stays_in_its_query_budget_in_every_chunk(self):
+        route_name = 'recipes:recipes_api_v2_export'
+        budget = settings.QUERY_BUDGETS[route_name]
+        response = self.request_route(route_name)
+
+        content = self.assertStreamingMaxQueries(response, budget, route_name)
+        self.assertEqual(content.count(b'\n'), len(self.recipes))
+
+    @override_settings(
+        QUERY_BUDGET_ENABLED=True,
+        QUERY_BUDGETS={'recipes:recipes_api_v2_export': 1},
+    )
+    def test_query_budget_middleware_checks_streamed_chunks(self):
+        response = self.request_route('recipes:recipes_api_v2_export')
+
+        with self.assertLogs('utils.queries', level='WARNING') as logs:
+            b''.join(response.streaming_content)
+
+        self.assertIn(
+            'recipes:recipes_api_v2_export ran 3 queries, over its budget '
+            'of 1', logs.output[0],
+        )
+
+    @parameterized.expand(ROUTES)
+    def test_recipe_route_has_no_repeated_queries(self, route_name):
+        with self.assertNoRepeatedQueries(route_name):
+            self.request_route(route_name)
+
+    @override_settings(
+        QUERY_BUDGET_ENABLED=True,
+        QUERY_BUDGETS={'recipes:home': 1},
+        QUERY_BUDGET_REPEAT_THRESHOLD=2,
+    )
+    def test_query_budget_middleware_reports_requests_over_budget(self):
+        with self.assertLogs('utils.queries', level='WARNING') as logs:
+            response = self.client.get(reverse('recipes:home'))
+
+        self.assertEqual(response['X-Query-Count'], '4')
+        self.assertIn(
+            'recipes:home ran 4 queries, over its budget of 1', logs.output[0],
+        )
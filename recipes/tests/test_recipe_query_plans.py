@@ -0,0 +1,55 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+from parameterized import parameterized
+from recipes.models import Recipe
+from recipes.search import search_recipes
+
+# A table scan line of the plan of each backend. Scanning an index in
+# order (SQLite: SCAN ... USING INDEX) is fine, reading every row is not.
+FULL_SCAN_REGEXES = {
+    'sqlite': re.compile(r'\bSCAN (TABLE )?recipes_recipe\b(?! USING)'),
+    'postgresql': re.compile(r'\bSeq Scan on recipes_recipe\b'),
+}
+
+
+def published():
+    return Recipe.objects.get_published()
+
+
+# The querysets of the list views and API (see Recipe.Meta.indexes)
+HOT_QUERYSETS = [
+    ('home', lambda: published()[:9]),
+    ('category', lambda: published().filter(category_id=1)[:9]),
+    ('tag', lambda: published().filter(tags__slug='tag')[:9]),
+    ('author', lambda: published().filter(author_id=1)[:9]),
+    ('detail', lambda: published().filter(pk=1)),
+    ('search', lambda: search_recipes(published(), 'bolo')[:9]),
+    ('dashboard', lambda: Recipe.objects.filter(
+        is_published=False, author_id=1,
+    )),
+]
+
+
+class RecipeQueryPlanTest(TestCase):
+    def explain(self, queryset):
+        # Tables are empty in tests, the planner would rather read them
+        # than an index
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+        return queryset.explain()
+
+    @parameterized.expand(HOT_QUERYSETS)
+    def test_hot_queryset_does_not_scan_recipes(self, name, get_queryset):
+        regex = FULL_SCAN_REGEXES.get(connection.vendor)
+
+        if regex is None:
+            self.skipTest(f'No plan check for {connection.vendor}')
+
+        plan = self.explain(get_queryset())
+        self.assertIsNone(
+            regex.search(plan), msg=f'{name} scans recipes_recipe:\n{plan}',
+        )
@@ -0,0 +1,141 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipes.models import Recipe, RecipeSearchTerm
+from recipes.search import fold_text, search_recipes, tokenize
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeSearchIndexTest(RecipeTestBase):
+    def search(self, search_term):
+        return list(search_recipes(Recipe.objects.all(), search_term))
+
+    def test_fold_text_removes_accents_and_case(self):
+        self.assertEqual(fold_text('Pão de AÇÚCAR'), 'pao de acucar')
+        self.assertEqual(tokenize('Pão, de-Açúcar!'), ['pao', 'de', 'acucar'])
+
+    def test_recipe_is_indexed_when_saved(self):
+        recipe = self.make_recipe(title='Bolo de Limão')
+        terms = RecipeSearchTerm.objects.filter(recipe=recipe)
+        self.assertTrue(terms.filter(term='limao').exists())
+
+        recipe.title = 'Torta de Maçã'
+        recipe.save()
+        self.assertFalse(terms.filter(term='limao').exists())
+        self.assertTrue(terms.filter(term='maca').exists())
+
+    def test_saves_that_keep_the_indexed_text_keep_the_index(self):
+        recipe = self.make_recipe(title='Bolo de Limão')
+
+        with CaptureQueriesContext(connection) as queries:
+            recipe.is_published = False
+            recipe.save()
+            recipe.save(update_fields=['cover_status'])
+            Recipe.objects.get(pk=recipe.pk).save()
+
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'recipes_recipesearchterm' in query['sql']
+        ])
+
+    def test_index_is_removed_when_recipe_is_deleted(self):
+        recipe = self.make_recipe(title='Bolo de Limão')
+        recipe.delete()
+        self.assertFalse(RecipeSearchTerm.objects.exists())
+
+    def test_search_ignores_accents_and_matches_word_prefixes(self):
+        recipe = self.make_recipe(title='Pão de Açúcar')
+        self.assertEqual(self.search('pao de acucar'), [recipe])
+        self.assertEqual(self.search('AÇÚ'), [recipe])
+        self.assertEqual(self.search('pao de mel'), [])
+
+    def test_search_finds_preparation_steps(self):
+        recipe = self.make_recipe(preparation_steps='Asse em forno médio')
+        self.assertEqual(self.search('forno medio'), [recipe])
+
+    def test_search_ranks_title_matches_first(self):
+        in_title = self.make_recipe(
+            slug='in-title', author_data={'username': 'in-title'},
+            title='Frango ao forno',
+        )
+        in_steps = self.make_recipe(
+            slug='in-steps', author_data={'username': 'in-steps'},
+            title='Recipe one', preparation_steps='Leve ao forno',
+        )
+        self.assertEqual(self.search('forno'), [in_title, in_steps])
+
+    def test_search_of_common_words_returns_newest_recipes_first(self):
+        in_title = self.make_recipe(
+            slug='in-title', author_data={'username': 'in-title'},
+            title='Frango ao forno',
+        )
+        in_steps = self.make_recipe(
+            slug='in-steps', author_data={'username': 'in-steps'},
+            title='Recipe one', preparation_steps='Leve ao forno',
+        )
+
+        with patch('recipes.search.COMMON_TERM_ROWS', new=1):
+            self.assertEqual(self.search('forno'), [in_steps, in_title])
+
+    def test_search_finds_recipes_of_common_and_rare_words(self):
+        recipe = self.make_recipe(title='Bolo de Limão')
+        self.make_recipe(
+            slug='other', author_data={'username': 'other'},
+            title='Bolo de Chocolate',
+        )
+
+        # Every word is common
+        with patch('recipes.search.COMMON_TERM_ROWS', new=1):
+            self.assertEqual(self.search('bolo lim'), [recipe])
+
+        # Every word is rare
+        with patch('recipes.search.COMMON_TERM_ROWS', new=10):
+            self.assertEqual(self.search('bolo lim'), [recipe])
+
+    def test_search_without_words_returns_nothing(self):
+        self.make_recipe()
+        self.assertEqual(self.search('!!!'), [])
+
+    def test_recipe_api_v2_can_search_recipes(self):
+        self.make_recipe(
+            slug='one', title='Bolo de cenoura', author_data={'username': 'a'}
+        )
+        self.make_recipe(
+            slug='two', title='Frango assado', author_data={'username': 'b'}
+        )
+
+        url = reverse('recipes:recipes-api-list') + '?q=cenoura'
+        response = self.client.get(url)
+
+        results = response.data.get('results')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'Bolo de cenoura')
+
+    @patch('recipes.views.api.RecipeAPIv2Pagination.page_size', new=2)
+    def test_recipe_api_v2_searches_are_not_counted(self):
+        for i in range(3):
+            self.make_recipe(
+                slug=f'bolo-{i}', title=f'Bolo {i}',
+                author_data={'username': f'author-{i}'},
+            )
+
+        url = reverse('recipes:recipes-api-list') + '?q=bolo'
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'COUNT(' in query['sql']
+        ])
+        self.assertIsNone(response.data['count'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
@@ -1,3 +1,7 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import resolve, reverse
 from recipes.views import site
 
@@ -50,3 +54,30 @@ class RecipeSearchViewTest(RecipeTestBase):
 
         self.assertIn(recipe1, response_both.context['recipes'])
         self.assertIn(recipe2, response_both.context['recipes'])
+
+    def test_recipe_search_paginates_without_counting(self):
+        self.make_recipe_in_batch(qtd=8)
+        url = reverse('recipes:search') + '?q=recipe'
+
+        with patch('recipes.views.site.PER_PAGE', new=3):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+
+            self.assertNotIn(
+                'COUNT(', ' '.join(query['sql'] for query in queries),
+            )
+            self.assertEqual(len(response.context['recipes']), 3)
+            self.assertTrue(response.context['recipes'].has_next())
+            self.assertIn('Go to next page', response.content.decode())
+            self.assertIsNone(
+                response.context['pagination_range']['approximate_count'],
+            )
+
+            # The last page tells how many results there are
+            self.client.get(url + '&page=3')
+            response = self.client.get(url)
+
+        self.assertEqual(
+            response.context['pagination_range']['approximate_count'], 8,
+        )
+        self.assertIn('~8 recipes', response.content.decode())
@@ -0,0 +1,57 @@
+from django.test import RequestFactory, TestCase
+from django.urls import set_script_prefix
+from parameterized import parameterized
+from recipes.serializers import PkHyperlinkedRelatedField
+from rest_framework import serializers
+from rest_framework.request import Request
+from tag.models import Tag
+
+VIEW_NAME = 'recipes:recipes-api-tags-detail'
+
+
+class TagLinksSerializer(serializers.Serializer):
+    old = serializers.HyperlinkedRelatedField(
+        many=True, source='tags', view_name=VIEW_NAME, read_only=True,
+    )
+    new = PkHyperlinkedRelatedField(
+        many=True, source='tags', view_name=VIEW_NAME, read_only=True,
+    )
+
+
+class PkHyperlinkedRelatedFieldTest(TestCase):
+    def get_links(self, request):
+        tags = [Tag(pk=1), Tag(pk=22), Tag(pk=333)]
+        data = TagLinksSerializer(
+            {'tags': tags}, context={'request': request},
+        ).data
+        return data['old'], data['new']
+
+    @parameterized.expand([
+        ('http', {}),
+        ('https', {'secure': True}),
+        ('host', {'HTTP_HOST': 'localhost'}),
+    ])
+    def test_urls_are_identical_to_hyperlinked_related_field(
+        self, name, request_kwargs,
+    ):
+        request = Request(
+            RequestFactory().get('/recipes/api/v2/', **request_kwargs),
+        )
+        old, new = self.get_links(request)
+        self.assertEqual(old, new)
+
+    def test_urls_are_identical_without_request(self):
+        old, new = self.get_links(None)
+        self.assertEqual(old, new)
+
+    def test_urls_follow_the_script_prefix(self):
+        request = Request(RequestFactory().get('/recipes/api/v2/'))
+        set_script_prefix('/app/')
+
+        try:
+            old, new = self.get_links(request)
+        finally:
+            set_script_prefix('/')
+
+        self.assertEqual(old, new)
+        self.assertTrue(new[0].startswith('http://testserver/app/'))
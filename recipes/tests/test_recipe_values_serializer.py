@@ -0,0 +1,71 @@
+from django.test import RequestFactory
+from parameterized import parameterized
+from recipes.models import Recipe, RecipeCoverVariant
+from recipes.serializers import RecipeSerializer, RecipeValuesSerializer
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeValuesSerializerTest(RecipeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.make_recipe(title='Pão de queijo')
+        self.make_recipe(
+            slug='no-relations', author_data={'username': 'other'},
+        )
+        Recipe.objects.filter(slug='no-relations').update(
+            category=None, author=None,
+        )
+
+        self.recipe.tags.add(
+            Tag.objects.create(name='Mineira', slug='mineira'),
+            Tag.objects.create(name='Lanche', slug='lanche'),
+        )
+        Recipe.objects.filter(pk=self.recipe.pk).update(
+            cover='recipes/covers/2022/01/01/cover.jpg',
+        )
+
+        for image_format in ('jpeg', 'webp'):
+            for width in (640, 320):
+                RecipeCoverVariant.objects.create(
+                    recipe=self.recipe, format=image_format, width=width,
+                    height=width // 2,
+                    file=f'recipes/covers/variants/{width}.{image_format}',
+                )
+
+    def render(self, serializer_class, queryset, request):
+        serializer = serializer_class(
+            queryset, many=True, context={'request': request},
+        )
+        return JSONRenderer().render(serializer.data)
+
+    @parameterized.expand([(True,), (False,)])
+    def test_output_is_identical_to_recipe_serializer(self, with_request):
+        request = None
+
+        if with_request:
+            request = Request(RequestFactory().get('/recipes/api/v2/'))
+
+        queryset = Recipe.objects.get_published()
+
+        self.assertEqual(
+            self.render(
+                RecipeValuesSerializer,
+                RecipeValuesSerializer.get_values(queryset),
+                request,
+            ),
+            self.render(RecipeSerializer, queryset, request),
+        )
+
+    def test_list_fetches_tags_and_variants_once_per_page(self):
+        self.make_recipe_in_batch(qtd=5)
+
+        # counter, recipes (with their category names), tags and cover
+        # variants
+        with self.assertNumQueries(4):
+            response = self.client.get('/recipes/api/v2/')
+
+        self.assertEqual(len(response.data['results']), 6)
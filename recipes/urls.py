@@ -5,7 +5,8 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
     TokenVerifyView,
 )
-from .views import site, api
+from authors.views import TokenRevokeView
+from .views import site, api, api_async
 
 app_name = 'recipes'
 
@@ -57,6 +58,31 @@ urlpatterns = [
         site.RecipeDetailAPI.as_view(),
         name="recipes_api_v1_detail",
     ),
+    path(
+        'recipes/api/v2/export/',
+        api.RecipeAPIv2Export.as_view(),
+        name="recipes_api_v2_export",
+    ),
+    path(
+        'recipes/api/v2/async/',
+        api_async.recipe_api_v2_async_list,
+        name="recipes-api-async-list",
+    ),
+    path(
+        'recipes/api/v2/async/<int:pk>/',
+        api_async.recipe_api_v2_async_detail,
+        name="recipes-api-async-detail",
+    ),
+    path(
+        'recipes/api/tags/v2/async/',
+        api_async.recipe_api_v2_tags_async_list,
+        name="recipes-api-tags-async-list",
+    ),
+    path(
+        'recipes/api/tags/v2/async/<int:pk>/',
+        api_async.recipe_api_v2_tags_async_detail,
+        name="recipes-api-tags-async-detail",
+    ),
     path(
         'recipes/theory/',
         site.theory,
@@ -70,6 +96,8 @@ urlpatterns = [
          TokenRefreshView.as_view(), name='token_refresh'),
     path('recipes/api/token/verify/',
          TokenVerifyView.as_view(), name='token_verify'),
+    path('recipes/api/token/revoke/',
+         TokenRevokeView.as_view(), name='token_revoke'),
 ]
 
 urlpatterns += recipe_api_v2_router.urls
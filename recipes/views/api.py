@@ -1,20 +1,76 @@
+from functools import partial
+
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import (IsAuthenticated,
+                                        IsAuthenticatedOrReadOnly)
+from rest_framework.views import APIView
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from utils.conditional import ConditionalGetMixin
+from utils.pagination import (CountedPaginator, HasNextPage,
+                              make_has_next_pagination)
+from utils.replicas import ReplicaReadAPIMixin
+from .. import counters
+from ..batch import BATCH_CHUNK_SIZE, BATCH_MAX_ITEMS, save_recipes_batch
+from ..cache import get_recipe_validators, get_validators
+from ..export import export_recipes, get_export_queryset, parse_updated_since
 from ..models import Recipe
-from ..serializers import RecipeSerializer, TagSerializer
+from ..serializers import (RecipeSerializer, RecipeValuesSerializer,
+                           TagSerializer)
 from ..permissions import IsOwner
+from ..search import search_recipes
 from tag.models import Tag
 
 
 class RecipeAPIv2Pagination(PageNumberPagination):
     page_size = 6
 
+    def paginate_queryset(self, queryset, request, view=None):
+        # Searches have no counter and are not counted either, like the
+        # search page: "count" is null, "next" tells if there is more
+        if request.query_params.get('q', '').strip():
+            self.request = request
+            self.page, _ = make_has_next_pagination(
+                request, queryset, self.get_page_size(request),
+            )
+            return list(self.page)
+
+        # The maintained counter of the list, instead of a COUNT(*)
+        count = None
+
+        if view is not None and hasattr(view, 'get_recipe_count'):
+            count = view.get_recipe_count()
+
+        self.django_paginator_class = partial(CountedPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
 
-class RecipeAPIv2ViewSet(ModelViewSet):
+    def get_paginated_response(self, data):
+        if not isinstance(self.page, HasNextPage):
+            return super().get_paginated_response(data)
+
+        return Response({
+            'count': None,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+# Opt-in with ?pagination=cursor. Keyset pagination over -id, the same
+# ordering as RecipeManager.get_published, so it runs no COUNT(*) and no
+# OFFSET scan, no matter how deep the client is in the list.
+class RecipeAPIv2CursorPagination(CursorPagination):
+    page_size = 6
+    ordering = '-id'
+
+
+class RecipeAPIv2ViewSet(
+    ReplicaReadAPIMixin, ConditionalGetMixin, ModelViewSet,
+):
     queryset = Recipe.objects.get_published()
     serializer_class = RecipeSerializer
     pagination_class = RecipeAPIv2Pagination
@@ -29,8 +85,119 @@ class RecipeAPIv2ViewSet(ModelViewSet):
         if category_id != '' and category_id.isnumeric():
             qs = qs.filter(category_id=category_id)
 
+        search_term = self.request.query_params.get('q', '').strip()
+
+        if search_term and self.action == 'list':
+            qs = search_recipes(qs, search_term)
+
         return qs
 
+    def get_validators(self, request, *args, **kwargs):
+        # request is still the Django one, before DRF wraps it. Responses
+        # are negotiated on the Accept header, it is part of the ETag.
+        accept = request.META.get('HTTP_ACCEPT', '')
+
+        if 'pk' in kwargs:
+            return get_recipe_validators(kwargs['pk'], accept)
+
+        category_id = request.GET.get('category_id', '')
+        namespaces = ['all', 'home']
+
+        if category_id != '' and category_id.isnumeric() and \
+                not request.GET.get('q', '').strip():
+            namespaces = ['all', f'category:{int(category_id)}']
+
+        return get_validators(namespaces, accept)
+
+    def list(self, request, *args, **kwargs):
+        # Reads .values() rows instead of model instances, see
+        # RecipeValuesSerializer
+        queryset = RecipeValuesSerializer.get_values(
+            self.filter_queryset(self.get_queryset()),
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = RecipeValuesSerializer(
+            queryset if page is None else page,
+            many=True,
+            context=self.get_serializer_context(),
+        )
+
+        if page is None:
+            return Response(serializer.data)
+
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request, *args, **kwargs):
+        # [{...}, {"id": 1, ...}]: items with an id update that recipe.
+        # ?atomic=false saves the valid items, chunk_size per transaction
+        items = request.data
+
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': 'Send a non empty list of recipes.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(items) > BATCH_MAX_ITEMS:
+            return Response(
+                {'detail': f'Send at most {BATCH_MAX_ITEMS} recipes.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        params = request.query_params
+        chunk_size = params.get('chunk_size', '')
+        chunk_size = int(chunk_size) if chunk_size.isnumeric() else 0
+
+        results, saved = save_recipes_batch(
+            items,
+            request.user,
+            context=self.get_serializer_context(),
+            atomic=params.get('atomic', '').lower() not in ('false', '0'),
+            chunk_size=min(chunk_size, BATCH_MAX_ITEMS) or BATCH_CHUNK_SIZE,
+        )
+
+        return Response(
+            {'results': results},
+            status=status.HTTP_200_OK if saved else
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def get_recipe_count(self):
+        params = self.request.query_params
+
+        if params.get('q', '').strip():
+            return None
+
+        category_id = params.get('category_id', '')
+
+        if category_id != '' and category_id.isnumeric():
+            return counters.get_count(
+                counters.category_key(int(category_id))
+            )
+
+        return counters.get_count(counters.PUBLISHED)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.uses_cursor_pagination():
+                self._paginator = RecipeAPIv2CursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+
+        return self._paginator
+
+    def uses_cursor_pagination(self):
+        if getattr(self, 'request', None) is None:
+            return False
+
+        params = self.request.query_params
+        cursor_param = RecipeAPIv2CursorPagination.cursor_query_param
+
+        return params.get('pagination', '') == 'cursor' or \
+            cursor_param in params
+
     def get_permissions(self):
         if self.request.method in ['PATCH', 'DELETE']:
             return [IsOwner(),]
@@ -92,6 +259,40 @@ class RecipeAPIv2ViewSet(ModelViewSet):
         )
 
 
+class RecipeAPIv2Export(APIView):
+    permission_classes = [IsAuthenticated,]
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        category_id = params.get('category_id', '')
+        updated_since = params.get('updated_since', '')
+
+        if category_id != '' and not category_id.isnumeric():
+            return Response(
+                {'category_id': ['A valid integer is required.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            updated_since = parse_updated_since(updated_since) \
+                if updated_since else None
+        except ValueError:
+            return Response(
+                {'updated_since': ['Use YYYY-MM-DD or an ISO 8601 date.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = get_export_queryset(
+            category_id=int(category_id) if category_id else None,
+            updated_since=updated_since,
+        )
+
+        return StreamingHttpResponse(
+            export_recipes(queryset, request),
+            content_type='application/x-ndjson',
+        )
+
+
 class RecipeAPIv2Tags(ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
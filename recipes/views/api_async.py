@@ -0,0 +1,110 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.utils.cache import get_conditional_response
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from utils.conditional import prepare_validators, set_validators
+from utils.queries import check_query_budget, record_queries
+from utils.replicas import read_from_replicas
+
+from .api import RecipeAPIv2Tags, RecipeAPIv2ViewSet
+
+ASYNC_METHODS = ('GET', 'HEAD')
+
+# Async twins of the read actions of the v2 viewsets, for ASGI. Requests
+# stay on the event loop, only the queries and the serialization go to a
+# thread of the pool, in one call: Django 4.0 has no async ORM. See
+# benchmarks/bench_async.py for how they compare with the sync viewsets.
+
+
+def render_json(data, status=200):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type='application/json',
+        status=status,
+    )
+
+
+def get_action_response(viewset_class, action, request, kwargs):
+    # Same code, and output, as the sync viewset: the action runs on an
+    # instance set up the way DRF does it, minus authentication, the read
+    # actions are open to everyone
+    read_from_replicas(request)
+    view = viewset_class(
+        action=action, request=Request(request), args=(), kwargs=kwargs,
+        format_kwarg=None,
+    )
+    etag, last_modified = None, None
+
+    if hasattr(view, 'get_validators'):
+        etag, last_modified = prepare_validators(
+            *view.get_validators(request, **kwargs),
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+
+        if response is not None:
+            return response
+
+    try:
+        response = getattr(view, action)(view.request, **kwargs)
+    except Exception as error:
+        # 404 and the other errors DRF answers (re-raises the rest)
+        response = view.handle_exception(error)
+
+    response = render_json(response.data, response.status_code)
+    set_validators(response, etag, last_modified)
+    return response
+
+
+def run_action(viewset_class, action, request, kwargs):
+    # A thread of the pool, never the one of the sync views
+    # (thread_sensitive=False): its connection is closed like at the end
+    # of a request
+    close_old_connections()
+
+    try:
+        if not settings.QUERY_BUDGET_ENABLED:
+            return get_action_response(
+                viewset_class, action, request, kwargs,
+            )
+
+        # The queries of this thread, QueryBudgetMiddleware can not see
+        # them from the event loop
+        with record_queries() as recorder:
+            response = get_action_response(
+                viewset_class, action, request, kwargs,
+            )
+
+        check_query_budget(request, recorder, response)
+        return response
+    finally:
+        close_old_connections()
+
+
+async def serve_action(viewset_class, action, request, **kwargs):
+    if request.method not in ASYNC_METHODS:
+        return HttpResponseNotAllowed(ASYNC_METHODS)
+
+    return await sync_to_async(run_action, thread_sensitive=False)(
+        viewset_class, action, request, kwargs,
+    )
+
+
+async def recipe_api_v2_async_list(request):
+    return await serve_action(RecipeAPIv2ViewSet, 'list', request)
+
+
+async def recipe_api_v2_async_detail(request, pk):
+    return await serve_action(RecipeAPIv2ViewSet, 'retrieve', request, pk=pk)
+
+
+async def recipe_api_v2_tags_async_list(request):
+    return await serve_action(RecipeAPIv2Tags, 'list', request)
+
+
+async def recipe_api_v2_tags_async_detail(request, pk):
+    return await serve_action(RecipeAPIv2Tags, 'retrieve', request, pk=pk)
@@ -1,29 +1,40 @@
 import os
 
-from django.db.models import Q
-from django.db.models.aggregates import Count
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.forms.models import model_to_dict
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.http.response import Http404
 from django.shortcuts import render
 from django.utils import translation
+from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 from django.views.generic import DetailView, ListView
-from tag.models import Tag
-from utils.pagination import make_pagination
-
+from utils.conditional import ConditionalGetMixin
+from utils.pagination import make_has_next_pagination, make_pagination
+from utils.replicas import ReplicaReadMixin
+
+from recipes import counters
+from recipes.cache import (get_recipe_validators, get_search_count,
+                           get_validators, make_page_key, set_search_count)
+from recipes.metadata import get_category, get_tag_by_slug
 from recipes.models import Recipe
+from recipes.search import search_recipes, tokenize
 
 PER_PAGE = int(os.environ.get('PER_PAGE', 6))
 
 
 def theory(request, *args, **kwargs):
     recipes = Recipe.objects.get_published()
-    number_of_recipes = recipes.aggregate(number=Count('id'))
+    number_of_recipes = counters.get_count(counters.PUBLISHED)
+
+    if number_of_recipes is None:
+        number_of_recipes = recipes.count()
 
     context = {
         'recipes': recipes,
-        'number_of_recipes': number_of_recipes['number']
+        'number_of_recipes': number_of_recipes
     }
 
     return render(
@@ -33,7 +44,60 @@ def theory(request, *args, **kwargs):
     )
 
 
-class RecipeListViewBase(ListView):
+class AnonymousPageCacheMixin:
+    # Pages are the same for every anonymous visitor. Keys change when a
+    # generation of the page namespaces is bumped (recipes/signals.py)
+    page_cache_namespaces = ['all', 'home']
+
+    def get_page_cache_namespaces(self):
+        return self.page_cache_namespaces
+
+    def can_cache_page(self, request):
+        return settings.CACHE_IS_SHARED and \
+            settings.RECIPE_PAGE_CACHE_TIMEOUT > 0 and \
+            request.method in ('GET', 'HEAD') and \
+            not request.user.is_authenticated and \
+            not len(get_messages(request))
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.can_cache_page(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = make_page_key(
+            request.path,
+            request.GET.get('page', 1),
+            translation.get_language(),
+            self.get_page_cache_namespaces(),
+        )
+
+        if key is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        cached = cache.get(key)
+
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().dispatch(request, *args, **kwargs)
+
+        def cache_response(response):
+            if response.status_code == 200:
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    settings.RECIPE_PAGE_CACHE_TIMEOUT,
+                )
+
+        if hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(cache_response)
+        else:
+            cache_response(response)
+
+        return response
+
+
+class RecipeListViewBase(ReplicaReadMixin, ListView):
     model = Recipe
     context_object_name = 'recipes'
     ordering = ['-id']
@@ -44,18 +108,37 @@ class RecipeListViewBase(ListView):
         qs = qs.filter(
             is_published=True,
         )
-        qs = qs.select_related('author', 'category', 'author__profile')
-        qs = qs.prefetch_related('tags')
+        qs = qs.select_related('author', 'author__profile', 'category')
+        qs = qs.prefetch_related('tags', 'cover_variants')
         return qs
 
-    def get_context_data(self, *args, **kwargs):
-        ctx = super().get_context_data(*args, **kwargs)
-        page_obj, pagination_range = make_pagination(
+    def get_counter_key(self):
+        return counters.PUBLISHED
+
+    def get_recipe_count(self):
+        # None when there is no counter for the list, the paginator counts
+        key = self.get_counter_key()
+
+        if key is None:
+            return None
+
+        if not hasattr(self, '_recipe_count'):
+            self._recipe_count = counters.get_count(key)
+
+        return self._recipe_count
+
+    def paginate_recipes(self, queryset):
+        return make_pagination(
             self.request,
-            ctx.get('recipes'),
-            PER_PAGE
+            queryset,
+            PER_PAGE,
+            count=self.get_recipe_count(),
         )
 
+    def get_context_data(self, *args, **kwargs):
+        ctx = super().get_context_data(*args, **kwargs)
+        page_obj, pagination_range = self.paginate_recipes(ctx.get('recipes'))
+
         html_language = translation.get_language()
 
         ctx.update(
@@ -68,13 +151,16 @@ class RecipeListViewBase(ListView):
         return ctx
 
 
-class RecipeListViewHome(RecipeListViewBase):
+class RecipeListViewHome(AnonymousPageCacheMixin, RecipeListViewBase):
     template_name = 'recipes/pages/home.html'
 
 
-class RecipeListViewHomeApi(RecipeListViewBase):
+class RecipeListViewHomeApi(ConditionalGetMixin, RecipeListViewBase):
     template_name = 'recipes/pages/home.html'
 
+    def get_validators(self, request, *args, **kwargs):
+        return get_validators(['all', 'home'])
+
     def render_to_response(self, context, **response_kwargs):
         recipes = self.get_context_data()['recipes']
         recipes_list = recipes.object_list.values()
@@ -85,35 +171,62 @@ class RecipeListViewHomeApi(RecipeListViewBase):
         )
 
 
-class RecipeListViewCategory(RecipeListViewBase):
+class RecipeListViewCategory(AnonymousPageCacheMixin, RecipeListViewBase):
     template_name = 'recipes/pages/category.html'
 
+    def get_page_cache_namespaces(self):
+        return ['all', f'category:{self.kwargs.get("category_id")}']
+
+    def get_counter_key(self):
+        return counters.category_key(self.kwargs.get('category_id'))
+
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data(*args, **kwargs)
         category_translation = _('Category')
 
         ctx.update({
-            'title': f'{ctx.get("recipes")[0].category.name} - '
-            f'{category_translation} | '
+            'title': f'{self.category.name} - {category_translation} | '
         })
 
         return ctx
 
+    @cached_property
+    def category(self):
+        return get_category(self.kwargs.get('category_id'))
+
     def get_queryset(self, *args, **kwargs):
+        if self.category is None:
+            raise Http404()
+
         qs = super().get_queryset(*args, **kwargs)
         qs = qs.filter(
             category__id=self.kwargs.get('category_id')
         )
 
-        if not qs:
+        count = self.get_recipe_count()
+
+        if count == 0 or (count is None and not qs.exists()):
             raise Http404()
 
         return qs
 
 
-class RecipeListViewTag(RecipeListViewBase):
+class RecipeListViewTag(AnonymousPageCacheMixin, RecipeListViewBase):
     template_name = 'recipes/pages/tag.html'
 
+    def get_page_cache_namespaces(self):
+        return ['all', f'tag:{self.kwargs.get("slug", "")}']
+
+    @cached_property
+    def tag(self):
+        return get_tag_by_slug(self.kwargs.get('slug', ''))
+
+    def get_counter_key(self):
+        if self.tag is None:
+            return None
+
+        return counters.tag_key(self.tag.pk)
+
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
         qs = qs.filter(tags__slug=self.kwargs.get('slug', ''))
@@ -121,9 +234,7 @@ class RecipeListViewTag(RecipeListViewBase):
 
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data(*args, **kwargs)
-        page_title = Tag.objects.filter(
-            slug=self.kwargs.get('slug', '')
-        ).first()
+        page_title = self.tag
 
         if not page_title:
             page_title = 'No recipes found'
@@ -147,14 +258,30 @@ class RecipeListViewSearch(RecipeListViewBase):
             raise Http404()
 
         qs = super().get_queryset(*args, **kwargs)
-        qs = qs.filter(
-            Q(
-                Q(title__icontains=search_term) |
-                Q(description__icontains=search_term),
-            )
-        )
+        qs = search_recipes(qs, search_term)
         return qs
 
+    def get_counter_key(self):
+        return None
+
+    def paginate_recipes(self, queryset):
+        # Searches have no counter, this mode does not count them either
+        search_term = self.request.GET.get('q', '')
+        tokens = list(dict.fromkeys(tokenize(search_term)))
+        page_obj, pagination_range = make_has_next_pagination(
+            self.request,
+            queryset,
+            PER_PAGE,
+            approximate_count=get_search_count(tokens),
+        )
+
+        if page_obj and not page_obj.has_next():
+            count = (page_obj.number - 1) * PER_PAGE + len(page_obj)
+            pagination_range['approximate_count'] = count
+            set_search_count(tokens, count)
+
+        return page_obj, pagination_range
+
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data(*args, **kwargs)
         search_term = self.request.GET.get('q', '')
@@ -168,7 +295,7 @@ class RecipeListViewSearch(RecipeListViewBase):
         return ctx
 
 
-class RecipeDetail(DetailView):
+class RecipeDetail(ReplicaReadMixin, DetailView):
     model = Recipe
     context_object_name = 'recipe'
     template_name = 'recipes/pages/recipe-view.html'
@@ -176,6 +303,8 @@ class RecipeDetail(DetailView):
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
         qs = qs.filter(is_published=True)
+        qs = qs.select_related('author', 'author__profile', 'category')
+        qs = qs.prefetch_related('tags', 'cover_variants')
         return qs
 
     def get_context_data(self, *args, **kwargs):
@@ -188,11 +317,15 @@ class RecipeDetail(DetailView):
         return ctx
 
 
-class RecipeDetailAPI(RecipeDetail):
+class RecipeDetailAPI(ConditionalGetMixin, RecipeDetail):
+    def get_validators(self, request, *args, **kwargs):
+        return get_recipe_validators(kwargs.get('pk'))
+
     def render_to_response(self, context, **response_kwargs):
         recipe = self.get_context_data()['recipe']
         recipe_dict = model_to_dict(recipe)
 
+        recipe_dict['tags'] = [tag.id for tag in recipe_dict['tags']]
         recipe_dict['created_at'] = str(recipe.created_at)
         recipe_dict['updated_at'] = str(recipe.updated_at)
 
@@ -9,15 +9,18 @@ class Tag(models.Model):
     name = models.CharField(max_length=255)
     slug = models.SlugField(unique=True)
 
+    def make_slug(self):
+        rand_letters = ''.join(
+            SystemRandom().choices(
+                string.ascii_letters + string.digits,
+                k=5,
+            )
+        )
+        return slugify(f'{self.name}-{rand_letters}')
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            rand_letters = ''.join(
-                SystemRandom().choices(
-                    string.ascii_letters + string.digits,
-                    k=5,
-                )
-            )
-            self.slug = slugify(f'{self.name}-{rand_letters}')
+            self.slug = self.make_slug()
         return super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,57 @@
+import calendar
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def prepare_validators(etag, last_modified):
+    # Header values, last_modified as a timestamp
+    if etag is not None:
+        etag = quote_etag(etag)
+
+    if last_modified is not None:
+        last_modified = calendar.timegm(last_modified.utctimetuple())
+
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code != 200:
+        return
+
+    if etag is not None and not response.has_header('ETag'):
+        response.headers['ETag'] = etag
+
+    if last_modified is not None and \
+            not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(last_modified)
+
+
+# Conditional GET for class based views (Django and DRF): answers 304
+# before the view runs when the client already has the current version.
+# get_validators returns the (etag, last_modified) of the response, the
+# last as a datetime, computed without building the response.
+class ConditionalGetMixin:
+    def get_validators(self, request, *args, **kwargs):
+        return None, None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+
+        if etag is None and last_modified is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = prepare_validators(etag, last_modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        set_validators(response, etag, last_modified)
+        return response
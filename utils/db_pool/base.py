@@ -0,0 +1,54 @@
+from functools import partial
+
+from django.db.backends.base.base import NO_DB_ALIAS
+from utils.db_pool.pool import close_pools, get_pool
+
+# What makes two settings_dict open connections to the same database
+DATABASE_KEYS = ('NAME', 'HOST', 'PORT', 'USER', 'OPTIONS')
+
+
+# Django opens and closes a connection per request (CONN_MAX_AGE = 0),
+# here those are taken from and given back to a pool of the process.
+# Settings in DATABASES[alias]['POOL'], see project/settings/databases.py
+class PooledDatabaseWrapperMixin:
+    def get_pool(self):
+        database = tuple(
+            repr(self.settings_dict.get(key)) for key in DATABASE_KEYS
+        )
+        return get_pool(
+            self.alias, self.settings_dict.get('POOL') or {}, database,
+        )
+
+    def get_new_connection(self, conn_params):
+        # Not the short lived connections used to create and drop
+        # the test databases
+        if self.alias == NO_DB_ALIAS:
+            return super().get_new_connection(conn_params)
+
+        connect = partial(super().get_new_connection, conn_params)
+        return self.get_pool().get(connect)
+
+    def _close(self):
+        if self.alias == NO_DB_ALIAS:
+            return super()._close()
+
+        if self.connection is None:
+            return
+
+        # A connection in the middle of a transaction, or one that failed,
+        # is not handed to the next request
+        discard = self.in_atomic_block or self.errors_occurred or \
+            not self.autocommit
+        self.get_pool().put(self.connection, discard=discard)
+
+
+# Connections to a test database left idle in the pools would keep it in
+# use while it is dropped, or be handed to the tests of the next one
+class PooledDatabaseCreationMixin:
+    def _create_test_db(self, *args, **kwargs):
+        close_pools(self.connection.alias)
+        return super()._create_test_db(*args, **kwargs)
+
+    def _destroy_test_db(self, *args, **kwargs):
+        close_pools(self.connection.alias)
+        return super()._destroy_test_db(*args, **kwargs)
@@ -0,0 +1,276 @@
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.db.utils import OperationalError
+
+MODE_SHARED = 'shared'
+MODE_WORKER = 'worker'
+
+_pools = {}
+_local = threading.local()
+_lock = threading.Lock()
+_all_pools = weakref.WeakSet()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+def ping(raw_connection):
+    cursor = raw_connection.cursor()
+
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    # At most max_size open connections. get() waits up to timeout for
+    # one to be returned when they are all in use.
+    def __init__(
+        self, alias='default', mode=MODE_SHARED, max_size=10, timeout=30,
+        max_lifetime=None, health_checks=True, check_after=5,
+    ):
+        self.alias = alias
+        self.mode = mode
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_checks = health_checks
+        # Connections used less than check_after seconds ago are not
+        # pinged again, every checkout would cost a round trip otherwise
+        self.check_after = check_after
+
+        self.condition = threading.Condition()
+        self.pid = os.getpid()
+        self.size = 0
+        self.idle = deque()
+        self.in_use = {}
+
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.health_check_failures = 0
+
+    def forget_parent_connections(self):
+        # A forked worker (e.g. gunicorn --preload) must not use, nor
+        # close, the sockets of its parent
+        self.pid = os.getpid()
+        self.size = 0
+        self.idle.clear()
+        self.in_use.clear()
+
+    def is_expired(self, created_at, now):
+        return self.max_lifetime is not None and \
+            now - created_at >= self.max_lifetime
+
+    def take(self):
+        # An idle connection, None to open a new one or PoolTimeout
+        start = time.monotonic()
+        waited = False
+
+        with self.condition:
+            if self.pid != os.getpid():
+                self.forget_parent_connections()
+
+            while True:
+                if self.idle:
+                    connection = self.idle.pop()
+                    break
+
+                if self.size < self.max_size:
+                    self.size += 1
+                    connection = None
+                    break
+
+                remaining = self.timeout - (time.monotonic() - start)
+
+                if not waited:
+                    waited = True
+                    self.waits += 1
+
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'No database connection available for '
+                        f'"{self.alias}" after {self.timeout}s, '
+                        f'{self.max_size} in use'
+                    )
+
+                self.condition.wait(remaining)
+
+            self.checkouts += 1
+
+            if waited:
+                wait_time = time.monotonic() - start
+                self.wait_time_total += wait_time
+                self.wait_time_max = max(self.wait_time_max, wait_time)
+
+        return connection
+
+    def is_healthy(self, raw_connection, created_at, returned_at):
+        now = time.monotonic()
+
+        if self.is_expired(created_at, now):
+            return False
+
+        if not self.health_checks or now - returned_at < self.check_after:
+            return True
+
+        try:
+            ping(raw_connection)
+        except Exception:
+            self.health_check_failures += 1
+            return False
+
+        return True
+
+    def get(self, connect):
+        idle = self.take()
+
+        if idle is not None:
+            raw_connection, created_at, returned_at = idle
+
+            if self.is_healthy(raw_connection, created_at, returned_at):
+                self.in_use[id(raw_connection)] = created_at
+                return raw_connection
+
+            # Its slot is reused for a new connection
+            self.close_connection(raw_connection)
+
+        try:
+            raw_connection = connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+        self.created += 1
+        self.in_use[id(raw_connection)] = time.monotonic()
+        return raw_connection
+
+    def put(self, raw_connection, discard=False):
+        now = time.monotonic()
+
+        with self.condition:
+            created_at = self.in_use.pop(id(raw_connection), None)
+
+            # Not from this pool, or opened before a fork
+            if created_at is None:
+                return
+
+            if discard or self.is_expired(created_at, now):
+                self.size -= 1
+            else:
+                self.idle.append((raw_connection, created_at, now))
+                raw_connection = None
+
+            self.condition.notify()
+
+        if raw_connection is not None:
+            self.close_connection(raw_connection)
+
+    def close_connection(self, raw_connection):
+        self.discarded += 1
+
+        try:
+            raw_connection.close()
+        except Exception:
+            pass
+
+    def close_idle(self):
+        with self.condition:
+            idle = list(self.idle)
+            self.idle.clear()
+            self.size -= len(idle)
+            self.condition.notify_all()
+
+        for raw_connection, _, _ in idle:
+            self.close_connection(raw_connection)
+
+    def get_stats(self):
+        with self.condition:
+            in_use = len(self.in_use)
+            return {
+                'alias': self.alias,
+                'mode': self.mode,
+                'max_size': self.max_size,
+                'size': self.size,
+                'in_use': in_use,
+                'idle': len(self.idle),
+                'saturation': in_use / self.max_size,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_time_total': self.wait_time_total,
+                'wait_time_max': self.wait_time_max,
+                'timeouts': self.timeouts,
+                'created': self.created,
+                'discarded': self.discarded,
+                'health_check_failures': self.health_check_failures,
+            }
+
+
+def make_pool(alias, options):
+    pool = ConnectionPool(
+        alias=alias,
+        mode=options.get('MODE', MODE_SHARED),
+        max_size=options.get('MAX_SIZE', 10),
+        timeout=options.get('TIMEOUT', 30),
+        max_lifetime=options.get('MAX_LIFETIME'),
+        health_checks=options.get('HEALTH_CHECKS', True),
+        check_after=options.get('CHECK_AFTER', 5),
+    )
+    _all_pools.add(pool)
+    return pool
+
+
+def get_pool(alias, options, database=()):
+    # shared: one pool for every thread of the process (threaded workers,
+    # ASGI). worker: each thread keeps its own connection, like
+    # CONN_MAX_AGE, with the health checks and lifetime of the pool.
+    # One pool per database of the alias (the test runner changes NAME).
+    key = (alias, database)
+
+    if options.get('MODE', MODE_SHARED) == MODE_WORKER:
+        pools = getattr(_local, 'pools', None)
+
+        if pools is None:
+            pools = _local.pools = {}
+
+        if key not in pools:
+            pools[key] = make_pool(alias, dict(options, MAX_SIZE=1))
+
+        return pools[key]
+
+    with _lock:
+        if key not in _pools:
+            _pools[key] = make_pool(alias, options)
+
+        return _pools[key]
+
+
+def close_pools(alias=None):
+    for pool in list(_all_pools):
+        if alias is None or pool.alias == alias:
+            pool.close_idle()
+
+
+@receiver(setting_changed)
+def close_pools_on_databases_change(setting, **kwargs):
+    if setting == 'DATABASES':
+        close_pools()
+
+
+def get_pools_stats():
+    return [pool.get_stats() for pool in list(_all_pools)]
@@ -0,0 +1,13 @@
+from django.db.backends.sqlite3 import base, creation
+
+from utils.db_pool.base import (
+    PooledDatabaseCreationMixin, PooledDatabaseWrapperMixin,
+)
+
+
+class DatabaseCreation(PooledDatabaseCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
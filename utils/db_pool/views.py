@@ -0,0 +1,9 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from utils.db_pool.pool import get_pools_stats
+
+
+@staff_member_required
+def pool_stats(request):
+    return JsonResponse({'pools': get_pools_stats()})
@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# In-process cache of at most max_size entries, each one kept for timeout
+# seconds at most, the least recently used go first. Thread safe.
+class LRUCache:
+    def __init__(self, max_size=1024, timeout=60):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        # Changes on every delete, see set()
+        self.version = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return default
+
+            value, expires_at = entry
+
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return default
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, version=None):
+        # version: self.version read before loading value. A value loaded
+        # while it was being changed (and deleted) is not stored.
+        with self.lock:
+            if version is not None and version != self.version:
+                return
+
+            self.entries[key] = (value, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.version += 1
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.version += 1
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
@@ -1,6 +1,8 @@
+import collections.abc
 import math
 
 from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 
 # python -c
 # "import string as s;from random import SystemRandom as
@@ -8,6 +10,21 @@ from django.core.paginator import Paginator
 # s.punctuation, k=64)))"
 
 
+class CountedPaginator(Paginator):
+    # Takes the number of objects when it is already known (e.g. from a
+    # maintained counter), so no COUNT(*) runs. None counts them as usual.
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.known_count = count
+
+    @cached_property
+    def count(self):
+        if self.known_count is None:
+            return super().count
+
+        return self.known_count
+
+
 def make_pagination_range(
     page_range,
     qty_pages,
@@ -41,13 +58,16 @@ def make_pagination_range(
     }
 
 
-def make_pagination(request, queryset, per_page, qty_pages=4):
+def get_current_page(request):
     try:
-        current_page = int(request.GET.get('page', 1))
+        return int(request.GET.get('page', 1))
     except ValueError:
-        current_page = 1
+        return 1
 
-    paginator = Paginator(queryset, per_page)
+
+def make_pagination(request, queryset, per_page, qty_pages=4, count=None):
+    current_page = get_current_page(request)
+    paginator = CountedPaginator(queryset, per_page, count=count)
     page_obj = paginator.get_page(current_page)
 
     pagination_range = make_pagination_range(
@@ -57,3 +77,76 @@ def make_pagination(request, queryset, per_page, qty_pages=4):
     )
 
     return page_obj, pagination_range
+
+
+class HasNextPage(collections.abc.Sequence):
+    # A page that knows whether there is a next one without counting all
+    # the objects, what django.core.paginator.Page needs
+    def __init__(self, object_list, number, has_next):
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f'<Page {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+def make_has_next_pagination_range(
+    current_page,
+    has_next,
+    qty_pages=4,
+    approximate_count=None,
+):
+    # Pages before the current one, the current one and the next one,
+    # the last page is unknown
+    stop_range = current_page + 1 if has_next else current_page
+    start_range = max(stop_range - qty_pages + 1, 1)
+
+    return {
+        'has_next_mode': True,
+        'pagination': list(range(start_range, stop_range + 1)),
+        'current_page': current_page,
+        'has_next': has_next,
+        'has_previous': current_page > 1,
+        'first_page_out_of_range': start_range > 1,
+        'approximate_count': approximate_count,
+    }
+
+
+def make_has_next_pagination(
+    request, queryset, per_page, qty_pages=4, approximate_count=None,
+):
+    # One more row than the page shows tells if there is a next page, so
+    # no COUNT(*) runs
+    current_page = max(get_current_page(request), 1)
+    offset = (current_page - 1) * per_page
+    object_list = list(queryset[offset:offset + per_page + 1])
+    has_next = len(object_list) > per_page
+
+    page_obj = HasNextPage(object_list[:per_page], current_page, has_next)
+    pagination_range = make_has_next_pagination_range(
+        current_page, has_next, qty_pages, approximate_count,
+    )
+
+    return page_obj, pagination_range
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+# Same statement, different literals: SELECT ... WHERE id = 1 / id = 2
+FINGERPRINT_REGEXES = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(sql):
+    for regex, replacement in FINGERPRINT_REGEXES:
+        sql = regex.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'alias': context['connection'].alias,
+                'time': time.perf_counter() - start,
+            })
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self, threshold=None):
+        # Statements run `threshold` times or more in one request are
+        # almost always a missing select_related/prefetch_related (N+1)
+        if threshold is None:
+            threshold = settings.QUERY_BUDGET_REPEAT_THRESHOLD
+
+        counter = Counter(fingerprint(query['sql']) for query in self.queries)
+        return {
+            sql: count for sql, count in counter.items() if count >= threshold
+        }
+
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+        yield recorder
+
+
+def get_route_name(request):
+    resolver_match = getattr(request, 'resolver_match', None)
+
+    if resolver_match is None:
+        return request.path_info
+
+    return resolver_match.view_name
+
+
+def get_route_names(namespace):
+    # Every named url of a namespace, as QUERY_BUDGETS keys them
+    # ('recipes:home'), the ones of DRF routers included
+    def walk(patterns, current):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(
+                    pattern.url_patterns, pattern.namespace or current,
+                )
+            elif pattern.name and current == namespace:
+                yield f'{namespace}:{pattern.name}'
+
+    return list(dict.fromkeys(walk(get_resolver().url_patterns, None)))
+
+
+# Logs requests over the budget of their route (settings.QUERY_BUDGETS)
+# and requests that repeat the same statement (N+1)
+def check_query_budget(request, recorder, response=None):
+    route_name = get_route_name(request)
+    budget = settings.QUERY_BUDGETS.get(route_name)
+
+    if budget is not None and len(recorder) > budget:
+        logger.warning(
+            '%s ran %s queries, over its budget of %s',
+            route_name, len(recorder), budget,
+        )
+
+    for sql, count in recorder.repeated().items():
+        logger.warning(
+            'Possible N+1 on %s, query ran %s times: %s',
+            route_name, count, sql,
+        )
+
+    if response is not None:
+        response['X-Query-Count'] = len(recorder)
+
+
+def check_streaming_query_budget(request, streaming_content):
+    # The body of a streaming response is built after the middleware has
+    # returned, while it is sent. Its queries grow with the data, each
+    # chunk is checked on its own as it is built.
+    iterator = iter(streaming_content)
+
+    while True:
+        with record_queries() as recorder:
+            chunk = next(iterator, None)
+
+        if chunk is None:
+            return
+
+        check_query_budget(request, recorder)
+        yield chunk
+
+
+class QueryBudgetMiddleware(MiddlewareMixin):
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+
+        with record_queries() as recorder:
+            response = self.get_response(request)
+
+        # X-Query-Count of a streaming response leaves its body out
+        check_query_budget(request, recorder, response)
+
+        if response.streaming:
+            response.streaming_content = check_streaming_query_budget(
+                request, response.streaming_content,
+            )
+
+        return response
+
+    async def __acall__(self, request):
+        # Async views query from threads of their own, with their own
+        # connections: they record and check their queries there, see
+        # recipes/views/api_async.py
+        return await self.get_response(request)
+
+
+class QueryBudgetTestMixin:
+    @contextmanager
+    def assertMaxQueries(self, budget, route_name=''):
+        with record_queries() as recorder:
+            yield recorder
+
+        queries = '\n'.join(query['sql'] for query in recorder.queries)
+        self.assertLessEqual(
+            len(recorder), budget,
+            msg=f'{route_name} ran {len(recorder)} queries, over its '
+                f'budget of {budget}:\n{queries}',
+        )
+
+    def assertStreamingMaxQueries(self, response, budget, route_name=''):
+        # Reads the body of a streaming response, each chunk within the
+        # budget. Returns the body.
+        chunks = iter(response.streaming_content)
+        content = []
+
+        while True:
+            with self.assertMaxQueries(budget, route_name):
+                chunk = next(chunks, None)
+
+            if chunk is None:
+                return b''.join(content)
+
+            content.append(chunk)
+
+    @contextmanager
+    def assertNoRepeatedQueries(self, route_name='', threshold=None):
+        with record_queries() as recorder:
+            yield recorder
+
+        repeated = recorder.repeated(threshold)
+        self.assertEqual(
+            repeated, {}, msg=f'Possible N+1 on {route_name}',
+        )
@@ -0,0 +1,184 @@
+import asyncio
+import math
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+
+PIN_KEY = 'replicas:pinned:{}'
+PIN_COOKIE = 'replicas_pinned'
+# For API clients, which send no cookie: a response that wrote carries the
+# time (Unix, seconds) until which the requests sending it back are pinned
+PIN_HEADER = 'X-Replica-Pin'
+
+# Reads go to a replica only while a request allows it, never in commands,
+# threads or other code running outside of a request
+_request_state = ContextVar('replicas_request_state', default=None)
+
+
+class RequestState:
+    def __init__(self):
+        self.use_replicas = False
+        self.wrote = False
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        replicas = get_replicas()
+
+        # A request reads its own writes, from the primary
+        if state is None or not state.use_replicas or state.wrote or \
+                not replicas:
+            return None
+
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+
+        if state is not None:
+            state.wrote = True
+
+        # Not None, Django would save objects read from a replica there
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+
+        return None
+
+
+def get_pin_key(request):
+    user = getattr(request, 'user', None)
+
+    if user is None or not user.is_authenticated:
+        return None
+
+    return PIN_KEY.format(user.pk)
+
+
+def is_pinned_by_header(request):
+    try:
+        return float(request.headers.get(PIN_HEADER, '')) > time.time()
+    except ValueError:
+        return False
+
+
+def is_pinned(request):
+    if PIN_COOKIE in request.COOKIES or is_pinned_by_header(request):
+        return True
+
+    key = get_pin_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+def pin(request, response):
+    # The cookie keeps the browser session on the primary and the header
+    # the API client that sends it back. The cache key pins the user from
+    # any client, but only in the processes sharing the cache (all of
+    # them with a shared CACHE_BACKEND, only this one by default).
+    seconds = settings.DATABASE_REPLICA_PIN_SECONDS
+    response.set_cookie(
+        PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax',
+    )
+    response[PIN_HEADER] = str(math.ceil(time.time() + seconds))
+    key = get_pin_key(request)
+
+    if key is not None:
+        cache.set(key, 1, seconds)
+
+
+def replicas_may_lag(changed_at):
+    # A change made at changed_at (Unix, seconds) may not have reached the
+    # replicas yet. Pages and validators including it are not cached or
+    # sent, the body could still be read without it.
+    return bool(get_replicas()) and \
+        time.time() - changed_at < settings.DATABASE_REPLICA_PIN_SECONDS
+
+
+def read_from_replicas(request):
+    state = _request_state.get()
+
+    if state is None or not get_replicas() or \
+            request.method not in ('GET', 'HEAD') or is_pinned(request):
+        return
+
+    state.use_replicas = True
+
+
+@contextmanager
+def track_request():
+    state = RequestState()
+    token = _request_state.set(state)
+
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    # Follows the writes of each request, the requests coming after one
+    # that wrote read from the primary for DATABASE_REPLICA_PIN_SECONDS,
+    # until the replicas catch up
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with track_request() as state:
+            response = self.get_response(request)
+
+        if state.wrote and get_replicas():
+            pin(request, response)
+
+        return response
+
+    async def __acall__(self, request):
+        # The state is copied along with the context to the threads
+        # running the queries (sync_to_async)
+        with track_request() as state:
+            response = await self.get_response(request)
+
+        if state.wrote and get_replicas():
+            # request.user may be loaded from the database
+            await sync_to_async(pin)(request, response)
+
+        return response
+
+
+# Opt-in of the views whose GET requests can read from a replica
+class ReplicaReadMixin:
+    def dispatch(self, request, *args, **kwargs):
+        read_from_replicas(request)
+        return super().dispatch(request, *args, **kwargs)
+
+
+# DRF views, after authentication: the pin of a token user is known there
+class ReplicaReadAPIMixin:
+    replica_read_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if getattr(self, 'action', None) in self.replica_read_actions:
+            read_from_replicas(request)
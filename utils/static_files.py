@@ -0,0 +1,16 @@
+from django.utils.deprecation import MiddlewareMixin
+from whitenoise.middleware import \
+    WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+
+class WhiteNoiseMiddleware(MiddlewareMixin):
+    # WhiteNoise's middleware is sync only. Under ASGI Django would run the
+    # rest of every request, async views included, behind it in a blocked
+    # thread. Same files, from an async capable middleware.
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.whitenoise = BaseWhiteNoiseMiddleware(lambda request: None)
+
+    def process_request(self, request):
+        # The static file response, None for the other paths
+        return self.whitenoise(request)
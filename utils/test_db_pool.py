@@ -0,0 +1,198 @@
+import os
+import sqlite3
+import tempfile
+import threading
+from unittest import TestCase
+
+from django.contrib.auth import get_user_model
+from django.db.utils import ConnectionHandler
+from django.test import TestCase as DjangoTestCase
+from django.urls import reverse
+from utils.db_pool.pool import (MODE_WORKER, ConnectionPool, PoolTimeout,
+                                get_pool)
+
+
+class FakeConnection:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.closed = False
+
+    def cursor(self):
+        if not self.healthy:
+            raise sqlite3.OperationalError('server closed the connection')
+        return sqlite3.connect(':memory:').cursor()
+
+    def close(self):
+        self.closed = True
+
+
+class DbPoolTest(TestCase):
+    def make_pool(self, **kwargs):
+        return ConnectionPool(**{'max_size': 2, 'timeout': 0.1, **kwargs})
+
+    def test_pool_reuses_returned_connections(self):
+        pool = self.make_pool()
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+
+        self.assertIs(pool.get(FakeConnection), connection)
+        stats = pool.get_stats()
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['in_use'], 1)
+
+    def test_pool_is_bounded_and_times_out(self):
+        pool = self.make_pool()
+        # Kept alive, the pool tracks connections by id()
+        connections = [pool.get(FakeConnection), pool.get(FakeConnection)]
+
+        with self.assertRaises(PoolTimeout):
+            pool.get(FakeConnection)
+
+        stats = pool.get_stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['saturation'], 1)
+        self.assertEqual(stats['waits'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['in_use'], len(connections))
+
+    def test_pool_waiting_request_gets_the_returned_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        connection = pool.get(FakeConnection)
+        timer = threading.Timer(0.05, pool.put, [connection])
+        timer.start()
+
+        self.assertIs(pool.get(FakeConnection), connection)
+        timer.join()
+        stats = pool.get_stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreater(stats['wait_time_max'], 0)
+
+    def test_pool_discards_broken_connections(self):
+        pool = self.make_pool()
+        connection = pool.get(FakeConnection)
+        pool.put(connection, discard=True)
+
+        self.assertTrue(connection.closed)
+        self.assertIsNot(pool.get(FakeConnection), connection)
+        self.assertEqual(pool.get_stats()['size'], 1)
+
+    def test_pool_replaces_connections_failing_the_health_check(self):
+        pool = self.make_pool(check_after=0)
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+        connection.healthy = False
+
+        self.assertIsNot(pool.get(FakeConnection), connection)
+        self.assertTrue(connection.closed)
+        stats = pool.get_stats()
+        self.assertEqual(stats['health_check_failures'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_pool_closes_connections_past_their_max_lifetime(self):
+        pool = self.make_pool(max_lifetime=0)
+        connection = pool.get(FakeConnection)
+        pool.put(connection)
+
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.get_stats()['size'], 0)
+
+    def test_pool_failed_connect_frees_its_slot(self):
+        pool = self.make_pool(max_size=1)
+
+        def connect():
+            raise sqlite3.OperationalError('could not connect')
+
+        with self.assertRaises(sqlite3.OperationalError):
+            pool.get(connect)
+
+        self.assertEqual(pool.get_stats()['size'], 0)
+
+    def test_pool_worker_mode_has_one_pool_per_thread(self):
+        options = {'MODE': MODE_WORKER}
+        pools = []
+        thread = threading.Thread(
+            target=lambda: pools.append(get_pool('worker_test', options)),
+        )
+        thread.start()
+        thread.join()
+
+        pool = get_pool('worker_test', options)
+        self.assertIs(get_pool('worker_test', options), pool)
+        self.assertIsNot(pools[0], pool)
+        self.assertEqual(pool.max_size, 1)
+
+
+# A Django TestCase, pytest-django blocks database access in the others
+class PooledBackendTest(DjangoTestCase):
+    def test_pooled_sqlite_backend_returns_connections_to_the_pool(self):
+        fd, name = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        self.addCleanup(os.remove, name)
+        # Its own handler, not the connections of the other tests
+        handler = ConnectionHandler({'default': {
+            'ENGINE': 'utils.db_pool.sqlite3',
+            'NAME': name,
+            'POOL': {'MAX_SIZE': 1},
+        }})
+        connection = handler['default']
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        raw_connection = connection.connection
+        connection.close()
+        connection.ensure_connection()
+
+        self.assertIs(connection.connection, raw_connection)
+        stats = connection.get_pool().get_stats()
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['checkouts'], 2)
+        connection.close()
+        connection.get_pool().close_idle()
+
+    def make_database(self):
+        fd, name = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        self.addCleanup(lambda: os.path.exists(name) and os.remove(name))
+        return name
+
+    def get_database_file(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA database_list')
+            return cursor.fetchone()[2]
+
+    def test_changing_the_database_of_an_alias_changes_the_pool(self):
+        name, other_name = self.make_database(), self.make_database()
+        handler = ConnectionHandler({'default': {
+            'ENGINE': 'utils.db_pool.sqlite3',
+            'NAME': name,
+            'POOL': {'MAX_SIZE': 1},
+        }})
+        connection = handler['default']
+        self.assertEqual(self.get_database_file(connection), name)
+        pool = connection.get_pool()
+        connection.close()
+
+        # Like the test runner does with the test database
+        connection.settings_dict['NAME'] = other_name
+        self.assertEqual(self.get_database_file(connection), other_name)
+        self.assertIsNot(connection.get_pool(), pool)
+        connection.close()
+
+        connection.creation._destroy_test_db(other_name, verbosity=0)
+        self.assertEqual(connection.get_pool().get_stats()['idle'], 0)
+        self.assertEqual(pool.get_stats()['idle'], 0)
+
+    def test_pool_stats_view_is_for_staff_only(self):
+        url = reverse('db_pool_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        user = get_user_model().objects.create_user(
+            username='staff', password='P@ssw0rd', is_staff=True,
+        )
+        self.client.force_login(user)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('pools', response.json())
@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+from utils.lru import LRUCache
+
+
+class LRUCacheTest(TestCase):
+    def test_lru_cache_drops_the_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_lru_cache_drops_expired_entries(self):
+        cache = LRUCache(timeout=0)
+        cache.set('a', 1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_cache_skips_values_loaded_before_a_delete(self):
+        cache = LRUCache()
+        version = cache.version
+        cache.delete('a')
+        cache.set('a', 'stale', version=version)
+
+        self.assertIsNone(cache.get('a'))
@@ -1,6 +1,9 @@
 from unittest import TestCase
 
-from utils.pagination import make_pagination_range
+from django.test import RequestFactory
+from utils.pagination import (make_has_next_pagination,
+                              make_has_next_pagination_range,
+                              make_pagination_range)
 
 
 class PaginationTest(TestCase):
@@ -102,3 +105,30 @@ class PaginationTest(TestCase):
             current_page=21,
         )['pagination']
         self.assertEqual([17, 18, 19, 20], pagination)
+
+
+class HasNextPaginationTest(TestCase):
+    def test_has_next_pagination_range_ends_at_the_next_page(self):
+        pagination_range = make_has_next_pagination_range(
+            current_page=5, has_next=True, qty_pages=4,
+        )
+        self.assertEqual([3, 4, 5, 6], pagination_range['pagination'])
+        self.assertTrue(pagination_range['first_page_out_of_range'])
+
+    def test_has_next_pagination_range_on_the_last_page(self):
+        pagination_range = make_has_next_pagination_range(
+            current_page=2, has_next=False, qty_pages=4,
+        )
+        self.assertEqual([1, 2], pagination_range['pagination'])
+        self.assertFalse(pagination_range['first_page_out_of_range'])
+        self.assertFalse(pagination_range['has_next'])
+
+    def test_has_next_pagination_fetches_one_row_more_than_the_page(self):
+        request = RequestFactory().get('/', {'page': 2})
+        page_obj, pagination_range = make_has_next_pagination(
+            request, list(range(1, 8)), per_page=3,
+        )
+        self.assertEqual([4, 5, 6], list(page_obj))
+        self.assertTrue(page_obj.has_next())
+        self.assertTrue(page_obj.has_previous())
+        self.assertEqual([1, 2, 3], pagination_range['pagination'])
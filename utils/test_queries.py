@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from utils.queries import fingerprint
+
+
+class QueriesTest(TestCase):
+    def test_fingerprint_ignores_literals(self):
+        first = fingerprint(
+            'SELECT * FROM "recipes_recipe" WHERE "id" = 1 AND "slug" = \'a\''
+        )
+        second = fingerprint(
+            'SELECT * FROM "recipes_recipe"  WHERE "id" = 22 AND '
+            '"slug" = \'b\''
+        )
+        self.assertEqual(first, second)
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM t WHERE id IN (1, 2, 3)'),
+            fingerprint('SELECT 1 FROM t WHERE id IN (4)'),
+        )
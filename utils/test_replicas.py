@@ -0,0 +1,177 @@
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from recipes.cache import make_page_key
+from recipes.models import Recipe
+from recipes.tests.test_recipe_api_v2 import RecipeAPIv2Mixin
+from rest_framework import test
+from utils.replicas import (PIN_COOKIE, PIN_HEADER, PIN_KEY, ReplicaRouter,
+                            RequestState, _request_state)
+
+# The test database stands in for the replica, the router is checked by
+# the choice of a replica for the reads
+
+
+@override_settings(DATABASE_REPLICAS=['default'])
+class ReplicasTest(test.APITestCase, RecipeAPIv2Mixin):
+    def setUp(self):
+        cache.clear()
+        self.choose_replica = patch(
+            'utils.replicas.random.choice', side_effect=lambda aliases: (
+                aliases[0]
+            ),
+        ).start()
+        self.addCleanup(patch.stopall)
+        return super().setUp()
+
+    def set_request_state(self, **kwargs):
+        state = RequestState()
+        state.__dict__.update(kwargs)
+        token = _request_state.set(state)
+        self.addCleanup(_request_state.reset, token)
+        return state
+
+    def test_replica_router_reads_from_the_primary_outside_requests(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Recipe))
+
+    def test_replica_router_reads_own_writes_from_the_primary(self):
+        router = ReplicaRouter()
+        state = self.set_request_state(use_replicas=True)
+        self.assertEqual(router.db_for_read(Recipe), 'default')
+        self.choose_replica.assert_called_once_with(['default'])
+
+        self.assertEqual(router.db_for_write(Recipe), 'default')
+        self.assertTrue(state.wrote)
+        self.assertIsNone(router.db_for_read(Recipe))
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_replica_router_does_not_migrate_replicas(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate('replica_1', 'recipes'))
+        self.assertIsNone(router.allow_migrate('default', 'recipes'))
+
+    def test_recipe_pages_and_api_reads_go_to_a_replica(self):
+        recipe = self.make_recipe()
+        urls = [
+            reverse('recipes:home'),
+            reverse('recipes:recipe', kwargs={'pk': recipe.pk}),
+            self.get_recipe_api_reverse_url_list(),
+            self.get_recipe_api_reverse_url_detail(recipe.pk),
+        ]
+
+        for url in urls:
+            with self.subTest(url=url):
+                self.choose_replica.reset_mock()
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(self.choose_replica.called)
+                self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertNotIn(PIN_HEADER, response)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_recent_changes_are_not_cached_or_validated_on_replicas(self):
+        recipe = self.make_recipe()
+        urls = [
+            reverse('recipes:recipes_api_v1'),
+            reverse('recipes:recipes_api_v1_detail', args=(recipe.pk,)),
+            self.get_recipe_api_reverse_url_list(),
+            self.get_recipe_api_reverse_url_detail(recipe.pk),
+        ]
+
+        def get_page_key():
+            return make_page_key('/', 1, 'pt-br', ['all', 'home'])
+
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotIn('ETag', self.client.get(url))
+
+        self.assertIsNone(get_page_key())
+
+        # The replicas are expected to have caught up
+        with override_settings(DATABASE_REPLICA_PIN_SECONDS=0):
+            for url in urls:
+                with self.subTest(url=url):
+                    self.assertIn('ETag', self.client.get(url))
+
+            self.assertIsNotNone(get_page_key())
+
+    def test_write_pins_the_user_and_session_to_the_primary(self):
+        auth_data = self.get_auth_data()
+        self.client.cookies.clear()
+        authorization = f"Bearer {auth_data['jwt_access_token']}"
+
+        response = self.client.post(
+            self.get_recipe_api_reverse_url_list(),
+            data=self.get_recipe_raw_data(),
+            HTTP_AUTHORIZATION=authorization,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertIsNotNone(
+            cache.get(PIN_KEY.format(auth_data['user'].pk)),
+        )
+
+        # Same browser session
+        self.choose_replica.reset_mock()
+        self.client.get(reverse('recipes:home'))
+        self.assertFalse(self.choose_replica.called)
+
+        # Same user, from a client without the cookie
+        self.client.cookies.clear()
+        self.client.get(
+            self.get_recipe_api_reverse_url_list(),
+            HTTP_AUTHORIZATION=authorization,
+        )
+        self.assertFalse(self.choose_replica.called)
+
+        # Anyone else
+        self.client.get(self.get_recipe_api_reverse_url_list())
+        self.assertTrue(self.choose_replica.called)
+
+    def test_write_pins_api_clients_sending_the_header_back(self):
+        auth_data = self.get_auth_data()
+        self.client.cookies.clear()
+        authorization = f"Bearer {auth_data['jwt_access_token']}"
+
+        response = self.client.post(
+            self.get_recipe_api_reverse_url_list(),
+            data=self.get_recipe_raw_data(),
+            HTTP_AUTHORIZATION=authorization,
+        )
+        pinned_until = response[PIN_HEADER]
+
+        # The next request reaches a process with another cache
+        self.client.cookies.clear()
+        cache.clear()
+        self.choose_replica.reset_mock()
+        self.client.get(
+            self.get_recipe_api_reverse_url_list(),
+            HTTP_AUTHORIZATION=authorization,
+            HTTP_X_REPLICA_PIN=pinned_until,
+        )
+        self.assertFalse(self.choose_replica.called)
+
+        # Without it, or once it is over
+        for headers in ({}, {'HTTP_X_REPLICA_PIN': str(int(time.time()))}):
+            with self.subTest(headers=headers):
+                self.choose_replica.reset_mock()
+                self.client.get(
+                    self.get_recipe_api_reverse_url_list(),
+                    HTTP_AUTHORIZATION=authorization, **headers,
+                )
+                self.assertTrue(self.choose_replica.called)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_writes_are_not_pinned_without_replicas(self):
+        auth_data = self.get_auth_data()
+        response = self.client.post(
+            self.get_recipe_api_reverse_url_list(),
+            data=self.get_recipe_raw_data(),
+            HTTP_AUTHORIZATION=f"Bearer {auth_data['jwt_access_token']}",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertNotIn(PIN_HEADER, response)